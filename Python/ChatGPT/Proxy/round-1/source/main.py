@@ -1,9 +1,24 @@
+import csv
+import io
+import json
 import sqlite3
+import threading
+import time
+from bulk import BulkRows
+from metrics import Metrics, instrumented
+from pagination import keyset_query, MAX_PAGE_SIZE, PAGE_ARGS, parse_page_args, build_page, first_page
+from sqlite_profiles import apply_sqlite_profile
+
+def name_value_row(record):
+    if not isinstance(record, (tuple, list)) or len(record) != 2 or record[0] is None:
+        raise ValueError("name is required")
+    return tuple(record)
 
 class DatabaseProxy:
-    def __init__(self, db_name):
+    def __init__(self, db_name, profile=None, metrics=None):
         self.db_name = db_name
-        self._db_manager = DatabaseManager(db_name)
+        self._db_manager = DatabaseManager(db_name, profile)
+        self.metrics = metrics if metrics is not None else Metrics()
 
     def connect(self):
         print("Proxy: Connecting to the database...")
@@ -13,18 +28,32 @@ class DatabaseProxy:
         print("Proxy: Creating a table...")
         return self._db_manager.create_table()
 
+    @instrumented("create", rows=lambda record_id: 1)
     def add_record(self, data):
         print("Proxy: Adding a record...")
         return self._db_manager.add_record(data)
 
-    def fetch_records(self):
+    @instrumented("create_bulk", rows=lambda result: sum(record_id is not None for record_id in result[0]))
+    def add_records(self, records, chunk_size=500):
+        print("Proxy: Adding records in bulk...")
+        batch = BulkRows(records, name_value_row)
+        return batch.assign(self._db_manager.add_records(batch.rows, chunk_size))
+
+    @instrumented("read", rows=len)
+    def fetch_records(self, limit=None, after=None, before=None):
         print("Proxy: Fetching records...")
-        return self._db_manager.fetch_records()
+        return self._db_manager.fetch_records(limit=limit, after=after, before=before)
+
+    def iter_records(self, batch_size=500):
+        print("Proxy: Streaming records...")
+        return self._db_manager.iter_records(batch_size)
 
+    @instrumented("update", rows=lambda rowcount: rowcount)
     def update_record(self, record_id, data):
         print("Proxy: Updating a record...")
         return self._db_manager.update_record(record_id, data)
 
+    @instrumented("delete", rows=lambda rowcount: rowcount)
     def delete_record(self, record_id):
         print("Proxy: Deleting a record...")
         return self._db_manager.delete_record(record_id)
@@ -35,12 +64,13 @@ class DatabaseProxy:
 
 
 class DatabaseManager:
-    def __init__(self, db_name):
+    def __init__(self, db_name, profile=None):
         self.db_name = db_name
+        self.profile = profile
         self.connection = None
 
     def connect(self):
-        self.connection = sqlite3.connect(self.db_name)
+        self.connection = apply_sqlite_profile(sqlite3.connect(self.db_name), self.profile)
         return self.connection
 
     def create_table(self):
@@ -60,10 +90,41 @@ class DatabaseManager:
         self.connection.commit()
         return cursor.lastrowid
 
-    def fetch_records(self):
+    def add_records(self, rows, chunk_size=500):
+        ids = []
         cursor = self.connection.cursor()
-        cursor.execute('SELECT * FROM records')
-        return cursor.fetchall()
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                cursor.executemany('INSERT INTO records (name, value) VALUES (?, ?)', chunk)
+                # The chunk holds the write lock, so its rows get consecutive
+                # rowids ending at last_insert_rowid().
+                last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+                ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        return ids
+
+    def fetch_records(self, limit=None, after=None, before=None):
+        query, params, backward = keyset_query(limit, after, before)
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        return rows[::-1] if backward else rows
+
+    def iter_records(self, batch_size=500):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute('SELECT * FROM records ORDER BY id')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
 
     def update_record(self, record_id, data):
         cursor = self.connection.cursor()
@@ -82,11 +143,39 @@ class DatabaseManager:
             self.connection.close()
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 
 app = Flask(__name__)
 db_proxy = DatabaseProxy('test.db')
 
+EXPORT_COLUMNS = ('id', 'name', 'value')
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def export_chunks(records, fmt, chunk_rows=500):
+    # Rows are serialized into one buffer and flushed every chunk_rows rows,
+    # so memory stays flat while the response avoids a write per row.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    try:
+        for count, record in enumerate(records, 1):
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, record))))
+                buffer.write('\n')
+            if count % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # Closing the response (including on client disconnect) closes this
+        # generator, which stops the cursor and releases its connection.
+        records.close()
+
 @app.route('/create', methods=['POST'])
 def create():
     data = request.json
@@ -95,10 +184,37 @@ def create():
     record_id = db_proxy.add_record((name, value))
     return jsonify({"id": record_id}), 201
 
+@app.route('/create/bulk', methods=['POST'])
+def create_bulk():
+    items = request.json
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON array of records"}), 400
+    ids, errors = db_proxy.add_records((item.get('name'), item.get('value')) if isinstance(item, dict) else None for item in items)
+    return jsonify({"ids": ids, "errors": errors}), 201
+
 @app.route('/read', methods=['GET'])
 def read():
-    records = db_proxy.fetch_records()
-    return jsonify(records), 200
+    if not PAGE_ARGS.intersection(request.args):
+        records, headers = first_page(db_proxy.fetch_records(limit=MAX_PAGE_SIZE + 1))
+        return jsonify(records), 200, headers
+    try:
+        limit, after, before = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    records = db_proxy.fetch_records(limit=limit + 1, after=after, before=before)
+    return jsonify(build_page(records, limit, after, before)), 200
+
+@app.route('/export', methods=['GET'])
+def export():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    headers = {'Content-Disposition': f'attachment; filename=records.{fmt}'}
+    return Response(export_chunks(db_proxy.iter_records(), fmt), mimetype=EXPORT_MIMETYPES[fmt], headers=headers)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(db_proxy.metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/update/<int:record_id>', methods=['PUT'])
 def update(record_id):
@@ -90,5 +90,17 @@ def test_proxy_logging_and_control(setup_database):
 
     # In a real scenario, here you would check logs or mock the print statements.
 
+def test_metrics_endpoint(client, setup_database):
+    setup_database.add_record(("Metric", "1"))
+    setup_database.fetch_records()
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'db_proxy_duration_seconds_bucket{operation="read",table="records",le="+Inf"}' in response.get_data(as_text=True)
+    metrics = setup_database.metrics.render()
+    assert 'db_proxy_rows_total{operation="create",table="records"} 1' in metrics
+    assert 'db_proxy_errors_total{operation="read",table="records"} 0' in metrics
+
+
 if __name__ == "__main__":
     pytest.main(["--cov=app", "--cov-report=term-missing"])
@@ -1,53 +1,265 @@
+import csv
+import io
+import itertools
+import json
 import sqlite3
 import logging
+import threading
+import time
+from concurrent.futures import Future
+from bulk import BulkRows
+from connection_pool import ConnectionPool
+from group_commit_writer import WriteResult
+from metrics import Metrics, instrumented
+from pagination import keyset_query, MAX_PAGE_SIZE, PAGE_ARGS, parse_page_args, build_page, first_page
+from sqlite_profiles import apply_sqlite_profile
 
 class DatabaseProxy:
-    def __init__(self, real_subject):
+    def __init__(self, real_subject, metrics=None, cache_ttl=None, cache_soft_ttl=None, refresh_ahead=None):
         self._real_subject = real_subject
+        self.metrics = metrics if metrics is not None else Metrics()
+        # "fetch_records" holds the table as {id: row}, patched in place on
+        # every write so a write-heavy workload keeps the cache warm.
         self._cache = {}
+        self._cache_lock = threading.Lock()
+        # Concurrent creates can patch their ids in out of id order; the
+        # snapshot is then re-sorted by the next read that pages through it.
+        self._snapshot_sorted = True
+        self._generation = 0
+        # Writes to a record that are in flight, and records that had two
+        # at once (see _write)
+        self._writes_in_flight = {}
+        self._contended = set()
+        # Writes made outside this proxy only show up once the snapshot is
+        # reloaded. Past cache_ttl it is dropped and reloaded on the next read;
+        # past cache_soft_ttl it is still served while a background thread
+        # reloads it. refresh_ahead (a fraction of the soft TTL, or of the TTL
+        # without one) starts that reload early, so a hot table never goes
+        # stale or misses.
+        if refresh_ahead is not None and not 0 < refresh_ahead < 1:
+            raise ValueError("refresh_ahead must be between 0 and 1")
+        self.cache_ttl = cache_ttl
+        base = cache_soft_ttl if cache_soft_ttl is not None else cache_ttl
+        self._refresh_after = refresh_ahead * base if refresh_ahead is not None and base is not None else cache_soft_ttl
+        self._cached_at = None
+        self._refreshing = False
+        self.cache_refreshes = 0
 
     def create_table(self):
         self._log("Creating table")
         return self._real_subject.create_table()
 
+    @instrumented("create", rows=lambda record_id: 1)
     def add_record(self, data):
         self._log(f"Adding record: {data}")
-        return self._real_subject.add_record(data)
+        record_id = self._real_subject.add_record(data)
+        with self._cache_lock:
+            self._generation += 1
+            records = self._cache.get("fetch_records")
+            if records is not None:
+                if record_id is None:
+                    del self._cache["fetch_records"]
+                else:
+                    self._insert_cached(records, record_id, (record_id, data))
+        return record_id
 
-    def fetch_records(self):
+    @instrumented("create_bulk", rows=lambda result: sum(record_id is not None for record_id in result[0]))
+    def add_records(self, records, chunk_size=500):
+        self._log("Adding records in bulk")
+        batch = BulkRows(records)
+        new_ids = self._real_subject.add_records(batch.rows, chunk_size)
+        with self._cache_lock:
+            self._generation += 1
+            cached = self._cache.get("fetch_records")
+            if cached is not None:
+                for record_id, (data,) in zip(new_ids, batch.rows):
+                    self._insert_cached(cached, record_id, (record_id, data))
+        return batch.assign(new_ids)
+
+    def _insert_cached(self, records, record_id, row):
+        # Called with _cache_lock held. A new id can only be in the snapshot
+        # if a reload saw it, and then also any later write to it.
+        if record_id in records:
+            return
+        if records and record_id < next(reversed(records)):
+            self._snapshot_sorted = False
+        records[record_id] = row
+
+    @instrumented("read", rows=len)
+    def fetch_records(self, limit=None, after=None, before=None):
         self._log("Fetching records")
-        if "fetch_records" in self._cache:
-            self._log("Returning cached records")
-            return self._cache["fetch_records"]
+        if after is not None or before is not None:
+            # Pages past a cursor are cheap keyset range scans, so they skip
+            # the cache.
+            return self._real_subject.fetch_records(limit=limit, after=after, before=before)
+        # The snapshot is kept in id order (loaded ORDER BY id, re-sorted after
+        # out-of-order creates), so the first page is a prefix of it.
+        with self._cache_lock:
+            records = self._cached_records()
+            if records is not None:
+                if not self._snapshot_sorted:
+                    records = self._cache["fetch_records"] = dict(sorted(records.items()))
+                    self._snapshot_sorted = True
+                self._log("Returning cached records")
+                return list(itertools.islice(records.values(), limit))
+            generation = self._generation
+        return self._load_records(generation)[:limit]
+
+    def _load_records(self, generation):
+        rows = self._real_subject.fetch_records()
+        with self._cache_lock:
+            # A write that landed while we were reading may be missing from
+            # rows, so only publish the snapshot if nothing changed meanwhile.
+            if self._generation == generation:
+                self._cache["fetch_records"] = {row[0]: row for row in rows}
+                self._snapshot_sorted = True
+                self._cached_at = time.monotonic()
+        return rows
+
+    def warm_up(self):
+        # Load the fetch_records snapshot before serving traffic, so the first
+        # reads after a restart don't all go to SQLite. The snapshot is the
+        # whole table, so reloading it from the database is as cheap as any
+        # on-disk copy would be, and it cannot be stale.
+        with self._cache_lock:
+            records = self._cache.get("fetch_records")
+            if records is not None:
+                return len(records)
+            generation = self._generation
+        rows = self._load_records(generation)
+        self._log(f"Warmed cache with {len(rows)} records")
+        return len(rows)
 
-        records = self._real_subject.fetch_records()
-        self._cache["fetch_records"] = records
+    def _cached_records(self):
+        # Called with _cache_lock held. Returns the snapshot, or None once it
+        # is past the TTL; past the soft TTL it starts a background reload.
+        records = self._cache.get("fetch_records")
+        if records is None:
+            return None
+        age = time.monotonic() - self._cached_at
+        if self.cache_ttl is not None and age >= self.cache_ttl:
+            del self._cache["fetch_records"]
+            return None
+        if self._refresh_after is not None and age >= self._refresh_after and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh_records, args=(self._generation,),
+                             name="cache-refresh", daemon=True).start()
         return records
 
+    def _refresh_records(self, generation):
+        try:
+            self._load_records(generation)
+            self._log("Refreshed cached records")
+        except Exception:
+            # The stale snapshot keeps being served until cache_ttl.
+            logging.exception("DatabaseProxy: refreshing cached records failed")
+        finally:
+            with self._cache_lock:
+                self._refreshing = False
+                self.cache_refreshes += 1
+
+    @instrumented("read_many", rows=lambda records: sum(record is not None for record in records))
+    def fetch_records_by_ids(self, record_ids):
+        self._log(f"Fetching {len(record_ids)} records by ID")
+        with self._cache_lock:
+            records = self._cached_records()
+            if records is not None:
+                # The cached snapshot holds every row, so a miss means the
+                # record does not exist.
+                return [records.get(record_id) for record_id in record_ids]
+        return self._real_subject.fetch_records_by_ids(record_ids)
+
+    def iter_records(self, batch_size=500):
+        self._log("Streaming records")
+        return self._real_subject.iter_records(batch_size)
+
+    @instrumented("update", rows=lambda rowcount: rowcount)
     def update_record(self, record_id, data):
         self._log(f"Updating record with ID {record_id}: {data}")
-        if "fetch_records" in self._cache:
-            del self._cache["fetch_records"]
-        return self._real_subject.update_record(record_id, data)
 
+        def patch(records):
+            records[record_id] = (record_id, data)
+        return self._write(record_id, patch, self._real_subject.update_record, record_id, data)
+
+    @instrumented("delete", rows=lambda rowcount: rowcount)
     def delete_record(self, record_id):
         self._log(f"Deleting record with ID {record_id}")
-        if "fetch_records" in self._cache:
-            del self._cache["fetch_records"]
-        return self._real_subject.delete_record(record_id)
+        return self._write(record_id, lambda records: records.pop(record_id),
+                           self._real_subject.delete_record, record_id)
+
+    def _write(self, record_id, patch, write, *args):
+        # The snapshot is patched after the write commits, so two writes to
+        # one record could patch it in the opposite order to their commits.
+        # Which one committed last can't be told from here, so when writes to
+        # a record overlap, the snapshot is dropped and the next read reloads.
+        with self._cache_lock:
+            self._generation += 1
+            in_flight = self._writes_in_flight.get(record_id, 0)
+            if in_flight:
+                self._contended.add(record_id)
+            self._writes_in_flight[record_id] = in_flight + 1
+        rowcount = 0
+        try:
+            rowcount = write(*args)
+            return rowcount
+        finally:
+            with self._cache_lock:
+                self._generation += 1
+                in_flight = self._writes_in_flight.pop(record_id) - 1
+                contended = record_id in self._contended
+                if in_flight:
+                    self._writes_in_flight[record_id] = in_flight
+                else:
+                    self._contended.discard(record_id)
+                records = self._cache.get("fetch_records")
+                if records is None or not rowcount:
+                    pass
+                elif contended or record_id not in records:
+                    # Overlapping writes, or a row the snapshot doesn't have
+                    # yet (its add_record hasn't patched it in): reload.
+                    del self._cache["fetch_records"]
+                else:
+                    patch(records)
+
+    def pool_stats(self):
+        return self._real_subject.pool_stats()
 
     def _log(self, message):
         logging.info(f"DatabaseProxy: {message}")
 
 class DatabaseManager:
-    def __init__(self, db_name):
+    def __init__(self, db_name, pool=None, writer=None, profile=None):
         self._db_name = db_name
+        self._profile = profile
+        self._pool = pool or ConnectionPool(db_name, profile=profile)
+        self._writer = writer
 
     def _connect(self):
-        return sqlite3.connect(self._db_name)
+        return self._pool.connection()
+
+    def pool_stats(self):
+        return self._pool.stats()
+
+    def submit_write(self, query, params=()):
+        if self._writer is not None:
+            return self._writer.submit(query, params)
+        future = Future()
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                conn.commit()
+            future.set_result(WriteResult(cursor.lastrowid, cursor.rowcount))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
     def create_table(self):
-        with self._connect() as conn:
+        # Uses its own short-lived connection rather than the pool, so creating
+        # the schema at import, before a pre-fork server forks its workers,
+        # leaves no connection open for them to inherit.
+        conn = apply_sqlite_profile(sqlite3.connect(self._db_name), self._profile)
+        try:
             cursor = conn.cursor()
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS records (
@@ -56,39 +268,121 @@ class DatabaseManager:
                 )
             ''')
             conn.commit()
+        finally:
+            conn.close()
 
     def add_record(self, data):
+        return self.submit_write('INSERT INTO records (data) VALUES (?)', (data,)).result().lastrowid
+
+    def add_records(self, rows, chunk_size=500):
+        query = 'INSERT INTO records (data) VALUES (?)'
+        chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+        ids = []
+        if self._writer is not None:
+            for future in [self._writer.submit_many(query, chunk) for chunk in chunks]:
+                result = future.result()
+                ids.extend(range(result.lastrowid - result.rowcount + 1, result.lastrowid + 1))
+            return ids
         with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('INSERT INTO records (data) VALUES (?)', (data,))
+            for chunk in chunks:
+                cursor.executemany(query, chunk)
+                # The chunk holds the write lock, so its rows get consecutive
+                # rowids ending at last_insert_rowid().
+                last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+                ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
             conn.commit()
+        return ids
 
-    def fetch_records(self):
+    def fetch_records(self, limit=None, after=None, before=None):
+        query, params, backward = keyset_query(limit, after, before)
         with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM records')
-            return cursor.fetchall()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        return rows[::-1] if backward else rows
 
-    def update_record(self, record_id, data):
+    def fetch_records_by_ids(self, record_ids, chunk_size=900):
+        # chunk_size stays under SQLite's default limit of 999 bound variables.
+        found = {}
+        unique_ids = list(dict.fromkeys(record_ids))
         with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('UPDATE records SET data = ? WHERE id = ?', (data, record_id))
-            conn.commit()
+            for start in range(0, len(unique_ids), chunk_size):
+                chunk = unique_ids[start:start + chunk_size]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f'SELECT * FROM records WHERE id IN ({placeholders})', chunk)
+                found.update((row[0], row) for row in cursor.fetchall())
+        return [found.get(record_id) for record_id in record_ids]
 
-    def delete_record(self, record_id):
+    def iter_records(self, batch_size=500):
         with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('DELETE FROM records WHERE id = ?', (record_id,))
-            conn.commit()
+            try:
+                cursor.execute('SELECT * FROM records ORDER BY id')
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
+    def update_record(self, record_id, data):
+        return self.submit_write('UPDATE records SET data = ? WHERE id = ?', (data, record_id)).result().rowcount
+
+    def delete_record(self, record_id):
+        return self.submit_write('DELETE FROM records WHERE id = ?', (record_id,)).result().rowcount
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 
 app = Flask(__name__)
 
+def parse_ids(value):
+    try:
+        ids = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers")
+    if not ids:
+        raise ValueError("ids must not be empty")
+    if len(ids) > MAX_PAGE_SIZE:
+        raise ValueError(f"At most {MAX_PAGE_SIZE} ids can be requested at once")
+    return ids
+
+EXPORT_COLUMNS = ('id', 'data')
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def export_chunks(records, fmt, chunk_rows=500):
+    # Rows are serialized into one buffer and flushed every chunk_rows rows,
+    # so memory stays flat while the response avoids a write per row.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    try:
+        for count, record in enumerate(records, 1):
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, record))))
+                buffer.write('\n')
+            if count % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # Closing the response (including on client disconnect) closes this
+        # generator, which stops the cursor and releases its connection.
+        records.close()
+
 # Initialize DatabaseManager and DatabaseProxy
 db_manager = DatabaseManager('example.db')
 db_proxy = DatabaseProxy(db_manager)
+# Seconds a worker serves its cached records when several workers run
+PREFORK_CACHE_TTL = 1.0
 
 # Ensure the table exists
 db_proxy.create_table()
@@ -99,10 +393,43 @@ def create():
     db_proxy.add_record(data)
     return jsonify({"message": "Record added"}), 201
 
+@app.route('/create/bulk', methods=['POST'])
+def create_bulk():
+    items = request.json
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON array of records"}), 400
+    ids, errors = db_proxy.add_records(item.get('data') if isinstance(item, dict) else None for item in items)
+    return jsonify({"ids": ids, "errors": errors}), 201
+
 @app.route('/read', methods=['GET'])
 def read():
-    records = db_proxy.fetch_records()
-    return jsonify(records), 200
+    if 'ids' in request.args:
+        try:
+            ids = parse_ids(request.args['ids'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(db_proxy.fetch_records_by_ids(ids)), 200
+    if not PAGE_ARGS.intersection(request.args):
+        records, headers = first_page(db_proxy.fetch_records(limit=MAX_PAGE_SIZE + 1))
+        return jsonify(records), 200, headers
+    try:
+        limit, after, before = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    records = db_proxy.fetch_records(limit=limit + 1, after=after, before=before)
+    return jsonify(build_page(records, limit, after, before)), 200
+
+@app.route('/export', methods=['GET'])
+def export():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    headers = {'Content-Disposition': f'attachment; filename=records.{fmt}'}
+    return Response(export_chunks(db_proxy.iter_records(), fmt), mimetype=EXPORT_MIMETYPES[fmt], headers=headers)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(db_proxy.metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/update/<int:record_id>', methods=['PUT'])
 def update(record_id):
@@ -115,6 +442,17 @@ def delete(record_id):
     db_proxy.delete_record(record_id)
     return jsonify({"message": "Record deleted"}), 200
 
+def before_fork(workers):
+    # Called by tools/serve_prefork.py before it forks the workers. Each
+    # worker caches the table separately and only patches its own writes into
+    # it, so a TTL bounds how long another worker's writes can go unseen.
+    if workers > 1:
+        db_proxy.cache_ttl = PREFORK_CACHE_TTL
+    db_proxy.warm_up()
+
+# Multi-worker serving: python tools/serve_prefork.py ChatGPT/Proxy/round-2/source/main.py --workers 8
+# or gunicorn --preload, which also imports the app once before forking.
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
+    db_proxy.warm_up()
     app.run(debug=True)
@@ -76,3 +76,213 @@ def test_proxy_logging(client: FlaskClient, caplog):
     assert "DatabaseProxy: Fetching records" in caplog.text
     assert "DatabaseProxy: Updating record with ID 1: New Data" in caplog.text
     assert "DatabaseProxy: Deleting record with ID 1" in caplog.text
+
+def test_connection_pool_reuses_connections(client: FlaskClient):
+    before = db_proxy.pool_stats()
+    client.post('/create', json={'data': 'Test Data'})
+    client.get('/read')
+    after = db_proxy.pool_stats()
+    assert after['hits'] > before['hits']
+    assert after['size'] <= 5
+    assert after['in_use'] == 0
+
+def test_group_commit_writer(tmp_path):
+    from api_code import DatabaseManager
+    from group_commit_writer import GroupCommitWriter
+    db_file = str(tmp_path / 'writer.db')
+    writer = GroupCommitWriter(db_file)
+    manager = DatabaseManager(db_file, writer=writer)
+    manager.create_table()
+
+    futures = [manager.submit_write('INSERT INTO records (data) VALUES (?)', (f'Row {i}',)) for i in range(100)]
+    results = [future.result() for future in futures]
+    assert [result.lastrowid for result in results] == list(range(1, 101))
+
+    failed = manager.submit_write('INSERT INTO records (missing) VALUES (?)', ('x',))
+    with pytest.raises(Exception):
+        failed.result()
+    assert len(manager.fetch_records()) == 100
+    writer.close()
+
+def test_proxy_cache_patched_on_writes(tmp_path, monkeypatch):
+    from api_code import DatabaseManager, DatabaseProxy
+    manager = DatabaseManager(str(tmp_path / 'patched.db'))
+    proxy = DatabaseProxy(manager)
+    proxy.create_table()
+    proxy.add_record('Test Data 1')
+    proxy.add_record('Test Data 2')
+    proxy.fetch_records()
+
+    def fail(**kwargs):
+        raise AssertionError("cache should serve reads after writes")
+    monkeypatch.setattr(manager, 'fetch_records', fail)
+
+    proxy.add_record('Test Data 3')
+    proxy.update_record(1, 'Updated Data')
+    proxy.delete_record(2)
+    assert proxy.fetch_records() == [(1, 'Updated Data'), (3, 'Test Data 3')]
+
+def test_proxy_cache_dropped_on_overlapping_writes(tmp_path, monkeypatch):
+    from api_code import DatabaseManager, DatabaseProxy
+    manager = DatabaseManager(str(tmp_path / 'overlap.db'))
+    proxy = DatabaseProxy(manager)
+    proxy.create_table()
+    proxy.add_record('Original')
+    proxy.fetch_records()
+    update = manager.update_record
+
+    def update_then_overtake(record_id, data):
+        rowcount = update(record_id, data)
+        if data == 'First':
+            # A second update commits and patches before this one patches
+            proxy.update_record(record_id, 'Second')
+        return rowcount
+    monkeypatch.setattr(manager, 'update_record', update_then_overtake)
+
+    proxy.update_record(1, 'First')
+    assert proxy.fetch_records() == [(1, 'Second')]
+
+def test_proxy_cache_sorted_after_out_of_order_creates(tmp_path, monkeypatch):
+    from api_code import DatabaseManager, DatabaseProxy
+    manager = DatabaseManager(str(tmp_path / 'order.db'))
+    proxy = DatabaseProxy(manager)
+    proxy.create_table()
+    proxy.add_record('Record 1')
+    proxy.fetch_records()
+    add = manager.add_record
+
+    def add_then_overtake(data):
+        record_id = add(data)
+        if data == 'Record 2':
+            # A later create commits and patches its id in first
+            proxy.add_record('Record 3')
+        return record_id
+    monkeypatch.setattr(manager, 'add_record', add_then_overtake)
+    proxy.add_record('Record 2')
+    monkeypatch.setattr(manager, 'fetch_records', lambda **kwargs: pytest.fail("served from the snapshot"))
+
+    assert proxy.fetch_records() == [(1, 'Record 1'), (2, 'Record 2'), (3, 'Record 3')]
+    assert proxy.fetch_records(limit=2) == [(1, 'Record 1'), (2, 'Record 2')]
+
+def test_proxy_add_records(tmp_path):
+    from api_code import DatabaseManager, DatabaseProxy
+    proxy = DatabaseProxy(DatabaseManager(str(tmp_path / 'bulk.db')))
+    proxy.create_table()
+    proxy.fetch_records()
+    ids, errors = proxy.add_records(['Bulk 1', 42, 'Bulk 2'])
+    assert ids == [1, None, 2]
+    assert errors == [{'index': 1, 'error': 'data must be a string'}]
+    assert proxy.fetch_records() == [(1, 'Bulk 1'), (2, 'Bulk 2')]
+
+def test_read_by_ids(client: FlaskClient, tmp_path, monkeypatch):
+    import api_code
+    proxy = api_code.DatabaseProxy(api_code.DatabaseManager(str(tmp_path / 'ids.db')))
+    proxy.create_table()
+    monkeypatch.setattr(api_code, 'db_proxy', proxy)
+    for i in range(1, 4):
+        client.post('/create', json={'data': f'Test Data {i}'})
+    response = client.get('/read?ids=3,1,9')
+    assert response.status_code == 200
+    assert response.get_json() == [[3, 'Test Data 3'], [1, 'Test Data 1'], None]
+    assert client.get('/read?ids=1,x').status_code == 400
+
+def test_connection_profile(tmp_path):
+    from api_code import DatabaseManager
+    manager = DatabaseManager(str(tmp_path / 'profile.db'), profile='read-heavy')
+    with manager._connect() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA mmap_size').fetchone()[0] == 256 * 1024 * 1024
+
+def test_no_profile_keeps_sqlite_defaults(tmp_path, monkeypatch):
+    from api_code import DatabaseManager
+    monkeypatch.delenv('SQLITE_PROFILE', raising=False)
+    manager = DatabaseManager(str(tmp_path / 'defaults.db'))
+    with manager._connect() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 2  # FULL
+
+def test_metrics_endpoint(client: FlaskClient):
+    client.post('/create', json={'data': 'Test Data'})
+    client.get('/read?ids=1,2')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'db_proxy_duration_seconds_count{operation="create",table="records"}' in body
+    assert 'db_proxy_rows_total{operation="read_many",table="records"}' in body
+    assert 'db_proxy_in_flight{operation="create",table="records"} 0' in body
+
+def test_proxy_cache_soft_ttl(tmp_path, monkeypatch):
+    import time
+    from api_code import DatabaseManager, DatabaseProxy
+    manager = DatabaseManager(str(tmp_path / 'ttl.db'))
+    proxy = DatabaseProxy(manager, cache_ttl=60, cache_soft_ttl=10)
+    proxy.create_table()
+    proxy.add_record('Original')
+    assert proxy.fetch_records() == [(1, 'Original')]
+    manager.update_record(1, 'Changed elsewhere')
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 20)
+    # Past the soft TTL the stale snapshot is served while it reloads
+    assert proxy.fetch_records() == [(1, 'Original')]
+    for _ in range(500):
+        if proxy.cache_refreshes:
+            break
+        time.sleep(0.01)
+    assert proxy.fetch_records() == [(1, 'Changed elsewhere')]
+
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 200)
+    manager.update_record(1, 'Changed again')
+    # Past the hard TTL the snapshot is dropped and read through
+    assert proxy.fetch_records() == [(1, 'Changed again')]
+
+def test_proxy_warm_up(tmp_path, monkeypatch):
+    from api_code import DatabaseManager, DatabaseProxy
+    manager = DatabaseManager(str(tmp_path / 'warm.db'))
+    manager.create_table()
+    manager.add_record('First')
+    manager.add_record('Second')
+    proxy = DatabaseProxy(manager)
+    assert proxy.warm_up() == 2
+    # Served from the preloaded snapshot without touching the database
+    monkeypatch.setattr(manager, 'fetch_records', lambda **kwargs: pytest.fail('cache miss'))
+    assert proxy.fetch_records() == [(1, 'First'), (2, 'Second')]
+    assert proxy.fetch_records_by_ids([2]) == [(2, 'Second')]
+
+def test_pool_reopens_connections_after_fork(tmp_path):
+    import os
+    from api_code import DatabaseManager
+    from group_commit_writer import GroupCommitWriter
+    if not hasattr(os, 'fork'):
+        pytest.skip("needs os.fork")
+    db_file = str(tmp_path / 'fork.db')
+    writer = GroupCommitWriter(db_file)
+    manager = DatabaseManager(db_file, writer=writer)
+    manager.create_table()
+    manager.add_record('Parent')
+    assert manager.fetch_records() == [(1, 'Parent')]
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            # The parent's pooled connection and writer thread are unusable here
+            record_id = manager.submit_write('INSERT INTO records (data) VALUES (?)', ('Child',)).result(5).lastrowid
+            ok = record_id == 2 and manager.fetch_records() == [(1, 'Parent'), (2, 'Child')]
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert manager.fetch_records() == [(1, 'Parent'), (2, 'Child')]
+    writer.close()
+
+def test_group_commit_writer_fails_pending_writes_when_connect_fails(tmp_path):
+    import sqlite3
+    from group_commit_writer import GroupCommitWriter
+    writer = GroupCommitWriter(str(tmp_path / 'missing' / 'writer.db'))
+    first = writer.submit('INSERT INTO records (data) VALUES (?)', ('x',))
+    with pytest.raises(sqlite3.OperationalError):
+        first.result(timeout=5)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.submit('INSERT INTO records (data) VALUES (?)', ('y',)).result(timeout=5)
+    writer.close()
@@ -0,0 +1,159 @@
+# group_commit_writer.py
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from sqlite_profiles import apply_sqlite_profile
+
+WriteResult = namedtuple("WriteResult", ["lastrowid", "rowcount"])
+
+class GroupCommitWriter:
+    def __init__(self, db_name, max_batch=256, max_delay=0.002, busy_timeout=30.0, profile=None):
+        self._db_name = db_name
+        self._profile = profile
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._closed = False
+        self._error = None
+        self._stats = {"writes": 0, "errors": 0, "commits": 0, "largest_batch": 0}
+        # The writer thread starts on the first write in each process: threads
+        # don't survive fork(), so a forked worker starts its own, with a fresh
+        # queue, instead of queueing writes nobody will commit.
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def submit(self, query, params=()):
+        return self._enqueue(query, params, False)
+
+    def submit_many(self, query, seq_of_params):
+        return self._enqueue(query, list(seq_of_params), True)
+
+    def _enqueue(self, query, params, many):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("GroupCommitWriter is closed")
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._error = None
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), name="sqlite-writer", daemon=True)
+                self._thread.start()
+            if self._error is not None:
+                future.set_exception(self._error)
+                return future
+            self._queue.put((future, query, params, many))
+        return future
+
+    def stats(self):
+        return dict(self._stats, queued=self._queue.qsize() if self._pid == os.getpid() else 0)
+
+    def close(self, timeout=None):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._pid != os.getpid():
+                return  # no writer thread in this process
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self, writes):
+        # The writer thread owns the only write connection, so SQLite never
+        # sees two writers contend for the lock. Transactions are managed
+        # explicitly with BEGIN IMMEDIATE/COMMIT around each group.
+        conn = None
+        try:
+            conn = apply_sqlite_profile(sqlite3.connect(self._db_name, isolation_level=None), self._profile)
+            # Queued writes are worth waiting for, so the writer keeps its own,
+            # usually longer, busy timeout instead of the profile's.
+            conn.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout * 1000)}")
+            # A write is acknowledged once its batch commits, so every commit
+            # is synced whatever synchronous level the profile picks for the
+            # other connections.
+            conn.execute("PRAGMA synchronous = FULL")
+        except Exception as e:
+            if conn is not None:
+                conn.close()
+            self._fail_pending(writes, e)
+            return
+        try:
+            stopping = False
+            while not stopping:
+                item = writes.get()
+                if item is None:
+                    break
+                batch = [item]
+                deadline = time.monotonic() + self._max_delay
+                while len(batch) < self._max_batch:
+                    try:
+                        item = writes.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _fail_pending(self, writes, error):
+        # Without a connection nothing can be written, so fail the queued
+        # writes, and any submitted later, instead of leaving them pending.
+        with self._lock:
+            self._error = error
+        while True:
+            try:
+                item = writes.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[0].set_running_or_notify_cancel():
+                self._stats["errors"] += 1
+                item[0].set_exception(error)
+
+    def _commit_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, query, params, many in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                # A savepoint per write lets one bad statement fail on its own
+                # without rolling back the rest of the group.
+                conn.execute("SAVEPOINT write")
+                try:
+                    if many:
+                        cursor = conn.executemany(query, params)
+                        lastrowid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    else:
+                        cursor = conn.execute(query, params)
+                        lastrowid = cursor.lastrowid
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    self._stats["errors"] += 1
+                    future.set_exception(e)
+                else:
+                    conn.execute("RELEASE write")
+                    results.append((future, WriteResult(lastrowid, cursor.rowcount)))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, *_ in batch:
+                if not future.done():
+                    self._stats["errors"] += 1
+                    future.set_exception(e)
+            return
+        self._stats["writes"] += len(results)
+        self._stats["commits"] += 1
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+        for future, result in results:
+            future.set_result(result)
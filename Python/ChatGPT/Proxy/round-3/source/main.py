@@ -1,37 +1,314 @@
-import sqlite3
+import csv
+import io
+import json
 import logging
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+from functools import lru_cache
+from bulk import BulkRows
+from connection_pool import ConnectionPool
+from metrics import Metrics
+from pagination import keyset_query, MAX_PAGE_SIZE, PAGE_ARGS, parse_page_args, build_page, first_page
 
 class DatabaseProxy:
-    def __init__(self, database_manager):
+    def __init__(self, database_manager, query_cache=None, metrics=None, advisor=None):
         self._database_manager = database_manager
+        self._query_cache = query_cache
+        self.metrics = metrics if metrics is not None else Metrics()
+        # An IndexAdvisor, if given, sees every statement run through the proxy.
+        self.advisor = advisor
 
     def execute(self, query, params=None):
-        logging.info(f"Executing query: {query} | Params: {params}")
-        result = self._database_manager.execute(query, params)
-        logging.info(f"Query Result: {result}")
+        logging.info("Executing query: %s | Params: %s", query, params)
+        # execute() hands back lastrowid rather than a rowcount, so single
+        # statements are timed but add no rows.
+        with self.metrics.track(*query_labels(query)):
+            try:
+                result = self._database_manager.execute(query, params)
+            finally:
+                # Invalidate after the write (even a failed one) so a read that
+                # overlapped it cannot re-cache the old rows.
+                if self._query_cache is not None:
+                    self._query_cache.invalidate(query)
+        if self.advisor is not None:
+            self.advisor.record(query, params)
+        logging.info("Query Result: %s", result)
+        return result
+
+    def executemany(self, query, seq_of_params, chunk_size=500):
+        logging.info("Executing query in bulk: %s", query)
+        with self.metrics.track(*query_labels(query)) as sample:
+            try:
+                result = self._database_manager.executemany(query, seq_of_params, chunk_size)
+            finally:
+                if self._query_cache is not None:
+                    self._query_cache.invalidate(query)
+            sample["rows"] = len(result)
+        logging.info("Bulk Query Result: %s rows", len(result))
         return result
 
     def fetchall(self, query, params=None):
-        logging.info(f"Fetching all records with query: {query} | Params: {params}")
-        result = self._database_manager.fetchall(query, params)
-        logging.info(f"Fetch All Result: {result}")
+        logging.info("Fetching all records with query: %s | Params: %s", query, params)
+        with self.metrics.track(*query_labels(query)) as sample:
+            if self._query_cache is not None:
+                result = self._query_cache.get_or_load("all", query, params, self._database_manager.fetchall)
+            else:
+                result = self._database_manager.fetchall(query, params)
+            sample["rows"] = len(result)
+        if self.advisor is not None:
+            self.advisor.record(query, params)
+        # Result sets can be large; they are only formatted when DEBUG is on.
+        logging.debug("Fetch All Result: %s", result)
+        logging.info("Fetch All Result: %s rows", len(result))
         return result
 
     def fetchone(self, query, params=None):
-        logging.info(f"Fetching one record with query: {query} | Params: {params}")
-        result = self._database_manager.fetchone(query, params)
-        logging.info(f"Fetch One Result: {result}")
+        logging.info("Fetching one record with query: %s | Params: %s", query, params)
+        with self.metrics.track(*query_labels(query)) as sample:
+            if self._query_cache is not None:
+                result = self._query_cache.get_or_load("one", query, params, self._database_manager.fetchone)
+            else:
+                result = self._database_manager.fetchone(query, params)
+            sample["rows"] = int(result is not None)
+        if self.advisor is not None:
+            self.advisor.record(query, params)
+        logging.info("Fetch One Result: %s", result)
         return result
 
+    def cache_stats(self):
+        return self._query_cache.stats() if self._query_cache is not None else None
+
+    def iter_records(self, query="SELECT * FROM records ORDER BY id", params=None, batch_size=500):
+        logging.info(f"Streaming records with query: {query} | Params: {params}")
+        return self._database_manager.iterate(query, params, batch_size)
+
+    def pool_stats(self):
+        return self._database_manager.pool_stats()
+
+    def index_ddl(self, limit=None):
+        if self.advisor is None:
+            return []
+        with self._database_manager.connect() as conn:
+            return self.advisor.ddl(conn, limit)
+
+
+QueryInfo = namedtuple("QueryInfo", ["normalized", "kind", "tables", "cacheable"])
+
+STRING_LITERAL = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+TABLE_KEYWORD = re.compile(r"\b(?:from|join|into|update(?:\s+or\s+\w+)?)\s+")
+TABLE_NAME = re.compile(r'\s*("[^"]*"|`[^`]*`|\[[^\]]*\]|[\w.]+)(?:\s+(?:as\s+)?\w+)?\s*(,)?')
+IDENTIFIER = re.compile(r'"([^"]*)"|`([^`]*)`|\[([^\]]*)\]|([a-z_]\w*)')
+WRITE_KEYWORD = re.compile(r"\b(?:insert|update|delete|replace)\b")
+# Results of these change without any write, so queries using them are never cached.
+VOLATILE_FUNCTION = re.compile(
+    r"\b(?:random|randomblob|date|time|datetime|julianday|unixepoch|strftime|"
+    r"changes|total_changes|last_insert_rowid)\s*\(|\bcurrent_(?:date|time|timestamp)\b")
+# executemany() works out the ids of the rows it inserted, which only holds
+# when every parameter set inserts exactly one row: no OR IGNORE, upserts or
+# INSERT ... SELECT.
+PLAIN_INSERT = re.compile(r"insert into [^\s(]+ ?(?:\([^()]*\) ?)?values ?\((?:[^()]|\([^()]*\))*\)")
+
+
+def referenced_tables(normalized):
+    # Tables a write statement touches.
+    tables = set()
+    for keyword in TABLE_KEYWORD.finditer(normalized):
+        position = keyword.end()
+        # Walk comma-separated table lists (FROM a, b); subqueries are picked
+        # up by their own FROM.
+        while not normalized.startswith("(", position):
+            match = TABLE_NAME.match(normalized, position)
+            if not match:
+                break
+            tables.add(match.group(1).strip('"`[]').split(".")[-1].lower())
+            if not match.group(2):
+                break
+            position = match.end()
+    return frozenset(tables)
+
+
+def read_dependencies(normalized):
+    # Every identifier in a read counts as a possible table. Columns and
+    # aliases only cost an occasional extra invalidation, while a missed
+    # table (odd join syntax, subqueries) would serve stale rows. Writes made
+    # through views, triggers or cascades are not visible here; call
+    # QueryCache.clear() after those.
+    without_literals = re.sub(r"'(?:[^']|'')*'", "", normalized)
+    return frozenset(
+        next(group for group in match.groups() if group is not None).lower()
+        for match in IDENTIFIER.finditer(without_literals)
+    )
+
+
+@lru_cache(maxsize=1024)
+def analyze_query(query):
+    # Lower-case and collapse whitespace outside string literals, so queries
+    # that only differ in formatting share a cache entry.
+    parts = STRING_LITERAL.split(query.strip().rstrip(";"))
+    normalized = "".join(
+        part if index % 2 else re.sub(r"\s+", " ", part.lower())
+        for index, part in enumerate(parts)
+    ).strip()
+    first_word = normalized.split(" ", 1)[0]
+    if first_word in ("select", "values") or (first_word == "with" and not WRITE_KEYWORD.search(normalized)):
+        kind = "read"
+    elif first_word in ("insert", "update", "delete", "replace", "with"):
+        kind = "write"
+    else:
+        kind = "ddl"
+    tables = read_dependencies(normalized) if kind == "read" else referenced_tables(normalized)
+    cacheable = kind == "read" and not VOLATILE_FUNCTION.search(normalized)
+    return QueryInfo(normalized, kind, tables, cacheable)
+
+
+METRIC_OPERATIONS = frozenset({"select", "insert", "update", "delete", "replace", "with", "values",
+                               "create", "drop", "alter"})
+
+
+@lru_cache(maxsize=1024)
+def query_labels(query):
+    # (operation, table) labels for Metrics. Labels use the tables named after
+    # FROM/JOIN/INTO/UPDATE, not the identifier superset reads are cached
+    # under, to keep the number of series small.
+    normalized = analyze_query(query).normalized
+    operation = normalized.split(" ", 1)[0]
+    tables = ",".join(sorted(referenced_tables(normalized)))
+    return (operation if operation in METRIC_OPERATIONS else "other"), tables or "none"
+
+
+class QueryCache:
+    def __init__(self, max_entries=1024, max_rows=100_000):
+        self._max_entries = max_entries
+        self._max_rows = max_rows
+        # key -> (result, tables, rows). Keys are (kind, normalized SQL, params).
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._rows = 0
+        # Bumped on every invalidation; a load that started before the bump
+        # may hold pre-write rows and is not stored.
+        self._version = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "uncacheable": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _freeze(params):
+        if params is None:
+            return ()
+        if isinstance(params, dict):
+            return tuple(sorted(params.items()))
+        return tuple(params)
+
+    def get_or_load(self, kind, query, params, loader):
+        info = analyze_query(query)
+        key = None
+        if info.cacheable:
+            try:
+                key = (kind, info.normalized, self._freeze(params))
+                hash(key)
+            except TypeError:
+                key = None
+        if key is None:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return loader(query, params)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return list(entry[0]) if kind == "all" else entry[0]
+            self._stats["misses"] += 1
+            version = self._version
+
+        result = loader(query, params)
+        rows = len(result) if kind == "all" else 1
+        with self._lock:
+            if self._version == version and rows <= self._max_rows:
+                self._store(key, result, info.tables, rows)
+        return list(result) if kind == "all" else result
+
+    def _store(self, key, result, tables, rows):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (result, tables, rows)
+        self._rows += rows
+        for table in tables:
+            self._by_table.setdefault(table, set()).add(key)
+        while len(self._entries) > self._max_entries or self._rows > self._max_rows:
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        _, tables, rows = self._entries.pop(key)
+        self._rows -= rows
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def invalidate(self, query):
+        info = analyze_query(query)
+        if info.kind == "read":
+            return
+        with self._lock:
+            self._version += 1
+            if info.kind == "ddl" or not info.tables:
+                # Schema changes (or statements we cannot attribute to a
+                # table) may affect any cached result.
+                self._stats["invalidations"] += len(self._entries)
+                self._entries.clear()
+                self._by_table.clear()
+                self._rows = 0
+                return
+            for table in info.tables:
+                for key in list(self._by_table.get(table, ())):
+                    self._remove(key)
+                    self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._by_table.clear()
+            self._rows = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(self._stats, entries=len(self._entries), rows=self._rows,
+                        hit_rate=self._stats["hits"] / lookups if lookups else 0.0)
+
 
 class DatabaseManager:
-    def __init__(self, db_name="database.db"):
+    def __init__(self, db_name="database.db", pool=None, writer=None, profile=None):
         self._db_name = db_name
+        self._pool = pool or ConnectionPool(db_name, profile=profile)
+        self._writer = writer
 
     def connect(self):
-        return sqlite3.connect(self._db_name)
+        return self._pool.connection()
+
+    def pool_stats(self):
+        return self._pool.stats()
+
+    def submit(self, query, params=None):
+        if self._writer is not None:
+            return self._writer.submit(query, params or ())
+        future = Future()
+        try:
+            future.set_result(self.execute(query, params))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
     def execute(self, query, params=None):
+        if self._writer is not None:
+            return self._writer.submit(query, params or ()).result().lastrowid
         with self.connect() as conn:
             cursor = conn.cursor()
             if params:
@@ -41,6 +318,28 @@ class DatabaseManager:
             conn.commit()
             return cursor.lastrowid
 
+    def executemany(self, query, seq_of_params, chunk_size=500):
+        if not PLAIN_INSERT.fullmatch(analyze_query(query).normalized):
+            raise ValueError("executemany() only runs plain INSERT ... VALUES statements")
+        rows = list(seq_of_params)
+        chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+        ids = []
+        if self._writer is not None:
+            for future in [self._writer.submit_many(query, chunk) for chunk in chunks]:
+                result = future.result()
+                ids.extend(range(result.lastrowid - result.rowcount + 1, result.lastrowid + 1))
+            return ids
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            for chunk in chunks:
+                cursor.executemany(query, chunk)
+                # The chunk holds the write lock, so its rows get consecutive
+                # rowids ending at last_insert_rowid().
+                last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+                ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
+            conn.commit()
+        return ids
+
     def fetchall(self, query, params=None):
         with self.connect() as conn:
             cursor = conn.cursor()
@@ -50,6 +349,19 @@ class DatabaseManager:
                 cursor.execute(query)
             return cursor.fetchall()
 
+    def iterate(self, query, params=None, batch_size=500):
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params or ())
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
     def fetchone(self, query, params=None):
         with self.connect() as conn:
             cursor = conn.cursor()
@@ -60,10 +372,38 @@ class DatabaseManager:
             return cursor.fetchone()
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 
 app = Flask(__name__)
 
+EXPORT_COLUMNS = ('id', 'name', 'value')
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def export_chunks(records, fmt, chunk_rows=500):
+    # Rows are serialized into one buffer and flushed every chunk_rows rows,
+    # so memory stays flat while the response avoids a write per row.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    try:
+        for count, record in enumerate(records, 1):
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, record))))
+                buffer.write('\n')
+            if count % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # Closing the response (including on client disconnect) closes this
+        # generator, which stops the cursor and releases its connection.
+        records.close()
+
 # Initialize the DatabaseManager and Proxy
 db_manager = DatabaseManager()
 db_proxy = DatabaseProxy(db_manager)
@@ -89,12 +429,52 @@ def create_record():
     record_id = db_proxy.execute(query, params)
     return jsonify({"id": record_id}), 201
 
+def name_value_row(item):
+    if not isinstance(item, dict) or item.get('name') is None or item.get('value') is None:
+        raise ValueError("name and value are required")
+    return (item['name'], item['value'])
+
+# POST /create/bulk
+@app.route('/create/bulk', methods=['POST'])
+def create_records_bulk():
+    items = request.json
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON array of records"}), 400
+    batch = BulkRows(items, name_value_row)
+    query = "INSERT INTO records (name, value) VALUES (?, ?)"
+    ids, errors = batch.assign(db_proxy.executemany(query, batch.rows))
+    return jsonify({"ids": ids, "errors": errors}), 201
+
 # GET /read
 @app.route('/read', methods=['GET'])
 def read_records():
-    query = "SELECT * FROM records"
-    records = db_proxy.fetchall(query)
-    return jsonify(records), 200
+    if not PAGE_ARGS.intersection(request.args):
+        query, params, _ = keyset_query(MAX_PAGE_SIZE + 1)
+        records, headers = first_page(db_proxy.fetchall(query, params))
+        return jsonify(records), 200, headers
+    try:
+        limit, after, before = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    query, params, backward = keyset_query(limit + 1, after, before)
+    records = db_proxy.fetchall(query, params)
+    if backward:
+        records = records[::-1]
+    return jsonify(build_page(records, limit, after, before)), 200
+
+# GET /export
+@app.route('/export', methods=['GET'])
+def export():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    headers = {'Content-Disposition': f'attachment; filename=records.{fmt}'}
+    return Response(export_chunks(db_proxy.iter_records(), fmt), mimetype=EXPORT_MIMETYPES[fmt], headers=headers)
+
+# GET /metrics
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(db_proxy.metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 # PUT /update/<int:id>
 @app.route('/update/<int:id>', methods=['PUT'])
@@ -0,0 +1,96 @@
+# metrics.py
+# Prometheus-style metrics for DatabaseProxy: per-operation latency
+# histograms, row and error counters, and in-flight gauges.
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Metrics:
+    def __init__(self, buckets=LATENCY_BUCKETS, prefix="db_proxy"):
+        self._buckets = tuple(buckets)
+        self._prefix = prefix
+        self._lock = threading.Lock()
+        # Every series is keyed by (operation, table). Histograms hold
+        # per-bucket counts (made cumulative when rendered) and the sum.
+        self._histograms = {}
+        self._rows = {}
+        self._errors = {}
+        self._in_flight = {}
+
+    @contextmanager
+    def track(self, operation, table):
+        labels = (operation, table)
+        sample = {"rows": 0}
+        with self._lock:
+            self._in_flight[labels] = self._in_flight.get(labels, 0) + 1
+        failed = False
+        start = time.perf_counter()
+        try:
+            yield sample
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            bucket = bisect.bisect_left(self._buckets, elapsed)
+            with self._lock:
+                self._in_flight[labels] -= 1
+                histogram = self._histograms.get(labels)
+                if histogram is None:
+                    histogram = self._histograms[labels] = [[0] * (len(self._buckets) + 1), 0.0]
+                histogram[0][bucket] += 1
+                histogram[1] += elapsed
+                self._rows[labels] = self._rows.get(labels, 0) + sample["rows"]
+                if failed:
+                    self._errors[labels] = self._errors.get(labels, 0) + 1
+
+    @staticmethod
+    def _labels(labels):
+        operation, table = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                            for value in labels)
+        return f'operation="{operation}",table="{table}"'
+
+    def render(self):
+        with self._lock:
+            histograms = {labels: (list(counts), total) for labels, (counts, total) in self._histograms.items()}
+            rows, errors, in_flight = dict(self._rows), dict(self._errors), dict(self._in_flight)
+        name = self._prefix
+        bounds = [repr(bound) for bound in self._buckets] + ["+Inf"]
+        lines = [f"# HELP {name}_duration_seconds Latency of proxy operations.",
+                 f"# TYPE {name}_duration_seconds histogram"]
+        for labels, (counts, total) in sorted(histograms.items()):
+            label_text = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'{name}_duration_seconds_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_duration_seconds_sum{{{label_text}}} {total}")
+            lines.append(f"{name}_duration_seconds_count{{{label_text}}} {cumulative}")
+        for metric, kind, help_text, values in (
+            ("rows_total", "counter", "Rows returned or written by proxy operations.", rows),
+            ("errors_total", "counter", "Proxy operations that raised.", errors),
+            ("in_flight", "gauge", "Proxy operations currently running.", in_flight),
+        ):
+            lines.append(f"# HELP {name}_{metric} {help_text}")
+            lines.append(f"# TYPE {name}_{metric} {kind}")
+            for labels in sorted(set(histograms) | set(values)):
+                lines.append(f"{name}_{metric}{{{self._labels(labels)}}} {values.get(labels, 0)}")
+        return "\n".join(lines) + "\n"
+
+def instrumented(operation, table="records", rows=None):
+    # Records latency, rows (counted from the result by ``rows``), errors and
+    # in-flight calls for a proxy method under the given labels.
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.track(operation, table) as sample:
+                result = method(self, *args, **kwargs)
+                if rows is not None:
+                    sample["rows"] = rows(result)
+            return result
+        return wrapper
+    return decorator
\ No newline at end of file
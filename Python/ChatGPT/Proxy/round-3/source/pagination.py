@@ -0,0 +1,72 @@
+# pagination.py
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+PAGE_ARGS = {'limit', 'after', 'before'}
+
+def keyset_query(limit=None, after=None, before=None):
+    conditions, params = [], []
+    if after is not None:
+        conditions.append('id > ?')
+        params.append(after)
+    if before is not None:
+        conditions.append('id < ?')
+        params.append(before)
+    query = 'SELECT * FROM records'
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    # Paging backwards from a cursor walks the index in reverse; the caller
+    # flips the rows back into ascending order.
+    backward = before is not None and after is None
+    query += ' ORDER BY id DESC' if backward else ' ORDER BY id'
+    if limit is not None:
+        query += ' LIMIT ?'
+        params.append(limit)
+    return query, tuple(params), backward
+
+def encode_cursor(record_id):
+    return base64.urlsafe_b64encode(json.dumps({'id': record_id}).encode()).decode()
+
+def decode_cursor(token):
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(token.encode()))['id'])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid cursor: {token}")
+
+def parse_page_args(args):
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    limit = min(limit, MAX_PAGE_SIZE)
+    after = decode_cursor(args['after']) if args.get('after') else None
+    before = decode_cursor(args['before']) if args.get('before') else None
+    return limit, after, before
+
+def build_page(records, limit, after, before):
+    # records were fetched with limit + 1 so the extra row tells us whether
+    # another page exists in the direction we were reading.
+    backward = before is not None and after is None
+    has_more = len(records) > limit
+    if has_more:
+        records = records[1:] if backward else records[:limit]
+    if backward:
+        prev_cursor = encode_cursor(records[0][0]) if has_more and records else None
+        next_cursor = encode_cursor(records[-1][0]) if records else None
+    else:
+        prev_cursor = encode_cursor(records[0][0]) if after is not None and records else None
+        next_cursor = encode_cursor(records[-1][0]) if has_more else None
+    return {'records': records, 'next': next_cursor, 'prev': prev_cursor}
+
+def first_page(records):
+    # /read without page args keeps its plain list response but stops at
+    # MAX_PAGE_SIZE rows instead of dumping the table. records were fetched
+    # with MAX_PAGE_SIZE + 1; if there are more, a Link header points at them.
+    if len(records) <= MAX_PAGE_SIZE:
+        return records, {}
+    records = records[:MAX_PAGE_SIZE]
+    return records, {'Link': f'</read?after={encode_cursor(records[-1][0])}>; rel="next"'}
@@ -1,3 +1,5 @@
+import json
+import time
 import pytest
 from app import app, db_manager, db_proxy
 
@@ -94,3 +96,168 @@ def test_proxy_logging_and_execution(client, caplog):
         result = db_proxy.fetchone("SELECT * FROM records WHERE name = ?", ('Test',))
         assert 'Fetching one record with query' in caplog.text
         assert result[1] == 'Test'
+
+def test_read_paginated(client):
+    for i in range(5):
+        client.post('/create', json={'name': f'Name {i}', 'value': f'Value {i}'})
+
+    response = client.get('/read?limit=2')
+    assert response.status_code == 200
+    page = response.get_json()
+    assert [row[1] for row in page['records']] == ['Name 0', 'Name 1']
+    assert page['prev'] is None
+
+    seen = [row[0] for row in page['records']]
+    while page['next']:
+        page = client.get(f"/read?limit=2&after={page['next']}").get_json()
+        seen.extend(row[0] for row in page['records'])
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+    page = client.get(f"/read?limit=2&before={page['prev']}").get_json()
+    assert [row[1] for row in page['records']] == ['Name 2', 'Name 3']
+
+def test_read_without_page_args_is_capped(client):
+    from pagination import MAX_PAGE_SIZE, decode_cursor
+    items = [{'name': f'Name {i}', 'value': 'Value'} for i in range(MAX_PAGE_SIZE + 5)]
+    client.post('/create/bulk', json=items)
+
+    response = client.get('/read')
+    assert response.status_code == 200
+    records = response.get_json()
+    assert len(records) == MAX_PAGE_SIZE
+    link = response.headers['Link']
+    assert link.endswith('>; rel="next"')
+    assert decode_cursor(link[len('</read?after='):link.index('>')]) == records[-1][0]
+    assert len(client.get(link[1:link.index('>')]).get_json()['records']) == 5
+
+def test_read_invalid_cursor(client):
+    response = client.get('/read?after=not-a-cursor')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_export_ndjson_and_csv(client):
+    client.post('/create', json={'name': 'Alice', 'value': 'Wonderland'})
+    client.post('/create', json={'name': 'Bob', 'value': 'Builder'})
+
+    response = client.get('/export')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert json.loads(lines[0]) == {'id': 1, 'name': 'Alice', 'value': 'Wonderland'}
+    assert len(lines) == 2
+
+    response = client.get('/export?format=csv')
+    assert response.mimetype == 'text/csv'
+    assert response.get_data(as_text=True).splitlines() == ['id,name,value', '1,Alice,Wonderland', '2,Bob,Builder']
+
+    assert client.get('/export?format=xml').status_code == 400
+
+def test_query_cache_invalidated_by_writes(client, monkeypatch):
+    from app import DatabaseProxy, QueryCache
+    cache = QueryCache()
+    proxy = DatabaseProxy(db_manager, query_cache=cache)
+    proxy.execute("INSERT INTO records (name, value) VALUES (?, ?)", ("Alice", "Wonderland"))
+
+    calls = []
+    fetchall = db_manager.fetchall
+    monkeypatch.setattr(db_manager, 'fetchall', lambda query, params=None: calls.append(query) or fetchall(query, params))
+
+    assert proxy.fetchall("SELECT * FROM records") == [(1, "Alice", "Wonderland")]
+    # Formatting differences normalize to the same entry
+    assert proxy.fetchall("select *\n  FROM records;") == [(1, "Alice", "Wonderland")]
+    assert len(calls) == 1
+
+    proxy.execute("UPDATE records SET value = ? WHERE id = ?", ("Updated", 1))
+    assert proxy.fetchall("SELECT * FROM records") == [(1, "Alice", "Updated")]
+    assert len(calls) == 2
+
+    stats = proxy.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 1
+
+def test_executemany_only_runs_plain_inserts(client):
+    ids = db_proxy.executemany("INSERT INTO records (name, value) VALUES (?, ?)", [("Alice", "1"), ("Bob", "2")])
+    assert [row[0] for row in db_proxy.fetchall("SELECT * FROM records")] == ids
+    for query in ("INSERT OR IGNORE INTO records (name, value) VALUES (?, ?)",
+                  "UPDATE records SET value = ? WHERE name = ?"):
+        with pytest.raises(ValueError):
+            db_proxy.executemany(query, [("x", "Alice")])
+
+def test_metrics_labels(client):
+    from app import DatabaseProxy, Metrics
+    proxy = DatabaseProxy(db_manager, metrics=Metrics())
+    proxy.executemany("INSERT INTO records (name, value) VALUES (?, ?)", [("Alice", "1"), ("Bob", "2")])
+    proxy.fetchall("SELECT * FROM records r JOIN records s ON r.id = s.id")
+    with pytest.raises(Exception):
+        proxy.fetchall("SELECT * FROM missing")
+    text = proxy.metrics.render()
+    assert 'db_proxy_rows_total{operation="insert",table="records"} 2' in text
+    assert 'db_proxy_rows_total{operation="select",table="records"} 2' in text
+    assert 'db_proxy_errors_total{operation="select",table="missing"} 1' in text
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+def test_proxy_index_advisor(client):
+    from app import DatabaseProxy
+    from index_advisor import IndexAdvisor
+    proxy = DatabaseProxy(db_manager, advisor=IndexAdvisor())
+    proxy.executemany("INSERT INTO records (name, value) VALUES (?, ?)", [(f"name {i}", str(i)) for i in range(20)])
+    for i in range(5):
+        proxy.fetchall("SELECT * FROM records WHERE name = ?", (f"name {i}",))
+    proxy.fetchone("SELECT * FROM records WHERE id = ?", (1,))
+    assert proxy.index_ddl() == ["CREATE INDEX IF NOT EXISTS idx_records_name ON records (name)"]
+    assert DatabaseProxy(db_manager).index_ddl() == []
+
+def test_pool_times_out_when_exhausted(tmp_path):
+    from connection_pool import ConnectionPool, PoolTimeout
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), min_size=0, max_size=1)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.05)
+    pool.release(conn)
+    assert pool.acquire(timeout=0.05) is conn
+    stats = pool.stats()
+    assert (stats['timeouts'], stats['waits'], stats['hits'], stats['misses']) == (1, 1, 1, 1)
+    pool.close()
+
+def test_pool_reaps_idle_connections_down_to_min_size(tmp_path):
+    from connection_pool import ConnectionPool
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), min_size=1, max_size=3, max_idle=0.01)
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+    assert pool.stats()['idle'] == 3
+    time.sleep(0.05)
+    assert pool.reap_idle() == 2
+    assert pool.stats()['size'] == 1
+    pool.close()
+
+def test_pool_replaces_connections_that_fail_the_health_check(tmp_path):
+    from connection_pool import ConnectionPool
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), min_size=0, max_size=1, health_check_after=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()  # dies while idle, e.g. closed under the pool
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert replacement.execute('SELECT 1').fetchone() == (1,)
+    assert pool.stats()['discarded'] == 1
+    pool.release(replacement)
+    pool.close()
+
+def test_database_manager_with_group_commit_writer(tmp_path):
+    from app import DatabaseManager
+    from group_commit_writer import GroupCommitWriter
+    db_file = str(tmp_path / 'writer.db')
+    writer = GroupCommitWriter(db_file)
+    # The writer thread starts on the first write, in the process making it
+    assert writer._thread is None
+    manager = DatabaseManager(db_file, writer=writer)
+    manager.execute("CREATE TABLE records (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, value TEXT)")
+    assert manager.execute("INSERT INTO records (name, value) VALUES (?, ?)", ("Alice", "1")) == 1
+    assert manager.executemany("INSERT INTO records (name, value) VALUES (?, ?)", [("Bob", "2"), ("Carol", "3")]) == [2, 3]
+    assert manager.fetchall("SELECT name FROM records ORDER BY id") == [("Alice",), ("Bob",), ("Carol",)]
+    writer.close()
@@ -1,6 +1,15 @@
+import gzip
+import json
+import os
+import re
 import sqlite3
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
 # Step 2: Create the main interface (Subject) for basic CRUD operations
 class DatabaseInterface(ABC):
@@ -20,97 +29,652 @@ class DatabaseInterface(ABC):
     def delete(self, table: str, id: int) -> bool:
         pass
 
+    def read_many(self, table: str, ids: List[int]) -> List[Dict[str, Any]]:
+        return [self.read(table, id) for id in ids]
+
+# Generated SQL for the dynamic CRUD statements, memoized per
+# (operation, table, columns). Table and column names are validated once, when
+# a statement is first built, and hits/misses show how often SQL is reused.
+class StatementCache:
+    IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+    BUILDERS = {
+        "insert": lambda table, columns: (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"),
+        "select": lambda table, columns: f"SELECT * FROM {table} WHERE id = ?",
+        "update": lambda table, columns: (
+            f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"),
+        "delete": lambda table, columns: f"DELETE FROM {table} WHERE id = ?",
+    }
+
+    def __init__(self, max_statements: int = 256):
+        self.max_statements = max_statements
+        self._statements: "OrderedDict[Tuple[str, str, Tuple[str, ...]], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def validate(self, *names: str) -> None:
+        for name in names:
+            if not self.IDENTIFIER.match(name):
+                raise ValueError(f"Invalid SQL identifier: {name!r}")
+
+    def get(self, op: str, table: str, columns: Tuple[str, ...] = ()) -> str:
+        key = (op, table, columns)
+        with self._lock:
+            query = self._statements.get(key)
+            if query is not None:
+                self._statements.move_to_end(key)
+                self.hits += 1
+                return query
+            self.misses += 1
+        self.validate(table, *columns)
+        query = self.BUILDERS[op](table, columns)
+        with self._lock:
+            self._statements[key] = query
+            while len(self._statements) > self.max_statements:
+                self._statements.popitem(last=False)
+        return query
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "statements": len(self._statements),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
 # Step 3: Implement a RealSubject class
 class RealDatabase(DatabaseInterface):
-    def __init__(self, db_name: str):
+    # Stay under SQLITE_MAX_VARIABLE_NUMBER, which is 999 on older builds
+    MAX_VARIABLES = 900
+
+    def __init__(self, db_name: str, statements: Optional[StatementCache] = None):
         self.db_name = db_name
         self.connection = None
+        self.statements = statements if statements is not None else StatementCache()
+        # The proxy refreshes cache entries from worker threads, so the
+        # connection is shared across threads, one operation at a time.
+        self._lock = threading.RLock()
 
     def connect(self):
-        if not self.connection:
-            self.connection = sqlite3.connect(self.db_name)
-        return self.connection
+        with self._lock:
+            if not self.connection:
+                # Size sqlite3's prepared-statement cache to hold every generated
+                # statement, so memoized SQL also skips re-preparing.
+                self.connection = sqlite3.connect(self.db_name, check_same_thread=False,
+                                                  cached_statements=self.statements.max_statements)
+            return self.connection
 
     def close(self):
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        with self._lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
 
     def create(self, table: str, data: Dict[str, Any]) -> int:
-        conn = self.connect()
-        cursor = conn.cursor()
-        columns = ', '.join(data.keys())
-        placeholders = ', '.join(['?' for _ in data])
-        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-        cursor.execute(query, list(data.values()))
-        conn.commit()
-        return cursor.lastrowid
+        # Sorting the columns lets dicts with the same keys share one statement.
+        columns = tuple(sorted(data))
+        query = self.statements.get("insert", table, columns)
+        with self._lock:
+            conn = self.connect()
+            cursor = conn.cursor()
+            cursor.execute(query, [data[column] for column in columns])
+            conn.commit()
+            return cursor.lastrowid
 
     def read(self, table: str, id: int) -> Dict[str, Any]:
-        conn = self.connect()
-        cursor = conn.cursor()
-        query = f"SELECT * FROM {table} WHERE id = ?"
-        cursor.execute(query, (id,))
-        result = cursor.fetchone()
+        query = self.statements.get("select", table)
+        with self._lock:
+            cursor = self.connect().cursor()
+            cursor.execute(query, (id,))
+            result = cursor.fetchone()
         if result:
             columns = [description[0] for description in cursor.description]
             return dict(zip(columns, result))
         return {}
 
+    def read_many(self, table: str, ids: List[int]) -> List[Dict[str, Any]]:
+        self.statements.validate(table)
+        rows = {}
+        unique_ids = list(dict.fromkeys(ids))
+        with self._lock:
+            cursor = self.connect().cursor()
+            for start in range(0, len(unique_ids), self.MAX_VARIABLES):
+                chunk = unique_ids[start:start + self.MAX_VARIABLES]
+                placeholders = ', '.join(['?' for _ in chunk])
+                query = f"SELECT * FROM {table} WHERE id IN ({placeholders})"
+                cursor.execute(query, chunk)
+                columns = [description[0] for description in cursor.description]
+                for result in cursor.fetchall():
+                    row = dict(zip(columns, result))
+                    rows[row["id"]] = row
+        return [dict(rows[id]) if id in rows else {} for id in ids]
+
+    def query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+        # Arbitrary read-only SQL (e.g. a "top N" query used to warm the cache)
+        with self._lock:
+            cursor = self.connect().cursor()
+            cursor.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, result)) for result in cursor.fetchall()]
+
     def update(self, table: str, id: int, data: Dict[str, Any]) -> bool:
-        conn = self.connect()
-        cursor = conn.cursor()
-        set_clause = ', '.join([f"{key} = ?" for key in data.keys()])
-        query = f"UPDATE {table} SET {set_clause} WHERE id = ?"
-        values = list(data.values()) + [id]
-        cursor.execute(query, values)
-        conn.commit()
-        return cursor.rowcount > 0
+        columns = tuple(sorted(data))
+        query = self.statements.get("update", table, columns)
+        values = [data[column] for column in columns] + [id]
+        with self._lock:
+            conn = self.connect()
+            cursor = conn.cursor()
+            cursor.execute(query, values)
+            conn.commit()
+            return cursor.rowcount > 0
 
     def delete(self, table: str, id: int) -> bool:
-        conn = self.connect()
-        cursor = conn.cursor()
-        query = f"DELETE FROM {table} WHERE id = ?"
-        cursor.execute(query, (id,))
-        conn.commit()
-        return cursor.rowcount > 0
+        query = self.statements.get("delete", table)
+        with self._lock:
+            conn = self.connect()
+            cursor = conn.cursor()
+            cursor.execute(query, (id,))
+            conn.commit()
+            return cursor.rowcount > 0
+
+# LRU cache for the Proxy, bounded by entry count and estimated size, with
+# per-table TTLs. Keys use the proxy's f"{table}_{id}" format, which is how
+# the table-specific TTL is looked up.
+#
+# The TTL is a hard limit: past it an entry is gone. An optional soft TTL marks
+# the point after which the entry is still served but lookup() reports it due
+# for a refresh, and refresh_ahead (a fraction of the soft TTL, or of the TTL
+# when there is no soft one) moves that point earlier, so entries read often
+# are reloaded before they ever go stale.
+class BoundedCache:
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: Optional[float] = None, table_ttls: Optional[Dict[str, float]] = None,
+                 default_soft_ttl: Optional[float] = None, table_soft_ttls: Optional[Dict[str, float]] = None,
+                 refresh_ahead: Optional[float] = None):
+        if refresh_ahead is not None and not 0 < refresh_ahead < 1:
+            raise ValueError("refresh_ahead must be between 0 and 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.table_ttls = dict(table_ttls or {})
+        self.default_soft_ttl = default_soft_ttl
+        self.table_soft_ttls = dict(table_soft_ttls or {})
+        self.refresh_ahead = refresh_ahead
+        # key -> (value, size in bytes, expiry and refresh-due times as
+        # time.monotonic() or None)
+        self._entries: "OrderedDict[str, Tuple[Any, int, Optional[float], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    @staticmethod
+    def estimate_size(key: str, value: Any) -> int:
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, dict):
+            for k, v in value.items():
+                size += sys.getsizeof(k) + sys.getsizeof(v)
+        return size
+
+    def _ttl_for(self, key: str) -> Optional[float]:
+        table = key.rsplit("_", 1)[0]
+        return self.table_ttls.get(table, self.default_ttl)
+
+    def _refresh_after(self, key: str, ttl: Optional[float]) -> Optional[float]:
+        soft_ttl = self.table_soft_ttls.get(key.rsplit("_", 1)[0], self.default_soft_ttl)
+        base = soft_ttl if soft_ttl is not None else ttl
+        if self.refresh_ahead is not None and base is not None:
+            return self.refresh_ahead * base
+        return soft_ttl
+
+    def _remove(self, key: str) -> None:
+        _, size, _, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def lookup(self, key: str) -> Tuple[Any, bool]:
+        """Returns (value, refresh due), or (None, False) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            value, _, expires_at, refresh_at = entry
+            now = time.monotonic()
+            if expires_at is not None and now >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            due = refresh_at is not None and now >= refresh_at
+            if due:
+                self.stale_hits += 1
+            return value, due
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value, _ = self.lookup(key)
+        return default if value is None else value
+
+    def put(self, key: str, value: Any) -> None:
+        size = self.estimate_size(key, value)
+        ttl = self._ttl_for(key)
+        refresh_after = self._refresh_after(key, ttl)
+        now = time.monotonic()
+        expires_at = now + ttl if ttl is not None else None
+        refresh_at = now + refresh_after if refresh_after is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expires_at, refresh_at)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key][0]
+            self._remove(key)
+            return value
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Unexpired (key, value) pairs, least recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (value, _, expires_at, _) in self._entries.items()
+                    if expires_at is None or now < expires_at]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_hits": self.stale_hits,
+            }
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[2] is None or time.monotonic() < entry[2])
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            return self._entries[key][0]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.put(key, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Coalesces concurrent loads of the same key ("single flight"): the first
+# caller runs the load and later callers wait for it, then share its result or
+# its exception. forget() detaches an in-flight load after a write, so its
+# (possibly pre-write) result is not stored and new callers load afresh.
+class SingleFlight:
+    class _Call:
+        __slots__ = ("done", "result", "error", "forgotten")
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error: Optional[BaseException] = None
+            self.forgotten = False
+
+    def __init__(self):
+        self._calls: Dict[str, "SingleFlight._Call"] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.coalesced = 0
+
+    def do(self, key: str, load: Callable[[], Any], store: Optional[Callable[[Any], None]] = None) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+                self.loads += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = load()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                # Under the lock, so a concurrent forget() either happened
+                # before (and we skip the store) or waits until after it.
+                if call.error is None and store is not None and not call.forgotten:
+                    store(call.result)
+            call.done.set()
+        return call.result
+
+    def do_many(self, keys: List[str], load: Callable[[List[str]], Dict[str, Any]],
+                store: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        # do() for a batch: keys nobody is loading yet are loaded together by
+        # one load(keys) call, which returns a value per key; keys already in
+        # flight wait for that load instead.
+        led: Dict[str, "SingleFlight._Call"] = {}
+        joined: Dict[str, "SingleFlight._Call"] = {}
+        with self._lock:
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    led[key] = self._calls[key] = self._Call()
+                    self.loads += 1
+                else:
+                    joined[key] = call
+                    self.coalesced += 1
+        results = {}
+        if led:
+            error: Optional[BaseException] = None
+            try:
+                results = load(list(led))
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                with self._lock:
+                    for key, call in led.items():
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+                        call.error = error
+                        if error is None:
+                            call.result = results.get(key)
+                            if store is not None and not call.forgotten:
+                                store(key, call.result)
+                for call in led.values():
+                    call.done.set()
+        for key, call in joined.items():
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[key] = call.result
+        return results
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            call = self._calls.pop(key, None)
+            if call is not None:
+                call.forgotten = True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "loads": self.loads, "coalesced": self.coalesced}
 
 # Step 4: Develop a Proxy class
 class DatabaseProxy(DatabaseInterface):
-    def __init__(self, real_database: RealDatabase):
+    def __init__(self, real_database: RealDatabase, cache: Optional[BoundedCache] = None,
+                 refresh_workers: int = 2):
         self.real_database = real_database
-        self.cache = {}
+        self.cache = cache if cache is not None else BoundedCache()
+        # Concurrent misses on one key share a single database read.
+        self.flights = SingleFlight()
+        # Entries past their soft TTL are served as-is and reloaded here.
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+        self.refreshes = 0
+        self.refresh_errors = 0
+        # Periodic snapshots, see start_snapshots()
+        self._snapshot_path: Optional[str] = None
+        self._snapshot_limit: Optional[int] = None
+        self._snapshot_stop = threading.Event()
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+    def _invalidate(self, cache_key: str) -> None:
+        # forget() first: a load still in flight then skips its store, and
+        # one that stored before the write is removed by the pop.
+        self.flights.forget(cache_key)
+        self.cache.pop(cache_key, None)
+
+    def _refresh(self, table: str, id: int) -> None:
+        # Writes only carry the changed columns, so re-read the full row
+        # rather than caching the partial ``data`` dict. The re-read is an
+        # ordinary single-flight load, so when two writes race, the one that
+        # finishes second detaches the first one's re-read before it stores.
+        self._invalidate(f"{table}_{id}")
+        self._load(table, id)
 
     def create(self, table: str, data: Dict[str, Any]) -> int:
         print(f"Logging: Creating new record in {table}")
         id = self.real_database.create(table, data)
-        self.cache[f"{table}_{id}"] = data
+        # New rows are cached on first read; drop anything stale under the id.
+        self._invalidate(f"{table}_{id}")
         return id
 
     def read(self, table: str, id: int) -> Dict[str, Any]:
         cache_key = f"{table}_{id}"
-        if cache_key in self.cache:
+        cached, refresh_due = self.cache.lookup(cache_key)
+        if cached is not None:
             print(f"Logging: Reading from cache for {table} with id {id}")
-            return self.cache[cache_key]
-        print(f"Logging: Reading from database for {table} with id {id}")
-        data = self.real_database.read(table, id)
-        self.cache[cache_key] = data
-        return data
+            if refresh_due:
+                self._refresh_in_background(table, id)
+            return dict(cached)
+        return dict(self._load(table, id))
+
+    def _load(self, table: str, id: int) -> Dict[str, Any]:
+        cache_key = f"{table}_{id}"
+
+        def load() -> Dict[str, Any]:
+            print(f"Logging: Reading from database for {table} with id {id}")
+            return self.real_database.read(table, id)
+
+        def store(data: Dict[str, Any]) -> None:
+            if data:
+                self.cache.put(cache_key, data)
+            else:
+                self.cache.pop(cache_key, None)
+
+        return self.flights.do(cache_key, load, store)
+
+    def _refresh_in_background(self, table: str, id: int) -> None:
+        cache_key = f"{table}_{id}"
+        with self._refreshing_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+        try:
+            self._refresher.submit(self._background_refresh, table, id)
+        except RuntimeError:
+            # Closed: keep serving the stale entry without refreshing it.
+            with self._refreshing_lock:
+                self._refreshing.discard(cache_key)
+
+    def _background_refresh(self, table: str, id: int) -> None:
+        cache_key = f"{table}_{id}"
+        failed = False
+        try:
+            self._load(table, id)
+        except Exception as e:
+            # Keep serving the stale entry until it reaches its hard TTL.
+            failed = True
+            print(f"Logging: Refreshing {table} with id {id} failed: {e}")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(cache_key)
+                self.refreshes += 1
+                self.refresh_errors += failed
+
+    def read_many(self, table: str, ids: List[int]) -> List[Dict[str, Any]]:
+        found = {}
+        missing = []
+        for id in dict.fromkeys(ids):
+            cached, refresh_due = self.cache.lookup(f"{table}_{id}")
+            if cached is not None:
+                found[id] = cached
+                if refresh_due:
+                    self._refresh_in_background(table, id)
+            else:
+                missing.append(id)
+        print(f"Logging: Reading {len(ids)} records from {table} "
+              f"({len(found)} from cache, {len(missing)} from database)")
+        if missing:
+            keys = {f"{table}_{id}": id for id in missing}
+
+            def load(load_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+                rows = self.real_database.read_many(table, [keys[key] for key in load_keys])
+                return dict(zip(load_keys, rows))
+
+            def store(cache_key: str, row: Dict[str, Any]) -> None:
+                if row:
+                    self.cache.put(cache_key, row)
+                else:
+                    self.cache.pop(cache_key, None)
+
+            # The misses go through the same single-flight path as read(), so
+            # a write that lands while they load keeps them out of the cache.
+            for cache_key, row in self.flights.do_many(list(keys), load, store).items():
+                if row:
+                    found[keys[cache_key]] = row
+        return [dict(found.get(id, {})) for id in ids]
 
     def update(self, table: str, id: int, data: Dict[str, Any]) -> bool:
         print(f"Logging: Updating record in {table} with id {id}")
         success = self.real_database.update(table, id, data)
-        if success:
-            self.cache[f"{table}_{id}"] = data
+        if success and f"{table}_{id}" in self.cache:
+            self._refresh(table, id)
+        elif success:
+            self._invalidate(f"{table}_{id}")
         return success
 
     def delete(self, table: str, id: int) -> bool:
         print(f"Logging: Deleting record from {table} with id {id}")
         success = self.real_database.delete(table, id)
         if success:
-            self.cache.pop(f"{table}_{id}", None)
+            self._invalidate(f"{table}_{id}")
         return success
 
+    # Cache warm-up. A snapshot is a gzipped JSON list of the hot entries,
+    # least recently used first, so reloading it restores the LRU order. On
+    # load every key is re-read from the database in bulk (one IN query per
+    # table and chunk): rows that were deleted since are dropped and rows that
+    # changed are cached with their current values.
+    SNAPSHOT_VERSION = 1
+
+    def save_snapshot(self, path: str, limit: Optional[int] = None) -> int:
+        entries = []
+        for key, row in self.cache.items():
+            table, _, id = key.rpartition("_")
+            if not id.isdigit():
+                continue
+            # Values JSON can't hold (BLOBs) are left for the reload to fetch
+            json_safe = all(value is None or isinstance(value, (str, int, float)) for value in row.values())
+            entries.append([table, int(id), row if json_safe else None])
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        snapshot = {"version": self.SNAPSHOT_VERSION, "saved_at": time.time(), "entries": entries}
+        # Write then rename, so a crash mid-save never leaves a torn snapshot
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        print(f"Logging: Saved {len(entries)} cache entries to {path}")
+        return len(entries)
+
+    def load_snapshot(self, path: str) -> Dict[str, int]:
+        stats = {"loaded": 0, "unchanged": 0, "changed": 0, "dropped": 0}
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return stats
+        except (OSError, ValueError) as e:
+            # A bad snapshot only costs a cold start
+            print(f"Logging: Ignoring cache snapshot {path}: {e}")
+            return stats
+        if snapshot.get("version") != self.SNAPSHOT_VERSION:
+            print(f"Logging: Ignoring cache snapshot {path}: unsupported version {snapshot.get('version')}")
+            return stats
+        entries = snapshot.get("entries", [])
+        ids_by_table: Dict[str, List[int]] = {}
+        for table, id, _ in entries:
+            ids_by_table.setdefault(table, []).append(id)
+        current = {}
+        for table, ids in ids_by_table.items():
+            for id, row in zip(ids, self.real_database.read_many(table, ids)):
+                current[(table, id)] = row
+        for table, id, saved in entries:
+            row = current[(table, id)]
+            cache_key = f"{table}_{id}"
+            if not row:
+                stats["dropped"] += 1
+                self.cache.pop(cache_key, None)
+                continue
+            stats["changed" if saved is not None and row != saved else "unchanged"] += 1
+            stats["loaded"] += 1
+            self.cache.put(cache_key, row)
+        print(f"Logging: Warmed cache with {stats['loaded']} entries from {path} "
+              f"({stats['changed']} changed, {stats['dropped']} dropped)")
+        return stats
+
+    def warm(self, table: str, sql: str, params: Tuple[Any, ...] = ()) -> int:
+        # Preload the rows a query returns, e.g.
+        # "SELECT * FROM users ORDER BY last_login DESC LIMIT 1000".
+        # Rows need an id column to be cached under.
+        rows = self.real_database.query(sql, params)
+        warmed = 0
+        for row in reversed(rows):  # first row ends up most recently used
+            if row.get("id") is not None:
+                self.cache.put(f"{table}_{row['id']}", row)
+                warmed += 1
+        print(f"Logging: Warmed cache with {warmed} rows from {table}")
+        return warmed
+
+    def start_snapshots(self, path: str, interval: float, limit: Optional[int] = None) -> None:
+        # Save a snapshot every ``interval`` seconds, and once more on close()
+        if self._snapshot_thread is not None:
+            raise RuntimeError("Snapshots are already running")
+        self._snapshot_path = path
+        self._snapshot_limit = limit
+
+        def run() -> None:
+            while not self._snapshot_stop.wait(interval):
+                try:
+                    self.save_snapshot(path, limit)
+                except OSError as e:
+                    print(f"Logging: Saving cache snapshot to {path} failed: {e}")
+
+        self._snapshot_thread = threading.Thread(target=run, name="cache-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def close(self) -> None:
+        self._refresher.shutdown(wait=True)
+        if self._snapshot_thread is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+            self.save_snapshot(self._snapshot_path, self._snapshot_limit)
+
 # Example usage
 if __name__ == "__main__":
     # Initialize the RealDatabase and DatabaseProxy
@@ -143,5 +707,10 @@ if __name__ == "__main__":
     deleted = db_proxy.delete("users", user_id)
     print(f"User deleted: {deleted}")
 
+    # Persist the hot entries so the next start is warm; a later run would
+    # call db_proxy.load_snapshot("example-cache.json.gz") after connecting
+    db_proxy.save_snapshot("example-cache.json.gz")
+
     # Close the database connection
+    db_proxy.close()
     real_db.close()
\ No newline at end of file
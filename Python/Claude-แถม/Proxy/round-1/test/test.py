@@ -1,6 +1,8 @@
+import threading
+import time
 import pytest
 from unittest.mock import Mock, patch
-from your_module import DatabaseInterface, RealDatabase, DatabaseProxy, SQLiteFactory
+from your_module import DatabaseInterface, RealDatabase, DatabaseProxy, BoundedCache, StatementCache
 
 # Mock database for testing
 class MockDatabase(DatabaseInterface):
@@ -88,7 +90,8 @@ def test_database_proxy_create(db_proxy):
         result = db_proxy.create("users", {"name": "John", "email": "john@example.com"})
         assert result == 1
         mock_real_db.create.assert_called_with("users", {"name": "John", "email": "john@example.com"})
-        assert db_proxy.cache["users_1"] == {"name": "John", "email": "john@example.com"}
+        # Only full rows are cached, so a create leaves the cache to the first read
+        assert "users_1" not in db_proxy.cache
 
 def test_database_proxy_read(db_proxy):
     # Test cache miss
@@ -104,13 +107,88 @@ def test_database_proxy_read(db_proxy):
     assert result == {"id": 1, "name": "John", "email": "john@example.com"}
     mock_real_db.read.assert_called_once()  # Ensure it wasn't called again
 
+def read_concurrently(db_proxy, mock_db, readers=8, error=None):
+    # Holds the first database read open until every other reader is waiting
+    # on it, then lets it finish (or fail with ``error``).
+    calls = []
+    release = threading.Event()
+
+    def slow_read(table, id):
+        calls.append(id)
+        release.wait(5)
+        if error:
+            raise error
+        return MockDatabase.read(mock_db, table, id)
+
+    results = []
+
+    def reader():
+        try:
+            results.append(db_proxy.read("users", 1))
+        except Exception as e:
+            results.append(e)
+
+    with patch.object(mock_db, "read", side_effect=slow_read):
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        while db_proxy.flights.stats()["coalesced"] < readers - 1:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+    return calls, results
+
+def test_database_proxy_read_coalesces_concurrent_misses(mock_db):
+    mock_db.create("users", {"id": 1, "name": "John"})
+
+    db_proxy = DatabaseProxy(mock_db)
+    error = RuntimeError("database is locked")
+    calls, results = read_concurrently(db_proxy, mock_db, error=error)
+    assert calls == [1]
+    assert results == [error] * 8
+    assert "users_1" not in db_proxy.cache
+
+    db_proxy = DatabaseProxy(mock_db)
+    calls, results = read_concurrently(db_proxy, mock_db)
+    assert calls == [1]
+    assert results == [{"id": 1, "name": "John"}] * 8
+    assert db_proxy.cache["users_1"] == {"id": 1, "name": "John"}
+
 def test_database_proxy_update(db_proxy):
+    db_proxy.cache["users_1"] = {"id": 1, "name": "John", "email": "john@example.com"}
     with patch.object(db_proxy, 'real_database') as mock_real_db:
         mock_real_db.update.return_value = True
+        mock_real_db.read.return_value = {"id": 1, "name": "Jane", "email": "john@example.com"}
         result = db_proxy.update("users", 1, {"name": "Jane"})
         assert result == True
         mock_real_db.update.assert_called_with("users", 1, {"name": "Jane"})
-        assert db_proxy.cache["users_1"] == {"name": "Jane"}
+        # The cache is refreshed with the full row, not the partial update
+        assert db_proxy.cache["users_1"] == {"id": 1, "name": "Jane", "email": "john@example.com"}
+
+def test_database_proxy_concurrent_updates_keep_the_last_row(mock_db):
+    mock_db.create("users", {"id": 1, "name": "John"})
+    db_proxy = DatabaseProxy(mock_db)
+    db_proxy.read("users", 1)
+    loaded, release = threading.Event(), threading.Event()
+
+    def slow_first_read(table, id):
+        row = dict(MockDatabase.read(mock_db, table, id))
+        if not loaded.is_set():
+            loaded.set()
+            release.wait(5)
+        return row
+
+    with patch.object(mock_db, "read", side_effect=slow_first_read):
+        # The first update's re-read sees "Jane", then stalls until the second
+        # update has written "Jill" and refreshed the cache.
+        first = threading.Thread(target=db_proxy.update, args=("users", 1, {"name": "Jane"}))
+        first.start()
+        loaded.wait(5)
+        assert db_proxy.update("users", 1, {"name": "Jill"})
+        release.set()
+        first.join(5)
+    assert db_proxy.read("users", 1) == {"id": 1, "name": "Jill"}
 
 def test_database_proxy_delete(db_proxy):
     db_proxy.cache["users_1"] = {"name": "John"}
@@ -121,6 +199,40 @@ def test_database_proxy_delete(db_proxy):
         mock_real_db.delete.assert_called_with("users", 1)
         assert "users_1" not in db_proxy.cache
 
+def test_database_proxy_read_many(db_proxy):
+    db_proxy.cache["users_1"] = {"id": 1, "name": "John"}
+    with patch.object(db_proxy, 'real_database') as mock_real_db:
+        mock_real_db.read_many.return_value = [{"id": 3, "name": "Bob"}, {}]
+        result = db_proxy.read_many("users", [3, 1, 4])
+        # Only the misses go to the database, and results keep request order
+        mock_real_db.read_many.assert_called_once_with("users", [3, 4])
+        assert result == [{"id": 3, "name": "Bob"}, {"id": 1, "name": "John"}, {}]
+        assert "users_3" in db_proxy.cache
+        assert "users_4" not in db_proxy.cache
+
+def test_database_proxy_read_many_does_not_cache_rows_read_before_an_update(mock_db):
+    mock_db.create("users", {"id": 1, "name": "old"})
+    db_proxy = DatabaseProxy(mock_db)
+    loaded, release = threading.Event(), threading.Event()
+
+    def slow_read_many(table, ids):
+        rows = [dict(MockDatabase.read(mock_db, table, id)) for id in ids]
+        loaded.set()
+        release.wait(5)
+        return rows
+
+    results = []
+    with patch.object(mock_db, "read_many", side_effect=slow_read_many, create=True):
+        reader = threading.Thread(target=lambda: results.append(db_proxy.read_many("users", [1])))
+        reader.start()
+        loaded.wait(5)
+        # The update lands after the bulk read saw the old row
+        assert db_proxy.update("users", 1, {"name": "new"})
+        release.set()
+        reader.join(5)
+    assert results == [[{"id": 1, "name": "old"}]]
+    assert db_proxy.read("users", 1) == {"id": 1, "name": "new"}
+
 # Test error handling
 def test_database_proxy_error_handling(db_proxy):
     with patch.object(db_proxy, 'real_database') as mock_real_db:
@@ -128,6 +240,105 @@ def test_database_proxy_error_handling(db_proxy):
         with pytest.raises(Exception):
             db_proxy.create("users", {"name": "John"})
 
+# Test bounded cache
+def test_bounded_cache_evicts_least_recently_used():
+    cache = BoundedCache(max_entries=2)
+    cache.put("users_1", {"id": 1})
+    cache.put("users_2", {"id": 2})
+    cache.get("users_1")
+    cache.put("users_3", {"id": 3})
+    assert "users_1" in cache
+    assert "users_2" not in cache
+    assert cache.stats()["evictions"] == 1
+
+def test_bounded_cache_byte_limit():
+    cache = BoundedCache(max_bytes=1024)
+    for i in range(100):
+        cache.put(f"users_{i}", {"id": i, "name": "x" * 50})
+    assert cache.stats()["bytes"] <= 1024
+    assert len(cache) < 100
+
+def test_bounded_cache_table_ttl():
+    cache = BoundedCache(table_ttls={"sessions": 60})
+    cache.put("sessions_1", {"id": 1})
+    cache.put("users_1", {"id": 1})
+    with patch('time.monotonic', return_value=time.monotonic() + 120):
+        assert cache.get("sessions_1") is None
+        assert cache.get("users_1") == {"id": 1}
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_database_proxy_serves_stale_while_revalidating(mock_db):
+    cache = BoundedCache(default_ttl=60, default_soft_ttl=10, table_soft_ttls={"sessions": 1})
+    db_proxy = DatabaseProxy(mock_db, cache)
+    mock_db.create("users", {"id": 1, "name": "John"})
+    assert db_proxy.read("users", 1) == {"id": 1, "name": "John"}
+    mock_db.data["users_1"] = {"id": 1, "name": "Jane"}  # written behind the proxy's back
+
+    now = time.monotonic()
+    with patch('time.monotonic', return_value=now + 5):
+        assert cache.lookup("users_1") == ({"id": 1, "name": "John"}, False)
+    with patch('time.monotonic', return_value=now + 20):
+        # Stale: served immediately, reloaded in the background
+        assert db_proxy.read("users", 1) == {"id": 1, "name": "John"}
+        db_proxy.close()
+    assert db_proxy.read("users", 1) == {"id": 1, "name": "Jane"}
+    assert (db_proxy.refreshes, db_proxy.refresh_errors) == (1, 0)
+    assert cache.stats()["stale_hits"] == 1
+
+    with patch('time.monotonic', return_value=now + 120):
+        assert cache.get("users_1") is None  # past the hard TTL
+
+def test_bounded_cache_refresh_ahead():
+    cache = BoundedCache(default_ttl=100, refresh_ahead=0.8)
+    cache.put("users_1", {"id": 1})
+    now = time.monotonic()
+    with patch('time.monotonic', return_value=now + 50):
+        assert cache.lookup("users_1") == ({"id": 1}, False)
+    with patch('time.monotonic', return_value=now + 90):
+        assert cache.lookup("users_1") == ({"id": 1}, True)
+    with pytest.raises(ValueError):
+        BoundedCache(refresh_ahead=1.5)
+
+# Test cache snapshots
+def test_database_proxy_snapshot_round_trip(db_proxy, tmp_path):
+    path = str(tmp_path / "cache.json.gz")
+    db_proxy.cache["users_1"] = {"id": 1, "name": "John"}
+    db_proxy.cache["users_2"] = {"id": 2, "name": "Jane"}
+    db_proxy.cache["users_3"] = {"id": 3, "name": "Bob"}
+    assert db_proxy.save_snapshot(path) == 3
+
+    restarted = DatabaseProxy(Mock())
+    restarted.real_database.read_many.return_value = [
+        {"id": 1, "name": "John"}, {"id": 2, "name": "Janet"}, {}]
+    stats = restarted.load_snapshot(path)
+    # One bulk check per table; deleted rows are dropped, changed rows refreshed
+    restarted.real_database.read_many.assert_called_once_with("users", [1, 2, 3])
+    assert stats == {"loaded": 2, "unchanged": 1, "changed": 1, "dropped": 1}
+    assert restarted.cache.get("users_2") == {"id": 2, "name": "Janet"}
+    assert "users_3" not in restarted.cache
+    assert restarted.load_snapshot(str(tmp_path / "missing.json.gz"))["loaded"] == 0
+
+# Test statement cache
+def test_statement_cache_reuses_generated_sql():
+    statements = StatementCache()
+    first = statements.get("update", "users", ("email", "name"))
+    assert first == "UPDATE users SET email = ?, name = ? WHERE id = ?"
+    assert statements.get("update", "users", ("email", "name")) is first
+    stats = statements.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_statement_cache_rejects_bad_identifiers():
+    statements = StatementCache()
+    with pytest.raises(ValueError):
+        statements.get("insert", "users; DROP TABLE users", ("name",))
+    with pytest.raises(ValueError):
+        statements.get("update", "users", ("name = 1 --",))
+
 # Test edge cases
 def test_database_proxy_edge_cases(db_proxy):
     # Test empty data
@@ -1,20 +1,64 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict
+from urllib.request import pathname2url
+import os
+import queue
+import re
 import sqlite3
+import threading
 import mysql.connector
 import psycopg2
 
+class DatabaseInterface(ABC):
+    @abstractmethod
+    def create(self, data: Dict[str, Any]) -> int:
+        pass
+
+    @abstractmethod
+    def read(self, id: int) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def update(self, id: int, data: Dict[str, Any]) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, id: int) -> bool:
+        pass
+
 class DatabaseStrategy(ABC):
+    placeholder = "?"
+
     @abstractmethod
     def connect(self, **kwargs):
         pass
 
+    # Read-only connections for the read pool. Backends without a read-only
+    # mode (or replicas) just hand out ordinary connections.
+    def connect_readonly(self, **kwargs):
+        return self.connect(**kwargs)
+
     @abstractmethod
     def execute(self, query, params=None):
         pass
 
 class SQLiteStrategy(DatabaseStrategy):
     def connect(self, **kwargs):
-        return sqlite3.connect(kwargs['db_name'])
+        connection = sqlite3.connect(kwargs['db_name'], check_same_thread=False)
+        # WAL lets the read-only connections keep reading while the primary
+        # connection writes.
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def connect_readonly(self, **kwargs):
+        db_name = kwargs['db_name']
+        if db_name == ":memory:":
+            # Every :memory: connection is a separate database, so reads have
+            # to share the primary's.
+            return None
+        uri = f"file:{pathname2url(os.path.abspath(db_name))}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
 
     def execute(self, connection, query, params=None):
         cursor = connection.cursor()
@@ -22,6 +66,8 @@ class SQLiteStrategy(DatabaseStrategy):
         return cursor
 
 class MySQLStrategy(DatabaseStrategy):
+    placeholder = "%s"
+
     def connect(self, **kwargs):
         return mysql.connector.connect(**kwargs)
 
@@ -31,6 +77,8 @@ class MySQLStrategy(DatabaseStrategy):
         return cursor
 
 class PostgreSQLStrategy(DatabaseStrategy):
+    placeholder = "%s"
+
     def connect(self, **kwargs):
         return psycopg2.connect(**kwargs)
 
@@ -39,19 +87,164 @@ class PostgreSQLStrategy(DatabaseStrategy):
         cursor.execute(query, params or ())
         return cursor
 
+READ_STATEMENT = re.compile(r"^\s*(SELECT|EXPLAIN|VALUES)\b", re.IGNORECASE)
+CTE_STATEMENT = re.compile(r"^\s*WITH\b", re.IGNORECASE)
+WRITE_KEYWORD = re.compile(r"\b(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+def is_read_query(query: str) -> bool:
+    if READ_STATEMENT.match(query):
+        return True
+    # A WITH clause can front an INSERT/UPDATE/DELETE as well as a SELECT.
+    return bool(CTE_STATEMENT.match(query)) and not WRITE_KEYWORD.search(query)
+
 class RealDatabase(DatabaseInterface):
-    def __init__(self, strategy: DatabaseStrategy, **kwargs):
+    TABLE = "users"
+    COLUMNS = ("id", "name", "email")
+
+    def __init__(self, strategy: DatabaseStrategy, read_pool_size: int = 4, **kwargs):
         self.strategy = strategy
         self.connection_params = kwargs
         self.connection = None
+        self.read_pool_size = read_pool_size
+        # Writes (and consistent reads) go through the single primary
+        # connection; other reads borrow a read-only connection from the pool.
+        self._write_lock = threading.RLock()
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
 
     def connect(self):
-        if not self.connection:
-            self.connection = self.strategy.connect(**self.connection_params)
-        return self.connection
+        with self._write_lock:
+            if not self.connection:
+                self.connection = self.strategy.connect(**self.connection_params)
+            return self.connection
+
+    def _acquire_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_lock:
+            can_open = self._reader_count < self.read_pool_size
+            if can_open:
+                self._reader_count += 1
+        if not can_open:
+            return self._readers.get()
+        conn = None
+        try:
+            # The primary creates the database file and switches it to WAL,
+            # which a read-only connection can do neither of.
+            self.connect()
+            conn = self.strategy.connect_readonly(**self.connection_params)
+        finally:
+            if conn is None:
+                with self._reader_lock:
+                    self._reader_count -= 1
+        return conn
+
+    @contextmanager
+    def reader(self, consistent: bool = False):
+        conn = None if consistent else self._acquire_reader()
+        if conn is None:
+            # Read-your-writes: read on the primary, after any pending write.
+            with self._write_lock:
+                yield self.connect()
+            return
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _read(self, query, params, consistent, fetch):
+        with self.reader(consistent) as conn:
+            return fetch(self.strategy.execute(conn, query, params))
+
+    def _write(self, query, params):
+        with self._write_lock:
+            conn = self.connect()
+            try:
+                cursor = self.strategy.execute(conn, query, params)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            return cursor
+
+    def execute(self, query, params=None, consistent: bool = False):
+        # Reads are fetched before their connection goes back to the pool, so
+        # they return rows; writes return the cursor for lastrowid/rowcount.
+        if is_read_query(query):
+            return self._read(query, params, consistent, lambda cursor: cursor.fetchall())
+        return self._write(query, params)
+
+    def create(self, data: Dict[str, Any]) -> int:
+        columns = ", ".join(data)
+        placeholders = ", ".join(self.strategy.placeholder for _ in data)
+        query = f"INSERT INTO {self.TABLE} ({columns}) VALUES ({placeholders})"
+        return self._write(query, tuple(data.values())).lastrowid
+
+    def read(self, id: int, consistent: bool = False) -> Dict[str, Any]:
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM {self.TABLE} WHERE id = {self.strategy.placeholder}"
+        row = self._read(query, (id,), consistent, lambda cursor: cursor.fetchone())
+        return dict(zip(self.COLUMNS, row)) if row else {}
+
+    def update(self, id: int, data: Dict[str, Any]) -> bool:
+        placeholder = self.strategy.placeholder
+        assignments = ", ".join(f"{column} = {placeholder}" for column in data)
+        query = f"UPDATE {self.TABLE} SET {assignments} WHERE id = {placeholder}"
+        return self._write(query, tuple(data.values()) + (id,)).rowcount > 0
+
+    def delete(self, id: int) -> bool:
+        query = f"DELETE FROM {self.TABLE} WHERE id = {self.strategy.placeholder}"
+        return self._write(query, (id,)).rowcount > 0
+
+    def close(self):
+        with self._write_lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+        while True:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+        with self._reader_lock:
+            self._reader_count = 0
+
+class DatabaseProxy(DatabaseInterface):
+    def __init__(self, real_db: RealDatabase):
+        self.real_db = real_db
+        self.cache = {}
+
+    def create(self, data: Dict[str, Any]) -> int:
+        if not data:
+            raise ValueError("Cannot create a record without data")
+        id = self.real_db.create(data)
+        self.cache[id] = {"id": id, **data}
+        return id
+
+    def read(self, id: int, consistent: bool = False) -> Dict[str, Any]:
+        if id < 1:
+            raise ValueError(f"Invalid id: {id}")
+        if not consistent and id in self.cache:
+            return self.cache[id]
+        record = self.real_db.read(id, consistent=consistent)
+        if record:
+            self.cache[id] = record
+        return record
+
+    def update(self, id: int, data: Dict[str, Any]) -> bool:
+        success = self.real_db.update(id, data)
+        if success and id in self.cache:
+            self.cache[id].update(data)
+        return success
 
-    # Implement CRUD methods using self.strategy.execute()
-    # ...
+    def delete(self, id: int) -> bool:
+        success = self.real_db.delete(id)
+        if success:
+            self.cache.pop(id, None)
+        return success
 
 # Usage
 sqlite_db = RealDatabase(SQLiteStrategy(), db_name="users.db")
@@ -1,11 +1,12 @@
 import pytest
 from unittest.mock import Mock, patch
-from your_module import DatabaseInterface, RealDatabase, DatabaseProxy, DatabaseStrategy
+from your_module import DatabaseInterface, RealDatabase, DatabaseProxy, DatabaseStrategy, SQLiteStrategy, is_read_query
 
 # Test fixtures
 @pytest.fixture
 def mock_db_strategy():
     strategy = Mock(spec=DatabaseStrategy)
+    strategy.placeholder = "?"
     strategy.connect.return_value = Mock()
     return strategy
 
@@ -98,6 +99,37 @@ def test_proxy_delete(db_proxy):
         mock_delete.assert_called_once()
         assert 1 not in db_proxy.cache
 
+# Test read/write splitting
+def test_is_read_query():
+    assert is_read_query("SELECT * FROM users")
+    assert is_read_query("  with recent AS (SELECT 1) SELECT * FROM recent")
+    assert not is_read_query("WITH old AS (SELECT 1) DELETE FROM users")
+    assert not is_read_query("UPDATE users SET name = 'Jane'")
+
+def test_real_database_routes_reads_and_writes(real_db, mock_db_strategy):
+    with patch.object(real_db.strategy, 'execute') as mock_execute:
+        real_db.execute("SELECT * FROM users")
+        reader = mock_db_strategy.connect_readonly.return_value
+        assert mock_execute.call_args.args[0] is reader
+
+        real_db.execute("DELETE FROM users WHERE id = ?", (1,))
+        primary = mock_db_strategy.connect.return_value
+        assert mock_execute.call_args.args[0] is primary
+        primary.commit.assert_called_once()
+
+def test_real_database_consistent_read_uses_primary(real_db, mock_db_strategy):
+    with patch.object(real_db.strategy, 'execute') as mock_execute:
+        mock_execute.return_value.fetchone.return_value = None
+        real_db.read(1, consistent=True)
+        assert mock_execute.call_args.args[0] is mock_db_strategy.connect.return_value
+        mock_db_strategy.connect_readonly.assert_not_called()
+
+def test_real_database_reuses_read_connections(real_db, mock_db_strategy):
+    with patch.object(real_db.strategy, 'execute'):
+        for _ in range(10):
+            real_db.execute("SELECT * FROM users")
+    mock_db_strategy.connect_readonly.assert_called_once()
+
 # Negative test cases
 def test_real_database_read_not_found(real_db):
     with patch.object(real_db.strategy, 'execute') as mock_execute:
@@ -139,7 +171,22 @@ def test_sqlite_strategy():
     with patch('sqlite3.connect') as mock_connect:
         strategy = SQLiteStrategy()
         conn = strategy.connect(db_name="test.db")
-        mock_connect.assert_called_once_with("test.db")
+        mock_connect.assert_called_once_with("test.db", check_same_thread=False)
+        mock_connect.return_value.execute.assert_called_once_with("PRAGMA journal_mode=WAL")
+
+def test_sqlite_strategy_readonly():
+    with patch('sqlite3.connect') as mock_connect:
+        strategy = SQLiteStrategy()
+        strategy.connect_readonly(db_name="test.db")
+        uri = mock_connect.call_args.args[0]
+        assert uri.startswith("file:") and uri.endswith("test.db?mode=ro")
+        assert mock_connect.call_args.kwargs["uri"] is True
+
+def test_sqlite_first_read_before_any_write(tmp_path):
+    db = RealDatabase(SQLiteStrategy(), db_name=str(tmp_path / "fresh.db"))
+    assert db.execute("SELECT 1") == [(1,)]
+    assert db.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close()
 
 def test_mysql_strategy():
     with patch('mysql.connector.connect') as mock_connect:
@@ -1,8 +1,15 @@
 import sqlite3
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+from sqlite_profiles import apply_sqlite_profile
 
 class Product:
-    """Represents a product in the database."""
+    """Represents a product in the database.
+
+    Slotted, since get_products() builds one per row and a catalog can have
+    millions of rows.
+    """
+
+    __slots__ = ("id", "name", "price")
 
     def __init__(self, id: int = None, name: str = None, price: float = None):
         self.id = id
@@ -12,15 +19,26 @@ class Product:
     def __repr__(self):
         return f"Product(id={self.id}, name='{self.name}', price={self.price})"
 
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "Product":
+        """sqlite3 row_factory building a Product from an (id, name, price) row."""
+        return cls(*row)
+
 class DatabaseProxy:
     """Proxy class for database interactions."""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, profile: Optional[str] = None):
         self.db_path = db_path
+        self.profile = profile
         self._conn = None
 
+    def connect(self):
+        """Opens the connection, if it is not open yet."""
+        if self._conn is None:
+            self._conn = apply_sqlite_profile(sqlite3.connect(self.db_path), self.profile)
+
     def __enter__(self):
-        self._conn = sqlite3.connect(self.db_path)
+        self.connect()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -46,14 +64,11 @@ class DatabaseProxy:
         try:
             with self._conn:
                 cursor = self._conn.cursor()
+                cursor.row_factory = Product.from_row
                 cursor.execute(
                     "SELECT id, name, price FROM products WHERE id = ?", (product_id,)
                 )
-                row = cursor.fetchone()
-                if row:
-                    return Product(row[0], row[1], row[2])
-                else:
-                    return None
+                return cursor.fetchone()
         except Exception as e:
             raise Exception(f"Error getting product: {e}")
 
@@ -62,9 +77,9 @@ class DatabaseProxy:
         try:
             with self._conn:
                 cursor = self._conn.cursor()
+                cursor.row_factory = Product.from_row
                 cursor.execute("SELECT id, name, price FROM products")
-                rows = cursor.fetchall()
-                return [Product(row[0], row[1], row[2]) for row in rows]
+                return cursor.fetchall()
         except Exception as e:
             raise Exception(f"Error getting products: {e}")
 
@@ -92,8 +107,19 @@ class DatabaseProxy:
 class ProductAPI:
     """API for managing product data."""
 
-    def __init__(self, db_path: str):
-        self.db = DatabaseProxy(db_path)
+    def __init__(self, db_path: str, profile: Optional[str] = None):
+        self.db = DatabaseProxy(db_path, profile)
+        self.db.connect()
+
+        # Create table if it doesn't exist
+        with self.db._conn:
+            self.db._conn.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT,
+                    price REAL
+                )
+            """)
 
     def create(self, product_data: Dict) -> int:
         """Creates a new product."""
@@ -140,28 +166,29 @@ class ProductAPI:
         except Exception as e:
             raise Exception(f"Error deleting product: {e}")
 
-# Initialize the API with the database path
-api = ProductAPI("products.db")
-
 # Example usage
-# Create a product
-new_product_id = api.create({"name": "Laptop", "price": 1200.00})
-print(f"New product created with ID: {new_product_id}")
+if __name__ == "__main__":
+    # Initialize the API with the database path
+    api = ProductAPI("products.db")
+
+    # Create a product
+    new_product_id = api.create({"name": "Laptop", "price": 1200.00})
+    print(f"New product created with ID: {new_product_id}")
 
-# Read a product
-product = api.read(new_product_id)
-print(f"Product details: {product}")
+    # Read a product
+    product = api.read(new_product_id)
+    print(f"Product details: {product}")
 
-# Update a product
-api.update(new_product_id, {"name": "Laptop Pro"})
+    # Update a product
+    api.update(new_product_id, {"name": "Laptop Pro"})
 
-# Read the updated product
-updated_product = api.read(new_product_id)
-print(f"Updated product details: {updated_product}")
+    # Read the updated product
+    updated_product = api.read(new_product_id)
+    print(f"Updated product details: {updated_product}")
 
-# Delete a product
-api.delete(new_product_id)
+    # Delete a product
+    api.delete(new_product_id)
 
-# Read all products
-products = api.read()
-print(f"All products: {products}")
+    # Read all products
+    products = api.read()
+    print(f"All products: {products}")
@@ -83,6 +83,14 @@ class TestProductAPI(unittest.TestCase):
         # Test deleting non-existent product
         self.api.delete(999)  # Should not raise an error
 
+    def test_read_returns_slotted_products(self):
+        product_id = self.api.create({"name": "Keyboard", "price": 50.00})
+        product = self.api.read(product_id)
+        self.assertFalse(hasattr(product, "__dict__"))
+        self.assertEqual(repr(product), f"Product(id={product_id}, name='Keyboard', price=50.0)")
+        with self.assertRaises(AttributeError):
+            product.color = "black"
+
     def test_database_proxy_connection(self):
         with DatabaseProxy(self.db_path) as db:
             self.assertIsNotNone(db._conn)
@@ -0,0 +1,34 @@
+import os
+
+from flask import Flask, jsonify, request
+
+from main import ProductAPI, initialize_database
+
+app = Flask(__name__)
+
+# Database file the API serves; defaults to the one main.py's example uses
+db_file = os.environ.get("PRODUCTS_DB", "products.db")
+initialize_database(db_file)
+api = ProductAPI(db_file)
+
+
+@app.route("/products/analytics")
+def product_analytics():
+    """
+    Inventory value, price percentiles and histogram, and stock levels.
+
+    Query parameters: low_stock (units), bins, percentiles (comma-separated).
+    """
+    try:
+        low_stock = int(request.args.get("low_stock", 5))
+        bins = int(request.args.get("bins", 10))
+        percentiles = [float(p) for p in request.args.get("percentiles", "50,90,99").split(",")]
+        return jsonify(api.analytics(low_stock=low_stock, bins=bins, percentiles=percentiles))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:  # numpy is not installed
+        return jsonify({"error": str(e)}), 501
+
+
+if __name__ == "__main__":
+    app.run(debug=True)
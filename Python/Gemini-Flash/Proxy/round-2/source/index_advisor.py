@@ -0,0 +1,174 @@
+# index_advisor.py
+import re
+import time
+from collections import Counter, deque, namedtuple
+
+IndexCandidate = namedtuple("IndexCandidate", ["table", "columns", "equality", "ranged"])
+
+class IndexAdvisor:
+    """
+    Suggests indexes from the statements executed through a DatabaseProxy.
+
+    record() notes, per table, the columns each statement filters on (WHERE)
+    and sorts by (ORDER BY). recommend() ranks the candidate indexes by the
+    rows they would save scanning, estimated from the table size and the
+    number of distinct values in the indexed columns. ddl() and apply() turn
+    the ranking into CREATE INDEX statements, and replay() re-runs the
+    captured reads so the difference can be measured.
+    """
+
+    STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+    TABLE = re.compile(r"\b(?:FROM|UPDATE)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+    WHERE = re.compile(r"\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+    ORDER_BY = re.compile(r"\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+    PREDICATE = re.compile(
+        r"([A-Za-z_]\w*)\s*(==|=|!=|<>|<=|>=|<|>|\bIN\b|\bIS\b(?!\s+NOT)|\bLIKE\b|\bBETWEEN\b)", re.IGNORECASE)
+    EQUALITY_OPERATORS = {"=", "==", "in", "is"}
+    # The fraction of rows SQLite's planner assumes a range condition keeps.
+    RANGE_SELECTIVITY = 0.25
+
+    def __init__(self, max_statements=1000, min_rows_saved=1):
+        # A candidate must save at least this many row visits across the
+        # recorded workload to be recommended. The default leaves out only
+        # indexes that save nothing, such as one on a single-row table.
+        self.min_rows_saved = min_rows_saved
+        self._candidates = Counter()
+        # Reads captured for replay(), oldest dropped first.
+        self._workload = deque(maxlen=max_statements)
+
+    def candidate(self, query):
+        """
+        Returns the index a single-table statement could use, if any.
+
+        Equality columns come first, then at most one range column. ORDER BY
+        columns are appended when there is no range column, so the index also
+        returns the rows in order.
+        """
+        sql = self.STRING_LITERAL.sub("?", query)
+        table = self.TABLE.search(sql)
+        if table is None or re.search(r"\bJOIN\b", sql, re.IGNORECASE):
+            return None
+        where = self.WHERE.search(sql)
+        equality, ranges = [], []
+        for column, operator in self.PREDICATE.findall(where.group(1) if where else ""):
+            column, operator = column.lower(), operator.lower()
+            if operator in ("!=", "<>") or column in equality or column in ranges:
+                continue
+            (equality if operator in self.EQUALITY_OPERATORS else ranges).append(column)
+        if not equality and not ranges:
+            return None
+        columns = sorted(equality) + ranges[:1]
+        order = self.ORDER_BY.search(sql)
+        if order and not ranges:
+            for term in order.group(1).split(","):
+                match = re.match(r"\s*([A-Za-z_]\w*)\s*(?:ASC|DESC)?\s*$", term, re.IGNORECASE)
+                if match is None:
+                    break
+                if match.group(1).lower() not in columns:
+                    columns.append(match.group(1).lower())
+        return IndexCandidate(table.group(1).lower(), tuple(columns), len(equality), bool(ranges))
+
+    def record(self, query, params=None):
+        """
+        Counts the statement's index candidate and captures reads for replay().
+        """
+        candidate = self.candidate(query)
+        if candidate is not None:
+            self._candidates[candidate] += 1
+        if query.lstrip().upper().startswith("SELECT"):
+            self._workload.append((query, params))
+
+    @staticmethod
+    def _covered(conn, candidate):
+        """
+        Checks whether the rowid or an existing index already leads with the columns.
+        """
+        table_info = conn.execute(f"PRAGMA table_info({candidate.table})").fetchall()
+        primary_keys = [row for row in table_info if row[5]]
+        if (len(primary_keys) == 1 and primary_keys[0][2].upper() == "INTEGER"
+                and primary_keys[0][1].lower() == candidate.columns[0]):
+            return True
+        for index in conn.execute(f"PRAGMA index_list({candidate.table})").fetchall():
+            indexed = [row[2].lower() for row in conn.execute(f"PRAGMA index_info({index[1]})") if row[2]]
+            if tuple(indexed[:len(candidate.columns)]) == candidate.columns:
+                return True
+        return False
+
+    def recommend(self, conn, limit=None):
+        """
+        Ranks the recorded candidates by estimated rows saved across the workload.
+
+        Candidates naming unknown tables or columns, already served by an
+        index, or saving fewer than min_rows_saved rows are left out. A candidate that is a prefix of another is folded
+        into the longer index, which serves both.
+        """
+        recommendations = []
+        for candidate, uses in self._candidates.items():
+            columns = {row[1].lower() for row in conn.execute(f"PRAGMA table_info({candidate.table})")}
+            if not set(candidate.columns) <= columns or self._covered(conn, candidate):
+                continue
+            rows = conn.execute(f"SELECT COUNT(*) FROM {candidate.table}").fetchone()[0]
+            estimated_rows = float(rows)
+            if candidate.equality:
+                prefix = ", ".join(candidate.columns[:candidate.equality])
+                distinct = conn.execute(
+                    f"SELECT COUNT(*) FROM (SELECT DISTINCT {prefix} FROM {candidate.table})").fetchone()[0]
+                estimated_rows = rows / max(distinct, 1)
+            if candidate.ranged:
+                estimated_rows *= self.RANGE_SELECTIVITY
+            savings = (rows - estimated_rows) * uses
+            if savings < self.min_rows_saved:
+                continue
+            name = f"idx_{candidate.table}_{'_'.join(candidate.columns)}"
+            recommendations.append({
+                "table": candidate.table,
+                "columns": candidate.columns,
+                "uses": uses,
+                "rows": rows,
+                "estimated_rows": estimated_rows,
+                "savings": savings,
+                "ddl": f"CREATE INDEX IF NOT EXISTS {name} ON {candidate.table} ({', '.join(candidate.columns)})",
+            })
+        for shorter in list(recommendations):
+            longer = next((other for other in recommendations
+                           if other["table"] == shorter["table"]
+                           and len(other["columns"]) > len(shorter["columns"])
+                           and other["columns"][:len(shorter["columns"])] == shorter["columns"]), None)
+            if longer is not None:
+                longer["uses"] += shorter["uses"]
+                longer["savings"] += shorter["savings"]
+                recommendations.remove(shorter)
+        recommendations.sort(key=lambda recommendation: recommendation["savings"], reverse=True)
+        return recommendations[:limit] if limit is not None else recommendations
+
+    def ddl(self, conn, limit=None):
+        """
+        Returns the CREATE INDEX statements for the top recommendations.
+        """
+        return [recommendation["ddl"] for recommendation in self.recommend(conn, limit)]
+
+    def apply(self, conn, limit=None):
+        """
+        Creates the recommended indexes and returns the statements that ran.
+
+        Each index is built in its own transaction, so readers keep going and
+        writers wait only for the index being built.
+        """
+        statements = self.ddl(conn, limit)
+        for statement in statements:
+            with conn:
+                conn.execute(statement)
+        if statements:
+            conn.execute("ANALYZE")
+        return statements
+
+    def replay(self, conn, repeat=1):
+        """
+        Re-runs the captured reads and returns the elapsed seconds.
+        """
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query, params in self._workload:
+                conn.execute(query, params or ()).fetchall()
+        return time.perf_counter() - start
+
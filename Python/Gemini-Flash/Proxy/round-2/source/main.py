@@ -1,21 +1,31 @@
+import os
 import sqlite3
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Sequence
+from index_advisor import IndexAdvisor
+from sqlite_profiles import apply_sqlite_profile
 
+try:
+    import numpy as np
+except ImportError:  # only ProductAPI.analytics() needs it
+    np = None
 
 class DatabaseProxy:
     """
     A Proxy class for handling database connection, transaction management, and authorization.
     """
 
-    def __init__(self, db_file: str):
+    def __init__(self, db_file: str, profile: Optional[str] = None, advisor: Optional[IndexAdvisor] = None):
         self.db_file = db_file
+        self.profile = profile
         self.conn = None
+        self.advisor = advisor
 
     def connect(self):
         """
         Establishes a connection to the SQLite database.
         """
-        self.conn = sqlite3.connect(self.db_file)
+        self.conn = apply_sqlite_profile(sqlite3.connect(self.db_file), self.profile)
 
     def close(self):
         """
@@ -34,6 +44,8 @@ class DatabaseProxy:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
+            if self.advisor is not None:
+                self.advisor.record(query, params)
             self.conn.commit()
             return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
@@ -55,8 +67,123 @@ class ProductAPI:
     A simple CRUD API for managing product data.
     """
 
-    def __init__(self, db_file: str):
-        self.db_proxy = DatabaseProxy(db_file)
+    ANALYTICS_CHUNK_ROWS = 100_000
+
+    def __init__(self, db_file: str, profile: Optional[str] = None, advisor: Optional[IndexAdvisor] = None):
+        self.db_proxy = DatabaseProxy(db_file, profile, advisor)
+        # analytics() results by arguments, valid while _data_version() is unchanged.
+        self._analytics = {}
+        self._writes = 0
+
+    def _wrote(self):
+        """
+        Invalidates cached analytics after a write through this API.
+        """
+        self._writes += 1
+        self._analytics.clear()
+
+    def _data_version(self) -> tuple:
+        """
+        Identifies the current contents of the database for the analytics cache.
+
+        Writes through this API bump a counter; writes from other connections or
+        processes change the size or mtime of the database or its WAL file.
+        """
+        version = [self._writes]
+        for path in (self.db_proxy.db_file, self.db_proxy.db_file + "-wal"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            version.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(version)
+
+    def _load_stock(self):
+        """
+        Loads the price and quantity columns into NumPy arrays, a chunk at a time.
+        """
+        prices, quantities = [], []
+        # fromiter with a record dtype converts the row tuples about 3x faster
+        # than np.array() does.
+        row_dtype = [("price", np.float64), ("quantity", np.int64)]
+        with self.db_proxy as db:
+            cursor = db.conn.execute("SELECT price, quantity FROM products")
+            try:
+                while True:
+                    rows = cursor.fetchmany(self.ANALYTICS_CHUNK_ROWS)
+                    if not rows:
+                        break
+                    block = np.fromiter(rows, dtype=row_dtype, count=len(rows))
+                    prices.append(block["price"])
+                    quantities.append(block["quantity"])
+            finally:
+                cursor.close()
+        if not prices:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+        return np.concatenate(prices), np.concatenate(quantities)
+
+    def analytics(
+        self,
+        low_stock: int = 5,
+        bins: int = 10,
+        percentiles: Sequence[float] = (50, 90, 99),
+    ) -> Dict:
+        """
+        Summarizes inventory value, price distribution and stock levels.
+
+        The numeric columns are loaded into NumPy arrays and every figure is
+        computed with vectorized operations. Results are cached per argument set
+        until the next write to the database.
+
+        Args:
+            low_stock: Products with at most this many units count as low stock.
+            bins: Number of equal-width buckets in the price histogram.
+            percentiles: Price percentiles to report, each between 0 and 100.
+
+        Returns:
+            A dictionary of inventory figures, ready to serialize as JSON.
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+            ValueError: If bins or a percentile is out of range.
+        """
+        if np is None:
+            raise RuntimeError("ProductAPI.analytics() requires numpy")
+        if bins < 1:
+            raise ValueError("bins must be at least 1")
+        percentiles = tuple(float(p) for p in percentiles)
+        if any(not 0 <= p <= 100 for p in percentiles):
+            raise ValueError("percentiles must be between 0 and 100")
+
+        key = (low_stock, bins, percentiles)
+        version = self._data_version()
+        cached = self._analytics.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        prices, quantities = self._load_stock()
+        result = {
+            "products": int(prices.size),
+            "units": int(quantities.sum()),
+            "inventory_value": float(np.dot(prices, quantities)),
+            "low_stock": int(np.count_nonzero(quantities <= low_stock)),
+            "out_of_stock": int(np.count_nonzero(quantities <= 0)),
+            "mean_price": None,
+            "price_percentiles": {},
+            "price_histogram": {"edges": [], "counts": []},
+        }
+        if prices.size:
+            result["mean_price"] = float(prices.mean())
+            values = np.percentile(prices, percentiles)
+            result["price_percentiles"] = {f"p{p:g}": float(v) for p, v in zip(percentiles, values)}
+            counts, edges = np.histogram(prices, bins=bins)
+            result["price_histogram"] = {"edges": edges.tolist(), "counts": counts.tolist()}
+
+        # Only cache if nothing was written while we were reading. (The first
+        # connection to a database also changes it, by switching it to WAL.)
+        if self._data_version() == version:
+            self._analytics[key] = (version, result)
+        return result
 
     def create_product(self, product_data: Dict) -> Dict:
         """
@@ -84,6 +211,7 @@ class ProductAPI:
                     product_data['quantity'],
                 )
                 db.execute(query, params)
+                self._wrote()
                 product_data['id'] = db.conn.lastrowid
                 return product_data
             except Exception as e:
@@ -160,6 +288,7 @@ class ProductAPI:
                     product_id,
                 )
                 db.execute(query, params)
+                self._wrote()
                 return product_data
             except Exception as e:
                 raise Exception("Failed to update product: {}".format(e))
@@ -183,6 +312,7 @@ class ProductAPI:
                     DELETE FROM products WHERE id = ?
                 """
                 db.execute(query, (product_id,))
+                self._wrote()
                 return True
             except Exception as e:
                 raise Exception("Failed to delete product: {}".format(e))
@@ -1,9 +1,15 @@
 import unittest
 import sqlite3
 import os
+import tempfile
 from unittest.mock import patch, MagicMock
 
-from your_module import DatabaseProxy, ProductAPI  # Replace "your_module" with the actual module name
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from your_module import DatabaseProxy, IndexAdvisor, ProductAPI  # Replace "your_module" with the actual module name
 
 
 class TestDatabaseProxy(unittest.TestCase):
@@ -21,6 +27,16 @@ class TestDatabaseProxy(unittest.TestCase):
         self.db_proxy.close()
         self.assertIsNone(self.db_proxy.conn)
 
+    def test_connect_applies_profile(self):
+        db_proxy = DatabaseProxy(self.db_file, "durable")
+        db_proxy.connect()
+        synchronous = db_proxy.conn.execute("PRAGMA synchronous").fetchone()[0]
+        self.assertEqual(synchronous, 2)  # FULL
+        db_proxy.close()
+
+        with self.assertRaises(ValueError):
+            DatabaseProxy(self.db_file, "unknown").connect()
+
     @patch("sqlite3.connect")
     def test_execute_success(self, mock_connect):
         mock_cursor = MagicMock()
@@ -230,5 +246,103 @@ class TestProductAPI(unittest.TestCase):
         mock_execute.assert_called_once()
 
 
+
+class TestIndexAdvisor(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("""
+            CREATE TABLE products (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                price REAL NOT NULL,
+                quantity INTEGER NOT NULL
+            )
+        """)
+        self.conn.executemany(
+            "INSERT INTO products (name, description, price, quantity) VALUES (?, ?, ?, ?)",
+            [(f"Product {i % 50}", "", float(i), i % 7) for i in range(1000)],
+        )
+        self.advisor = IndexAdvisor()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_candidate_columns(self):
+        candidate = self.advisor.candidate("SELECT * FROM products WHERE price > ? AND name = ? ORDER BY price")
+        self.assertEqual(candidate.table, "products")
+        self.assertEqual(candidate.columns, ("name", "price"))
+        self.assertIsNone(self.advisor.candidate("SELECT * FROM products"))
+        self.assertIsNone(self.advisor.candidate("SELECT * FROM products WHERE name != 'x'"))
+
+    def test_recommend_and_apply(self):
+        for _ in range(3):
+            self.advisor.record("SELECT * FROM products WHERE name = ?", ("Product 1",))
+        self.advisor.record("SELECT * FROM products WHERE id = ?", (1,))
+        self.advisor.record("SELECT * FROM products WHERE missing = ?", (1,))
+
+        ddl = self.advisor.ddl(self.conn)
+        self.assertEqual(ddl, ["CREATE INDEX IF NOT EXISTS idx_products_name ON products (name)"])
+        self.assertEqual(self.advisor.apply(self.conn), ddl)
+        plan = self.conn.execute("EXPLAIN QUERY PLAN SELECT * FROM products WHERE name = ?", ("x",)).fetchall()
+        self.assertIn("idx_products_name", plan[0][3])
+        self.assertEqual(self.advisor.recommend(self.conn), [])
+
+    def test_proxy_records_statements(self):
+        db_proxy = DatabaseProxy(":memory:", advisor=self.advisor)
+        db_proxy.connect()
+        db_proxy.execute("CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT)")
+        db_proxy.execute("SELECT * FROM products WHERE name = ?", ("x",))
+        db_proxy.close()
+        self.assertEqual(self.advisor.ddl(self.conn), ["CREATE INDEX IF NOT EXISTS idx_products_name ON products (name)"])
+        # The captured reads replay against any database with the same schema
+        self.assertGreater(self.advisor.replay(self.conn), 0)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestProductAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmp.name, "products.db")
+        with sqlite3.connect(self.db_file) as conn:
+            conn.execute("""
+                CREATE TABLE products (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    description TEXT,
+                    price REAL NOT NULL,
+                    quantity INTEGER NOT NULL
+                )
+            """)
+            conn.executemany(
+                "INSERT INTO products (name, description, price, quantity) VALUES (?, ?, ?, ?)",
+                [(f"Product {i}", "", float(i), i % 4) for i in range(1, 101)],
+            )
+        self.api = ProductAPI(self.db_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_analytics(self):
+        stats = self.api.analytics(low_stock=1, bins=4, percentiles=(50, 100))
+        self.assertEqual(stats["products"], 100)
+        self.assertEqual(stats["units"], sum(i % 4 for i in range(1, 101)))
+        self.assertAlmostEqual(stats["inventory_value"], sum(i * (i % 4) for i in range(1, 101)))
+        self.assertEqual(stats["low_stock"], 50)
+        self.assertEqual(stats["out_of_stock"], 25)
+        self.assertEqual(stats["price_percentiles"], {"p50": 50.5, "p100": 100.0})
+        self.assertEqual(stats["price_histogram"]["counts"], [25, 25, 25, 25])
+
+        # Cached until the next write
+        cached = self.api.analytics(low_stock=1, bins=4, percentiles=(50, 100))
+        with patch.object(self.api, "_load_stock") as load_stock:
+            self.assertIs(self.api.analytics(low_stock=1, bins=4, percentiles=(50, 100)), cached)
+            load_stock.assert_not_called()
+        self.api.delete_product(100)
+        self.assertEqual(self.api.analytics(low_stock=1, bins=4, percentiles=(50, 100))["products"], 99)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
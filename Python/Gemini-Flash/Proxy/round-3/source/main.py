@@ -1,8 +1,15 @@
 import sqlite3
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from sqlite_profiles import apply_sqlite_profile
 
 class Product:
-    """Represents a product entity."""
+    """Represents a product entity.
+
+    Slotted, since read() builds one per row and a catalog can have millions
+    of rows; see benchmarks/bench_product_rows.py.
+    """
+
+    __slots__ = ("product_id", "name", "price", "description")
 
     def __init__(self, product_id: int, name: str, price: float, description: str = None):
         self.product_id = product_id
@@ -13,18 +20,27 @@ class Product:
     def __repr__(self):
         return f"Product(id={self.product_id}, name='{self.name}', price={self.price}, description='{self.description}')"
 
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: Tuple) -> "Product":
+        """sqlite3 row_factory building a Product from a PRODUCT_COLUMNS row."""
+        return cls(*row)
+
+# Column order Product.from_row expects.
+PRODUCT_COLUMNS = "product_id, name, price, description"
+
 class DatabaseProxy:
     """Proxy class for database interactions."""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, profile: Optional[str] = None):
         self.db_path = db_path
+        self.profile = profile
         self.conn = None
         self.cursor = None
 
     def connect(self):
         """Establishes a connection to the database."""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = apply_sqlite_profile(sqlite3.connect(self.db_path), self.profile)
             self.cursor = self.conn.cursor()
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
@@ -34,9 +50,14 @@ class DatabaseProxy:
         if self.conn:
             self.conn.close()
 
-    def execute(self, query: str, parameters: Tuple = None):
-        """Executes a SQL query with optional parameters."""
+    def execute(self, query: str, parameters: Tuple = None, row_factory=None):
+        """Executes a SQL query with optional parameters.
+
+        row_factory, if given, builds the rows this query returns; it is reset
+        by the next execute() so other queries keep getting plain tuples.
+        """
         try:
+            self.cursor.row_factory = row_factory
             if parameters:
                 self.cursor.execute(query, parameters)
             else:
@@ -62,8 +83,8 @@ class DatabaseProxy:
 class ProductAPI:
     """API for managing product data."""
 
-    def __init__(self, db_path: str):
-        self.db = DatabaseProxy(db_path)
+    def __init__(self, db_path: str, profile: Optional[str] = None):
+        self.db = DatabaseProxy(db_path, profile)
         self.db.connect()
 
         # Create table if it doesn't exist
@@ -91,20 +112,17 @@ class ProductAPI:
         """Reads product(s) from the database."""
         try:
             if product_id:
-                query = "SELECT * FROM products WHERE product_id = ?"
-                self.db.execute(query, (product_id,))
-                row = self.db.fetchall()
-                if row:
-                    return Product(row[0][0], row[0][1], row[0][2], row[0][3])
+                query = f"SELECT {PRODUCT_COLUMNS} FROM products WHERE product_id = ?"
+                self.db.execute(query, (product_id,), row_factory=Product.from_row)
+                rows = self.db.fetchall()
+                if rows:
+                    return rows[0]
                 else:
                     return None
             else:
-                query = "SELECT * FROM products"
-                self.db.execute(query)
-                products = [
-                    Product(row[0], row[1], row[2], row[3]) for row in self.db.fetchall()
-                ]
-                return products
+                query = f"SELECT {PRODUCT_COLUMNS} FROM products"
+                self.db.execute(query, row_factory=Product.from_row)
+                return self.db.fetchall()
         except Exception as e:
             print(f"Error reading product(s): {e}")
             return None
@@ -82,6 +82,19 @@ class TestProductAPI(unittest.TestCase):
         self.assertEqual(updated_product_from_db.price, 15.00)
         self.assertEqual(updated_product_from_db.description, "Updated description")
 
+    def test_read_returns_slotted_products(self):
+        """Test that read() rows are slotted Products built by the row factory."""
+        product_id = self.api.create(Product(None, "Test Product", 10.00, "Test description"))
+        products = self.api.read()
+        self.assertEqual([product.product_id for product in products], [product_id])
+        self.assertFalse(hasattr(products[0], "__dict__"))
+        self.assertEqual(repr(products[0]),
+                         f"Product(id={product_id}, name='Test Product', price=10.0, description='Test description')")
+
+        # Other queries still return plain tuples
+        self.api.db.execute("SELECT COUNT(*) FROM products")
+        self.assertEqual(self.api.db.fetchall(), [(1,)])
+
     def test_update_non_existent_product(self):
         """Test updating a non-existent product."""
         product = Product(100, "Non-existent Product", 10.00, "Test description")
@@ -0,0 +1,115 @@
+# slow_query_log.py
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+class SlowQueryLog:
+    """
+    Records statements slower than a threshold, with their query plans.
+
+    Each slow statement is logged with its normalized SQL, the shape of its
+    parameters, its duration and the EXPLAIN QUERY PLAN output captured right
+    after it ran. Repeats of the same normalized statement are aggregated, so
+    report() shows which full scans cost the most in total.
+    """
+    STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+    NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+    IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+    WHITESPACE = re.compile(r"\s+")
+
+    def __init__(self, threshold_ms=None, max_statements=256, logger=None):
+        if threshold_ms is None:
+            threshold_ms = float(os.environ.get("SLOW_QUERY_MS", 100))
+        self.threshold = threshold_ms / 1000
+        self.max_statements = max_statements
+        self.logger = logger or logging.getLogger(__name__)
+        # Normalized SQL -> aggregate, least recently seen first.
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def normalize(cls, query):
+        """
+        Replaces literals with ? and collapses whitespace and IN lists.
+        """
+        query = cls.STRING_LITERAL.sub("?", query)
+        query = cls.NUMBER_LITERAL.sub("?", query)
+        query = cls.IN_LIST.sub("IN (...)", query)
+        return cls.WHITESPACE.sub(" ", query).strip().rstrip(";")
+
+    @staticmethod
+    def params_shape(params):
+        """
+        Describes parameters by type only, so values never reach the log.
+        """
+        if not params:
+            return "()"
+        if isinstance(params, dict):
+            return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+        return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+
+    @staticmethod
+    def explain(connection, query, params):
+        """
+        Returns the EXPLAIN QUERY PLAN details, or [] if there is no plan.
+        """
+        try:
+            rows = connection.execute(f"EXPLAIN QUERY PLAN {query}", params or ()).fetchall()
+        except sqlite3.Error:
+            return []
+        return [row[3] for row in rows]
+
+    def record(self, connection, query, params, duration):
+        """
+        Logs and aggregates the statement if it took at least the threshold.
+
+        Returns True when the statement was slow.
+        """
+        if duration < self.threshold:
+            return False
+        sql = self.normalize(query)
+        shape = self.params_shape(params)
+        plan = self.explain(connection, query, params)
+        duration_ms = duration * 1000
+        with self._lock:
+            entry = self._statements.pop(sql, None)
+            if entry is None:
+                entry = {"sql": sql, "count": 0, "total_ms": 0.0, "max_ms": 0.0}
+                if len(self._statements) >= self.max_statements:
+                    self._statements.popitem(last=False)
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["params"] = shape
+            entry["plan"] = plan
+            self._statements[sql] = entry
+            count = entry["count"]
+        self.logger.warning(
+            "Slow query (%.1f ms, seen %d times): %s params=%s plan=%s",
+            duration_ms, count, sql, shape, " | ".join(plan) or "-",
+        )
+        return True
+
+    def report(self, limit=None):
+        """
+        Returns the aggregated slow statements, most total time first.
+
+        "full_scan" flags statements whose plan scans a table or index.
+        """
+        with self._lock:
+            entries = [dict(entry) for entry in self._statements.values()]
+        for entry in entries:
+            entry["mean_ms"] = entry["total_ms"] / entry["count"]
+            entry["full_scan"] = any(step.startswith("SCAN") for step in entry["plan"])
+        entries.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self):
+        """
+        Forgets all aggregated statements.
+        """
+        with self._lock:
+            self._statements.clear()
@@ -0,0 +1,35 @@
+# sqlite_profiles.py
+import os
+
+# PRAGMAs applied to every new connection. A profile can be passed to the
+# database classes or chosen with the SQLITE_PROFILE environment variable;
+# with neither, connections keep SQLite's own defaults (synchronous=FULL).
+# cache_size is negative so SQLite reads it as KiB rather than pages.
+SQLITE_PROFILES = {
+    "durable": {
+        "journal_mode": "WAL", "synchronous": "FULL", "mmap_size": 0,
+        "cache_size": -2000, "temp_store": "DEFAULT", "busy_timeout": 5000,
+    },
+    "balanced": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16000, "temp_store": "MEMORY", "busy_timeout": 5000,
+    },
+    "read-heavy": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000, "temp_store": "MEMORY", "busy_timeout": 10000,
+    },
+    "bulk-load": {
+        "journal_mode": "WAL", "synchronous": "OFF", "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -128000, "temp_store": "MEMORY", "busy_timeout": 30000,
+    },
+}
+
+def apply_sqlite_profile(conn, profile=None):
+    name = profile or os.environ.get("SQLITE_PROFILE")
+    if name is None:
+        return conn
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {name}")
+    for pragma, value in SQLITE_PROFILES[name].items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
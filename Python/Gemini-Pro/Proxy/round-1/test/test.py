@@ -67,6 +67,21 @@ def test_delete_book_nonexistent(book_api):
      # No need for assert, just checking for no errors
     book_api.delete_book("978-2222222222")
 
+# --- Test slow query log ---
+def test_slow_query_log_captures_plan(tmp_path):
+    from your_module import SlowQueryLog
+    slow_queries = SlowQueryLog(threshold_ms=0)
+    with DatabaseProxy(str(tmp_path / "slow.db"), slow_query_log=slow_queries) as db_proxy:
+        db_proxy.execute_query("CREATE TABLE books (id INTEGER PRIMARY KEY, title TEXT, author TEXT, isbn TEXT UNIQUE)")
+        slow_queries.clear()
+        db_proxy.execute_query("SELECT * FROM books WHERE title = 'Emma'")
+        db_proxy.execute_query("SELECT * FROM books WHERE title = 'Dune'")
+    [entry] = slow_queries.report()
+    assert entry["sql"] == "SELECT * FROM books WHERE title = ?"
+    assert entry["count"] == 2
+    assert entry["full_scan"]
+    assert any(step.startswith("SCAN") for step in entry["plan"])
+
 # --- Run Tests ---
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file
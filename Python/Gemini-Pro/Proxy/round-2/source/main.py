@@ -1,16 +1,23 @@
 import sqlite3
+import time
+from index_advisor import IndexAdvisor
+from slow_query_log import SlowQueryLog
+from sqlite_profiles import apply_sqlite_profile
 
 class DatabaseProxy:
     """
     Proxy class for database connections, managing connections and validating data.
     """
 
-    def __init__(self, db_file):
+    def __init__(self, db_file, profile=None, slow_query_log=None, advisor=None):
         self.db_file = db_file
+        self.profile = profile
         self.conn = None
+        self.slow_queries = slow_query_log if slow_query_log is not None else SlowQueryLog()
+        self.advisor = advisor
 
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_file)
+        self.conn = apply_sqlite_profile(sqlite3.connect(self.db_file), self.profile)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -21,6 +28,9 @@ class DatabaseProxy:
     def execute(self, query, args=None):
         """
         Executes an SQL query with data validation.
+
+        Statements slower than the slow query log's threshold are logged
+        together with their query plan.
         """
         # Basic data validation
         if query.lower().startswith('insert'):
@@ -29,11 +39,18 @@ class DatabaseProxy:
 
         try:
             cursor = self.conn.cursor()
+            start = time.perf_counter()
             cursor.execute(query, args)
-            return cursor.fetchall()
+            rows = cursor.fetchall()
         except Exception as e:
             print(f"Database error: {e}")
             return None
+        # Recorded outside the try so a failure in the log or the advisor is
+        # not reported as a database error with the statement's rows lost.
+        self.slow_queries.record(self.conn, query, args, time.perf_counter() - start)
+        if self.advisor is not None:
+            self.advisor.record(query, args)
+        return rows
 
     def _validate_insert(self, args):
         """
@@ -46,8 +63,8 @@ class BookAPI:
     API for managing Book data using the Proxy Pattern.
     """
 
-    def __init__(self, db_file):
-        self.db_proxy = DatabaseProxy(db_file)
+    def __init__(self, db_file, profile=None, slow_query_log=None, advisor=None):
+        self.db_proxy = DatabaseProxy(db_file, profile, slow_query_log, advisor)
 
     def create_book(self, title, author, isbn):
         """
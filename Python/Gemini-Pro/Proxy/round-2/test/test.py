@@ -121,4 +121,62 @@ def test_database_proxy_error_handling(db_file):
             db.execute("SELECT * FROM non_existent_table")
         # Test invalid query syntax
         with pytest.raises(sqlite3.OperationalError):
-            db.execute("SELECT * FROM books WHERE")
\ No newline at end of file
+            db.execute("SELECT * FROM books WHERE")
+
+def test_slow_query_log(tmp_path):
+    """Test that slow statements are aggregated with their query plans."""
+    from your_module import SlowQueryLog, initialize_database
+    db_file = str(tmp_path / "slow.db")
+    initialize_database(db_file)
+    slow_queries = SlowQueryLog(threshold_ms=0)
+    book_api = BookAPI(db_file, slow_query_log=slow_queries)
+    book_api.create_book("Emma", "Jane Austen", "978-0141439587")
+    book_api.get_book("978-0141439587")
+    book_api.get_book("978-0000000000")
+    lookup = next(entry for entry in slow_queries.report() if entry["sql"].startswith("SELECT"))
+    assert lookup["count"] == 2
+    assert lookup["params"] == "(str)"
+    assert not lookup["full_scan"]
+
+def test_index_advisor(tmp_path):
+    """Test that filters on unindexed columns produce index recommendations."""
+    from your_module import IndexAdvisor, initialize_database
+    db_file = str(tmp_path / "advisor.db")
+    initialize_database(db_file)
+    with sqlite3.connect(db_file) as conn:
+        # 20 authors with 10 books each, so an author lookup reads 10 rows
+        # instead of scanning 200.
+        conn.executemany("INSERT INTO books (title, author, isbn) VALUES (?, ?, ?)",
+                         [(f"Title {n}", f"Author {n % 20}", f"978-{n:010d}") for n in range(200)])
+    advisor = IndexAdvisor()
+    book_api = BookAPI(db_file, advisor=advisor)
+    for _ in range(3):
+        book_api.get_book("978-0000000007")
+        with book_api.db_proxy as db:
+            db.execute("SELECT * FROM books WHERE author = ? ORDER BY title", ("Author 7",))
+    with sqlite3.connect(db_file) as conn:
+        # isbn is already UNIQUE, so only the author lookup needs an index
+        [recommendation] = advisor.recommend(conn)
+        assert recommendation["ddl"] == "CREATE INDEX IF NOT EXISTS idx_books_author_title ON books (author, title)"
+        assert recommendation["savings"] == (200 - 10) * 3
+        # The threshold is inclusive: exactly the estimated savings still qualifies.
+        advisor.min_rows_saved = recommendation["savings"]
+        assert len(advisor.recommend(conn)) == 1
+        advisor.min_rows_saved = recommendation["savings"] + 1
+        assert advisor.recommend(conn) == []
+        advisor.min_rows_saved = 1
+        advisor.apply(conn)
+        assert advisor.ddl(conn) == []
+
+def test_index_advisor_skips_indexes_that_save_nothing(tmp_path):
+    """Test that a lookup on a single-row table is not worth an index."""
+    from your_module import IndexAdvisor, initialize_database
+    db_file = str(tmp_path / "advisor.db")
+    initialize_database(db_file)
+    advisor = IndexAdvisor()
+    book_api = BookAPI(db_file, advisor=advisor)
+    book_api.create_book("Persuasion", "Jane Austen", "978-0141439686")
+    with book_api.db_proxy as db:
+        db.execute("SELECT * FROM books WHERE author = ?", ("Jane Austen",))
+    with sqlite3.connect(db_file) as conn:
+        assert advisor.ddl(conn) == []
@@ -1,19 +1,23 @@
 import sqlite3
-
+import time
+from slow_query_log import SlowQueryLog
+from sqlite_profiles import apply_sqlite_profile
 
 class DatabaseProxy:
     """
     Proxy class for managing database connections and interactions.
     """
 
-    def __init__(self, db_name):
+    def __init__(self, db_name, profile=None, slow_query_log=None):
         self.db_name = db_name
+        self.profile = profile
         self.connection = None
+        self.slow_queries = slow_query_log if slow_query_log is not None else SlowQueryLog()
 
     def connect(self):
         """Establishes a database connection if one doesn't exist."""
         if not self.connection:
-            self.connection = sqlite3.connect(self.db_name)
+            self.connection = apply_sqlite_profile(sqlite3.connect(self.db_name), self.profile)
             self.create_table()
 
     def disconnect(self):
@@ -37,15 +41,18 @@ class DatabaseProxy:
         self.connection.commit()
 
     def execute_query(self, query, params=None):
-        """Executes a given SQL query with optional parameters."""
+        """Executes a given SQL query, logging it with its plan if it is slow."""
         self.connect()
         cursor = self.connection.cursor()
+        start = time.perf_counter()
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
         self.connection.commit()
-        return cursor.fetchall()
+        rows = cursor.fetchall()
+        self.slow_queries.record(self.connection, query, params, time.perf_counter() - start)
+        return rows
 
 
 class BookAPI:
@@ -53,9 +60,43 @@ class BookAPI:
     Provides a CRUD API for managing book data through the DatabaseProxy.
     """
 
+    UPDATABLE_COLUMNS = ("title", "author")
+    # UPDATE statements keyed by the (sorted) columns being changed, so each
+    # shape of update is built (and its column names checked) only once.
+    _update_statements = {}
+    statement_hits = 0
+    statement_misses = 0
+
     def __init__(self, db_proxy):
         self.db_proxy = db_proxy
 
+    @classmethod
+    def _update_statement(cls, columns):
+        """Returns the memoized UPDATE statement for a sorted tuple of columns."""
+        query = cls._update_statements.get(columns)
+        if query is not None:
+            cls.statement_hits += 1
+            return query
+        cls.statement_misses += 1
+        for column in columns:
+            if column not in cls.UPDATABLE_COLUMNS:
+                raise ValueError(f"Column cannot be updated: {column}")
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        query = f"UPDATE books SET {assignments} WHERE isbn = ?"
+        cls._update_statements[columns] = query
+        return query
+
+    @classmethod
+    def statement_stats(cls):
+        """Returns how often update statements were reused rather than built."""
+        lookups = cls.statement_hits + cls.statement_misses
+        return {
+            "statements": len(cls._update_statements),
+            "hits": cls.statement_hits,
+            "misses": cls.statement_misses,
+            "hit_rate": cls.statement_hits / lookups if lookups else 0.0,
+        }
+
     def create_book(self, title, author, isbn):
         """Creates a new book entry in the database."""
         query = "INSERT INTO books (isbn, title, author) VALUES (?, ?, ?)"
@@ -72,19 +113,13 @@ class BookAPI:
         else:
             return {"message": f"Book with ISBN {isbn} not found."}
 
-    def update_book(self, isbn, title=None, author=None):
-        """Updates a book entry by its ISBN."""
-        query = "UPDATE books SET "
-        params = []
-        if title:
-            query += "title = ?,"
-            params.append(title)
-        if author:
-            query += "author = ?,"
-            params.append(author)
-        query = query[:-1] + " WHERE isbn = ?"
-        params.append(isbn)
-        self.db_proxy.execute_query(query, tuple(params))
+    def update_book(self, isbn, /, **changes):
+        """Updates a book entry by its ISBN, given any of UPDATABLE_COLUMNS as keywords."""
+        columns = tuple(sorted(column for column, value in changes.items() if value is not None))
+        if not columns:
+            raise ValueError(f"Nothing to update: pass any of {', '.join(self.UPDATABLE_COLUMNS)}.")
+        params = tuple(changes[column] for column in columns) + (isbn,)
+        self.db_proxy.execute_query(self._update_statement(columns), params)
         return {"message": f"Book with ISBN {isbn} updated successfully."}
 
     def delete_book(self, isbn):
@@ -60,6 +60,28 @@ def test_update_book_nonexistent(db_proxy_fixture):
     assert result == {"message": "Book with ISBN 9876543210 updated successfully."}
 
 
+def test_update_book_reuses_statement(db_proxy_fixture):
+    api = BookAPI(db_proxy_fixture)
+    api.update_book("1234567890", title="First")
+    query = BookAPI._update_statements[("title",)]
+    api.update_book("1234567890", title="Second")
+    assert BookAPI._update_statements[("title",)] is query
+    assert query == "UPDATE books SET title = ? WHERE isbn = ?"
+
+
+def test_update_book_validates_columns(db_proxy_fixture):
+    api = BookAPI(db_proxy_fixture)
+    api.create_book("Test Book", "Test Author", "1234567890")
+    api.update_book("1234567890", title="First", author="Someone")
+    hits = BookAPI.statement_stats()["hits"]
+    api.update_book("1234567890", author="Someone Else", title="Second")
+    assert BookAPI.statement_stats()["hits"] == hits + 1
+    with pytest.raises(ValueError):
+        api.update_book("1234567890", isbn="0000000000")
+    with pytest.raises(ValueError):
+        api.update_book("1234567890")
+
+
 def test_delete_book_existing(db_proxy_fixture):
     api = BookAPI(db_proxy_fixture)
     api.create_book("Test Book", "Test Author", "1234567890")
@@ -101,4 +123,17 @@ def test_execute_query_no_params(db_proxy_fixture):
         ("978-0123456789", "Test Title", "Test Author"),
     )
     result = db_proxy_fixture.execute_query("SELECT * FROM books")
-    assert len(result) > 0
\ No newline at end of file
+    assert len(result) > 0
+
+
+def test_slow_query_log_threshold(db_proxy_fixture):
+    from your_module import SlowQueryLog
+    db_proxy_fixture.slow_queries = SlowQueryLog(threshold_ms=60_000)
+    db_proxy_fixture.execute_query("SELECT * FROM books")
+    assert db_proxy_fixture.slow_queries.report() == []
+
+    db_proxy_fixture.slow_queries.threshold = 0
+    db_proxy_fixture.execute_query("SELECT * FROM books WHERE author = ?", ("Test Author",))
+    [entry] = db_proxy_fixture.slow_queries.report()
+    assert entry["sql"] == "SELECT * FROM books WHERE author = ?"
+    assert entry["full_scan"]
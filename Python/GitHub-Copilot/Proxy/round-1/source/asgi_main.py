@@ -0,0 +1,116 @@
+# asgi_main.py
+# ASGI version of the /create, /read, /update and /delete routes in main.py.
+# Run with any ASGI server, e.g. `uvicorn asgi_main:app`.
+import json
+import logging
+import re
+from urllib.parse import parse_qsl
+from async_database_proxy import AsyncDatabaseProxy
+from bulk import data_row
+from pagination import MAX_PAGE_SIZE, PAGE_ARGS, parse_page_args, build_page, first_page
+
+db_proxy = AsyncDatabaseProxy()
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+async def read_json(receive):
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise HTTPError(499, "Client disconnected")
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    try:
+        return json.loads(body or b'null')
+    except ValueError:
+        raise HTTPError(400, "Request body must be JSON")
+
+async def send_json(send, status, payload, headers=None):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())]
+                   + [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def read_data(receive):
+    # Same check /create/bulk applies to each item
+    payload = await read_json(receive)
+    try:
+        (data,) = data_row(payload.get('data') if isinstance(payload, dict) else None)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return data
+
+async def create(scope, receive):
+    data = await read_data(receive)
+    await db_proxy.add_record(data)
+    return 201, {"message": "Record added"}
+
+async def read(scope, receive):
+    args = dict(parse_qsl(scope.get('query_string', b'').decode()))
+    if not PAGE_ARGS.intersection(args):
+        return (200, *first_page(await db_proxy.fetch_records(limit=MAX_PAGE_SIZE + 1)))
+    try:
+        limit, after, before = parse_page_args(args)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    records = await db_proxy.fetch_records(limit=limit + 1, after=after, before=before)
+    return 200, build_page(records, limit, after, before)
+
+async def update(scope, receive, record_id):
+    data = await read_data(receive)
+    await db_proxy.update_record(record_id, data)
+    return 200, {"message": "Record updated"}
+
+async def delete(scope, receive, record_id):
+    await db_proxy.delete_record(record_id)
+    return 200, {"message": "Record deleted"}
+
+ROUTES = [
+    (re.compile(r'^/create$'), 'POST', create),
+    (re.compile(r'^/read$'), 'GET', read),
+    (re.compile(r'^/update/(\d+)$'), 'PUT', update),
+    (re.compile(r'^/delete/(\d+)$'), 'DELETE', delete),
+]
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            logging.basicConfig(level=logging.INFO)
+            await db_proxy.create_table()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            db_proxy.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    for pattern, method, handler in ROUTES:
+        match = pattern.match(scope['path'])
+        if not match:
+            continue
+        if scope['method'] != method:
+            return await send_json(send, 405, {"error": "Method not allowed"})
+        try:
+            # Handlers return (status, payload) or (status, payload, headers)
+            status, payload, *headers = await handler(scope, receive, *(int(group) for group in match.groups()))
+        except HTTPError as e:
+            if e.status == 499:
+                return
+            status, payload, headers = e.status, {"error": str(e)}, []
+        return await send_json(send, status, payload, *headers)
+    await send_json(send, 404, {"error": "Not found"})
\ No newline at end of file
@@ -0,0 +1,79 @@
+# async_database_proxy.py
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from connection_pool import ConnectionPool
+from pagination import keyset_query
+from group_commit_writer import WriteResult
+
+class AsyncDatabaseProxy:
+    def __init__(self, db_name='database.db', max_workers=8, writer=None, profile=None):
+        self.db_name = db_name
+        self.writer = writer
+        self._max_workers = max_workers
+        # Nothing is opened or started until the first request, so building a
+        # proxy at import costs nothing. Executor threads borrow connections
+        # from the pool; under WAL their reads run concurrently and never
+        # block on a writer, and connections idle past max_idle are closed.
+        self._executor = None
+        self._pool = ConnectionPool(db_name, min_size=0, max_size=max_workers, profile=profile)
+        # Requests wait for a worker here, on the event loop, rather than in
+        # the executor's queue: a request cancelled while waiting (say, its
+        # client disconnected) never reaches SQLite.
+        self._slots = asyncio.Semaphore(max_workers)
+
+    async def _run(self, fn, *args):
+        async with self._slots:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='sqlite-async')
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _write(self, query, params):
+        with self._pool.connection() as conn:
+            cursor = conn.execute(query, params)
+        return WriteResult(cursor.lastrowid, cursor.rowcount)
+
+    def _fetch(self, query, params):
+        with self._pool.connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    async def _submit_write(self, query, params=()):
+        if self.writer is not None:
+            # The writer thread does the work, so no executor slot is held
+            # while the write waits for its group commit.
+            return await asyncio.wrap_future(self.writer.submit(query, params))
+        return await self._run(self._write, query, params)
+
+    async def create_table(self):
+        logging.info("Creating table...")
+        await self._run(self._write, '''CREATE TABLE IF NOT EXISTS records (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                data TEXT NOT NULL)''', ())
+
+    async def add_record(self, data):
+        logging.info(f"Adding record: {data}")
+        result = await self._submit_write('INSERT INTO records (data) VALUES (?)', (data,))
+        return result.lastrowid
+
+    async def fetch_records(self, limit=None, after=None, before=None):
+        logging.info("Fetching records...")
+        query, params, backward = keyset_query(limit, after, before)
+        rows = await self._run(self._fetch, query, params)
+        return rows[::-1] if backward else rows
+
+    async def update_record(self, record_id, data):
+        logging.info(f"Updating record {record_id} with data: {data}")
+        result = await self._submit_write('UPDATE records SET data = ? WHERE id = ?', (data, record_id))
+        return result.rowcount
+
+    async def delete_record(self, record_id):
+        logging.info(f"Deleting record {record_id}")
+        result = await self._submit_write('DELETE FROM records WHERE id = ?', (record_id,))
+        return result.rowcount
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pool.close()
\ No newline at end of file
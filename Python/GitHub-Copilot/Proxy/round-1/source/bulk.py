@@ -0,0 +1,28 @@
+# bulk.py
+
+def data_row(item):
+    if not isinstance(item, str):
+        raise ValueError("data must be a string")
+    return (item,)
+
+class BulkRows:
+    # Splits the items of a bulk insert into the rows to write and an error
+    # for each item to_row rejected (by raising ValueError). ids keeps one
+    # slot per item, so results can be reported by position.
+    def __init__(self, items, to_row=data_row):
+        self.ids, self.errors, self.rows, self._positions = [], [], [], []
+        for index, item in enumerate(items):
+            self.ids.append(None)
+            try:
+                row = to_row(item)
+            except ValueError as e:
+                self.errors.append({"index": index, "error": str(e)})
+                continue
+            self._positions.append(index)
+            self.rows.append(row)
+
+    def assign(self, new_ids):
+        # new_ids are the ids the rows were inserted under, in order.
+        for position, record_id in zip(self._positions, new_ids):
+            self.ids[position] = record_id
+        return self.ids, self.errors
@@ -0,0 +1,184 @@
+# connection_pool.py
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from sqlite_profiles import apply_sqlite_profile
+
+class PoolTimeout(Exception):
+    pass
+
+class ConnectionPool:
+    def __init__(self, db_name, min_size=1, max_size=5, timeout=5.0,
+                 max_idle=300.0, health_check_after=30.0, profile=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._db_name = db_name
+        self._min_size = min_size
+        self._max_size = max_size
+        self._timeout = timeout
+        self._max_idle = max_idle
+        self._health_check_after = health_check_after
+        self._profile = profile
+        # Idle connections as (connection, last_released) pairs. The newest sit
+        # on the right so hot connections are reused and the left end ages out.
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0, "hits": 0, "misses": 0, "waits": 0,
+            "wait_time": 0.0, "timeouts": 0, "discarded": 0, "reaped": 0,
+        }
+        # Connections are opened lazily by the process that uses them, see
+        # _check_process_locked().
+        self._pid = None
+        self._inherited = []
+
+    def _open(self):
+        # Connections move between Flask worker threads, but the pool only
+        # ever hands one to a single thread at a time.
+        return apply_sqlite_profile(sqlite3.connect(self._db_name, check_same_thread=False), self._profile)
+
+    def _check_process_locked(self):
+        # A SQLite connection must not be carried across fork(). When a worker
+        # forked from the process that filled the pool first uses it, the
+        # parent's connections are dropped without being used or closed (they
+        # stay referenced so garbage collection doesn't close them either) and
+        # the pool starts over with connections of its own.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        if self._pid is not None:
+            self._inherited.extend(conn for conn, _ in self._idle)
+            self._idle.clear()
+            self._size = 0
+        self._pid = pid
+        now = time.monotonic()
+        while self._size < self._min_size:
+            self._idle.append((self._open(), now))
+            self._size += 1
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _reap_locked(self, now):
+        reaped = []
+        while (self._idle and self._size > self._min_size
+               and now - self._idle[0][1] > self._max_idle):
+            reaped.append(self._idle.popleft()[0])
+            self._size -= 1
+        self._stats["reaped"] += len(reaped)
+        return reaped
+
+    def acquire(self, timeout=None):
+        timeout = self._timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                self._check_process_locked()
+                while not self._idle and self._size >= self._max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No connection available within {timeout:.3f}s")
+                    if not waited:
+                        waited = True
+                        self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+                now = time.monotonic()
+                if waited:
+                    self._stats["wait_time"] += now - start
+                self._stats["checkouts"] += 1
+                reaped = self._reap_locked(now)
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    self._stats["hits"] += 1
+                else:
+                    conn, released_at = None, now
+                    self._size += 1
+                    self._stats["misses"] += 1
+            for stale in reaped:
+                stale.close()
+            if conn is None:
+                try:
+                    return self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            if now - released_at < self._health_check_after or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn):
+        if self._pid != os.getpid():
+            return  # checked out before a fork, so not this process's to reuse
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                return
+            now = time.monotonic()
+            self._idle.append((conn, now))
+            reaped = self._reap_locked(now)
+            self._cond.notify()
+        for stale in reaped:
+            stale.close()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.release(conn)
+
+    def reap_idle(self):
+        with self._cond:
+            self._check_process_locked()
+            reaped = self._reap_locked(time.monotonic())
+        for stale in reaped:
+            stale.close()
+        return len(reaped)
+
+    def stats(self):
+        with self._cond:
+            in_use = self._size - len(self._idle)
+            return dict(self._stats, size=self._size, idle=len(self._idle), in_use=in_use)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            if self._pid != os.getpid():
+                return
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            conn.close()
@@ -1,12 +1,34 @@
 # database_manager.py
-import sqlite3
+from concurrent.futures import Future
+from connection_pool import ConnectionPool
+from group_commit_writer import WriteResult
+from pagination import keyset_query
 
 class DatabaseManager:
-    def __init__(self, db_name='database.db'):
+    def __init__(self, db_name='database.db', pool=None, writer=None, profile=None):
         self.db_name = db_name
+        self.pool = pool or ConnectionPool(db_name, profile=profile)
+        self.writer = writer
 
     def connect(self):
-        return sqlite3.connect(self.db_name)
+        return self.pool.connection()
+
+    def pool_stats(self):
+        return self.pool.stats()
+
+    def submit_write(self, query, params=()):
+        if self.writer is not None:
+            return self.writer.submit(query, params)
+        future = Future()
+        try:
+            with self.connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                conn.commit()
+            future.set_result(WriteResult(cursor.lastrowid, cursor.rowcount))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
     def create_table(self):
         with self.connect() as conn:
@@ -17,25 +39,51 @@ class DatabaseManager:
             conn.commit()
 
     def add_record(self, data):
+        return self.submit_write('INSERT INTO records (data) VALUES (?)', (data,)).result().lastrowid
+
+    def add_records(self, rows, chunk_size=500):
+        query = 'INSERT INTO records (data) VALUES (?)'
+        chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+        ids = []
+        if self.writer is not None:
+            for future in [self.writer.submit_many(query, chunk) for chunk in chunks]:
+                result = future.result()
+                ids.extend(range(result.lastrowid - result.rowcount + 1, result.lastrowid + 1))
+            return ids
         with self.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('INSERT INTO records (data) VALUES (?)', (data,))
+            for chunk in chunks:
+                cursor.executemany(query, chunk)
+                # The chunk holds the write lock, so its rows get consecutive
+                # rowids ending at last_insert_rowid().
+                last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+                ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
             conn.commit()
+        return ids
 
-    def fetch_records(self):
+    def fetch_records(self, limit=None, after=None, before=None):
+        query, params, backward = keyset_query(limit, after, before)
         with self.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM records')
-            return cursor.fetchall()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        return rows[::-1] if backward else rows
 
-    def update_record(self, record_id, data):
+    def iter_records(self, batch_size=500):
         with self.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('UPDATE records SET data = ? WHERE id = ?', (data, record_id))
-            conn.commit()
+            try:
+                cursor.execute('SELECT * FROM records ORDER BY id')
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
+    def update_record(self, record_id, data):
+        return self.submit_write('UPDATE records SET data = ? WHERE id = ?', (data, record_id)).result().rowcount
 
     def delete_record(self, record_id):
-        with self.connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM records WHERE id = ?', (record_id,))
-            conn.commit()
\ No newline at end of file
+        return self.submit_write('DELETE FROM records WHERE id = ?', (record_id,)).result().rowcount
\ No newline at end of file
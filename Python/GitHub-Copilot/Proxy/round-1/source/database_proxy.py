@@ -1,28 +1,48 @@
 # database_proxy.py
 import sqlite3
 import logging
+from bulk import BulkRows
+from metrics import Metrics, instrumented
 
 class DatabaseProxy:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, metrics=None):
         self.db_manager = db_manager
+        self.metrics = metrics if metrics is not None else Metrics()
         logging.basicConfig(level=logging.INFO)
 
     def create_table(self):
         logging.info("Creating table...")
         self.db_manager.create_table()
 
+    @instrumented('create', rows=lambda record_id: 1)
     def add_record(self, data):
-        logging.info(f"Adding record: {data}")
-        self.db_manager.add_record(data)
+        logging.info("Adding record: %s", data)
+        return self.db_manager.add_record(data)
 
-    def fetch_records(self):
+    @instrumented('create_bulk', rows=lambda result: sum(record_id is not None for record_id in result[0]))
+    def add_records(self, records, chunk_size=500):
+        logging.info("Adding records in bulk...")
+        batch = BulkRows(records)
+        return batch.assign(self.db_manager.add_records(batch.rows, chunk_size))
+
+    @instrumented('read', rows=len)
+    def fetch_records(self, limit=None, after=None, before=None):
         logging.info("Fetching records...")
-        return self.db_manager.fetch_records()
+        return self.db_manager.fetch_records(limit=limit, after=after, before=before)
+
+    def iter_records(self, batch_size=500):
+        logging.info("Streaming records...")
+        return self.db_manager.iter_records(batch_size)
 
+    @instrumented('update', rows=lambda rowcount: rowcount)
     def update_record(self, record_id, data):
-        logging.info(f"Updating record {record_id} with data: {data}")
-        self.db_manager.update_record(record_id, data)
+        logging.info("Updating record %s with data: %s", record_id, data)
+        return self.db_manager.update_record(record_id, data)
 
+    @instrumented('delete', rows=lambda rowcount: rowcount)
     def delete_record(self, record_id):
-        logging.info(f"Deleting record {record_id}")
-        self.db_manager.delete_record(record_id)
\ No newline at end of file
+        logging.info("Deleting record %s", record_id)
+        return self.db_manager.delete_record(record_id)
+
+    def pool_stats(self):
+        return self.db_manager.pool_stats()
\ No newline at end of file
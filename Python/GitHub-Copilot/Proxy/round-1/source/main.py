@@ -1,22 +1,81 @@
 # app.py
-from flask import Flask, request, jsonify
+import csv
+import io
+import json
+from flask import Flask, Response, request, jsonify
 from database_proxy import DatabaseProxy
 from database_manager import DatabaseManager
+from pagination import MAX_PAGE_SIZE, PAGE_ARGS, parse_page_args, build_page, first_page
 
 app = Flask(__name__)
 db_manager = DatabaseManager()
 db_proxy = DatabaseProxy(db_manager)
 
+EXPORT_COLUMNS = ('id', 'data')
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def export_chunks(records, fmt, chunk_rows=500):
+    # Rows are serialized into one buffer and flushed every chunk_rows rows,
+    # so memory stays flat while the response avoids a write per row.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    try:
+        for count, record in enumerate(records, 1):
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, record))))
+                buffer.write('\n')
+            if count % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # Closing the response (including on client disconnect) closes this
+        # generator, which stops the cursor and releases its connection.
+        records.close()
+
 @app.route('/create', methods=['POST'])
 def create():
     data = request.json.get('data')
     db_proxy.add_record(data)
     return jsonify({"message": "Record added"}), 201
 
+@app.route('/create/bulk', methods=['POST'])
+def create_bulk():
+    items = request.json
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON array of records"}), 400
+    ids, errors = db_proxy.add_records(item.get('data') if isinstance(item, dict) else None for item in items)
+    return jsonify({"ids": ids, "errors": errors}), 201
+
 @app.route('/read', methods=['GET'])
 def read():
-    records = db_proxy.fetch_records()
-    return jsonify(records), 200
+    if not PAGE_ARGS.intersection(request.args):
+        records, headers = first_page(db_proxy.fetch_records(limit=MAX_PAGE_SIZE + 1))
+        return jsonify(records), 200, headers
+    try:
+        limit, after, before = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    records = db_proxy.fetch_records(limit=limit + 1, after=after, before=before)
+    return jsonify(build_page(records, limit, after, before)), 200
+
+@app.route('/export', methods=['GET'])
+def export():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    headers = {'Content-Disposition': f'attachment; filename=records.{fmt}'}
+    return Response(export_chunks(db_proxy.iter_records(), fmt), mimetype=EXPORT_MIMETYPES[fmt], headers=headers)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(db_proxy.metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/update/<int:record_id>', methods=['PUT'])
 def update(record_id):
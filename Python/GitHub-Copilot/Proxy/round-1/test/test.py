@@ -42,4 +42,12 @@ def test_delete_record(client):
     assert response.status_code == 200
     assert response.json == {"message": "Record deleted"}
     response = client.get('/read')
-    assert response.json == []
\ No newline at end of file
+    assert response.json == []
+
+def test_export_records(client):
+    client.post('/create', json={'data': 'export data'})
+    response = client.get('/export?format=csv')
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == 'id,data'
+    assert lines[-1].endswith(',export data')
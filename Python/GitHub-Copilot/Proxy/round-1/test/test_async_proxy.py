@@ -0,0 +1,64 @@
+import asyncio
+import json
+import pytest
+import asgi_main
+from async_database_proxy import AsyncDatabaseProxy
+
+@pytest.fixture
+def async_proxy(tmp_path):
+    proxy = AsyncDatabaseProxy(str(tmp_path / 'async.db'), max_workers=4)
+    asyncio.run(proxy.create_table())
+    yield proxy
+    proxy.close()
+
+def call(app, method, path, body=None, query_string=b''):
+    async def run():
+        messages = []
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query_string}
+        request = {'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}
+
+        async def receive():
+            return request
+
+        async def send(message):
+            messages.append(message)
+
+        await app(scope, receive, send)
+        return messages[0]['status'], json.loads(messages[1]['body'])
+    return asyncio.run(run())
+
+def test_async_proxy_crud(async_proxy):
+    async def run():
+        record_id = await async_proxy.add_record('test data')
+        assert await async_proxy.fetch_records() == [(record_id, 'test data')]
+        assert await async_proxy.update_record(record_id, 'updated data') == 1
+        assert await async_proxy.fetch_records() == [(record_id, 'updated data')]
+        assert await async_proxy.delete_record(record_id) == 1
+        assert await async_proxy.fetch_records() == []
+    asyncio.run(run())
+
+def test_async_proxy_concurrent_requests(async_proxy):
+    async def run():
+        await asyncio.gather(*(async_proxy.add_record(f'data {i}') for i in range(50)))
+        pages = await asyncio.gather(*(async_proxy.fetch_records(limit=10) for _ in range(20)))
+        assert all(len(page) == 10 for page in pages)
+        assert len(await async_proxy.fetch_records()) == 50
+    asyncio.run(run())
+
+def test_asgi_routes(async_proxy, monkeypatch):
+    monkeypatch.setattr(asgi_main, 'db_proxy', async_proxy)
+    assert call(asgi_main.app, 'POST', '/create', {'data': 'test data'}) == (201, {"message": "Record added"})
+    assert call(asgi_main.app, 'GET', '/read') == (200, [[1, 'test data']])
+    assert call(asgi_main.app, 'PUT', '/update/1', {'data': 'updated'}) == (200, {"message": "Record updated"})
+    status, page = call(asgi_main.app, 'GET', '/read', query_string=b'limit=1')
+    assert status == 200
+    assert page['records'] == [[1, 'updated']]
+    assert call(asgi_main.app, 'DELETE', '/delete/1') == (200, {"message": "Record deleted"})
+    assert call(asgi_main.app, 'GET', '/delete/1')[0] == 405
+    assert call(asgi_main.app, 'GET', '/missing')[0] == 404
+
+def test_asgi_create_rejects_missing_data(async_proxy, monkeypatch):
+    monkeypatch.setattr(asgi_main, 'db_proxy', async_proxy)
+    assert call(asgi_main.app, 'POST', '/create', {}) == (400, {"error": "data must be a string"})
+    assert call(asgi_main.app, 'PUT', '/update/1', {'data': 42})[0] == 400
+    assert call(asgi_main.app, 'GET', '/read') == (200, [])
\ No newline at end of file
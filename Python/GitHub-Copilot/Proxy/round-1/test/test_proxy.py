@@ -31,4 +31,21 @@ def test_proxy_update_record(db_proxy, db_manager):
 
 def test_proxy_delete_record(db_proxy, db_manager):
     db_proxy.delete_record(1)
-    db_manager.delete_record.assert_called_once_with(1)
\ No newline at end of file
+    db_manager.delete_record.assert_called_once_with(1)
+
+def test_proxy_pool_stats(db_proxy, db_manager):
+    db_manager.pool_stats.return_value = {'hits': 3, 'waits': 0}
+    assert db_proxy.pool_stats() == {'hits': 3, 'waits': 0}
+    db_manager.pool_stats.assert_called_once()
+
+def test_proxy_metrics(db_proxy, db_manager):
+    db_manager.fetch_records.return_value = [(1, 'a'), (2, 'b')]
+    db_manager.delete_record.side_effect = RuntimeError('locked')
+    db_proxy.fetch_records()
+    with pytest.raises(RuntimeError):
+        db_proxy.delete_record(1)
+    text = db_proxy.metrics.render()
+    assert 'db_proxy_duration_seconds_count{operation="read",table="records"} 1' in text
+    assert 'db_proxy_rows_total{operation="read",table="records"} 2' in text
+    assert 'db_proxy_errors_total{operation="delete",table="records"} 1' in text
+    assert 'db_proxy_in_flight{operation="delete",table="records"} 0' in text
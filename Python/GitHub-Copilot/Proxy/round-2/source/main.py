@@ -1,78 +1,200 @@
 # app.py
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import csv
+import io
+import json
 import sqlite3
 import logging
+import os
+import threading
+from bulk import BulkRows
+from group_commit_writer import GroupCommitWriter
+from metrics import Metrics, instrumented
+from pagination import keyset_query, MAX_PAGE_SIZE, PAGE_ARGS, parse_page_args, build_page, first_page
+from sqlite_profiles import apply_sqlite_profile
 
 app = Flask(__name__)
 
+# Write Serializer
 # Real Subject Class
 class DatabaseManager:
-    def __init__(self, db_name):
+    def __init__(self, db_name, profile=None):
         self.db_name = db_name
-        self.conn = None
+        self.profile = profile
+        self.writer = None
+        self._local = threading.local()
+        # Reader connections by the thread that opened them
+        self._readers = {}
+        self._readers_lock = threading.Lock()
+        # Reader connections belong to the process that opened them, see
+        # _reader().
+        self._pid = os.getpid()
+        self._inherited = []
 
     def connect(self):
-        self.conn = sqlite3.connect(self.db_name)
-        self.conn.execute('''CREATE TABLE IF NOT EXISTS records
+        # Creates the schema and the writer; the writer thread and every
+        # reader connection are opened lazily, in the process that uses them.
+        conn = apply_sqlite_profile(sqlite3.connect(self.db_name), self.profile)
+        try:
+            conn.execute('''CREATE TABLE IF NOT EXISTS records
                              (id INTEGER PRIMARY KEY AUTOINCREMENT,
                               data TEXT NOT NULL);''')
+            conn.commit()
+        finally:
+            conn.close()
+        # Flask serves requests from many threads, so writes are funnelled
+        # through a single writer thread and every thread reads on its own
+        # connection instead of sharing one sqlite3 handle.
+        self.writer = GroupCommitWriter(self.db_name, profile=self.profile)
+
+    def _reader(self):
+        if self._pid != os.getpid():
+            with self._readers_lock:
+                if self._pid != os.getpid():
+                    # Forked: a SQLite connection must not be carried across
+                    # fork(), so the parent's readers are neither used nor
+                    # closed here (they stay referenced so garbage collection
+                    # doesn't close them either) and each thread opens anew.
+                    self._inherited.extend(self._readers.values())
+                    self._readers = {}
+                    self._local = threading.local()
+                    self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = apply_sqlite_profile(sqlite3.connect(self.db_name, check_same_thread=False), self.profile)
+            self._local.conn = conn
+            with self._readers_lock:
+                # The Flask server starts a thread per request, so close the
+                # readers of threads that have exited rather than keep one
+                # open connection per request ever served.
+                for thread in [thread for thread in self._readers if not thread.is_alive()]:
+                    self._readers.pop(thread).close()
+                self._readers[threading.current_thread()] = conn
+        return conn
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        if self.writer:
+            self.writer.close()
+        with self._readers_lock:
+            if self._pid != os.getpid():
+                return
+            readers, self._readers = self._readers, {}
+        for conn in readers.values():
+            conn.close()
 
     def add_record(self, data):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO records (data) VALUES (?)", (data,))
-        self.conn.commit()
-        return cursor.lastrowid
-
-    def fetch_records(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM records")
-        return cursor.fetchall()
+        return self.writer.submit("INSERT INTO records (data) VALUES (?)", (data,)).result().lastrowid
+
+    def add_records(self, rows, chunk_size=500):
+        query = "INSERT INTO records (data) VALUES (?)"
+        futures = [self.writer.submit_many(query, rows[start:start + chunk_size])
+                   for start in range(0, len(rows), chunk_size)]
+        ids = []
+        for future in futures:
+            # Each chunk is one executemany holding the write lock, so its
+            # rowids are consecutive and end at the reported lastrowid.
+            result = future.result()
+            ids.extend(range(result.lastrowid - result.rowcount + 1, result.lastrowid + 1))
+        return ids
+
+    def fetch_records(self, limit=None, after=None, before=None):
+        query, params, backward = keyset_query(limit, after, before)
+        cursor = self._reader().cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        return rows[::-1] if backward else rows
+
+    def iter_records(self, batch_size=500):
+        cursor = self._reader().cursor()
+        try:
+            cursor.execute("SELECT * FROM records ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
 
     def update_record(self, record_id, data):
-        cursor = self.conn.cursor()
-        cursor.execute("UPDATE records SET data = ? WHERE id = ?", (data, record_id))
-        self.conn.commit()
-        return cursor.rowcount
+        return self.writer.submit("UPDATE records SET data = ? WHERE id = ?", (data, record_id)).result().rowcount
 
     def delete_record(self, record_id):
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM records WHERE id = ?", (record_id,))
-        self.conn.commit()
-        return cursor.rowcount
+        return self.writer.submit("DELETE FROM records WHERE id = ?", (record_id,)).result().rowcount
 
 # Proxy Class
 class DatabaseProxy:
-    def __init__(self, db_name):
-        self.db_manager = DatabaseManager(db_name)
+    def __init__(self, db_name, profile=None, metrics=None):
+        self.db_manager = DatabaseManager(db_name, profile)
+        self.metrics = metrics if metrics is not None else Metrics()
         self.db_manager.connect()
         logging.basicConfig(level=logging.INFO)
 
     def __del__(self):
         self.db_manager.close()
 
+    @instrumented("create", rows=lambda record_id: 1)
     def add_record(self, data):
-        logging.info(f"Adding record: {data}")
+        logging.info("Adding record: %s", data)
         return self.db_manager.add_record(data)
 
-    def fetch_records(self):
+    @instrumented("create_bulk", rows=lambda result: sum(record_id is not None for record_id in result[0]))
+    def add_records(self, records, chunk_size=500):
+        logging.info("Adding records in bulk")
+        batch = BulkRows(records)
+        return batch.assign(self.db_manager.add_records(batch.rows, chunk_size))
+
+    @instrumented("read", rows=len)
+    def fetch_records(self, limit=None, after=None, before=None):
         logging.info("Fetching records")
-        return self.db_manager.fetch_records()
+        return self.db_manager.fetch_records(limit=limit, after=after, before=before)
+
+    def iter_records(self, batch_size=500):
+        logging.info("Streaming records")
+        return self.db_manager.iter_records(batch_size)
 
+    @instrumented("update", rows=lambda rowcount: rowcount)
     def update_record(self, record_id, data):
-        logging.info(f"Updating record {record_id} with data: {data}")
+        logging.info("Updating record %s with data: %s", record_id, data)
         return self.db_manager.update_record(record_id, data)
 
+    @instrumented("delete", rows=lambda rowcount: rowcount)
     def delete_record(self, record_id):
-        logging.info(f"Deleting record {record_id}")
+        logging.info("Deleting record %s", record_id)
         return self.db_manager.delete_record(record_id)
 
-# Initialize Proxy
+# Initialize Proxy (creates the schema at import, so once before tools/serve_prefork.py
+# or gunicorn --preload forks the workers)
 db_proxy = DatabaseProxy('test.db')
 
+EXPORT_COLUMNS = ('id', 'data')
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def export_chunks(records, fmt, chunk_rows=500):
+    # Rows are serialized into one buffer and flushed every chunk_rows rows,
+    # so memory stays flat while the response avoids a write per row.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    try:
+        for count, record in enumerate(records, 1):
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, record))))
+                buffer.write('\n')
+            if count % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # Closing the response (including on client disconnect) closes this
+        # generator, which stops the cursor and releases its connection.
+        records.close()
+
 # Flask Routes
 @app.route('/create', methods=['POST'])
 def create():
@@ -80,10 +202,37 @@ def create():
     record_id = db_proxy.add_record(data)
     return jsonify({'id': record_id}), 201
 
+@app.route('/create/bulk', methods=['POST'])
+def create_bulk():
+    items = request.json
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON array of records"}), 400
+    ids, errors = db_proxy.add_records(item.get('data') if isinstance(item, dict) else None for item in items)
+    return jsonify({"ids": ids, "errors": errors}), 201
+
 @app.route('/read', methods=['GET'])
 def read():
-    records = db_proxy.fetch_records()
-    return jsonify(records), 200
+    if not PAGE_ARGS.intersection(request.args):
+        records, headers = first_page(db_proxy.fetch_records(limit=MAX_PAGE_SIZE + 1))
+        return jsonify(records), 200, headers
+    try:
+        limit, after, before = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    records = db_proxy.fetch_records(limit=limit + 1, after=after, before=before)
+    return jsonify(build_page(records, limit, after, before)), 200
+
+@app.route('/export', methods=['GET'])
+def export():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    headers = {'Content-Disposition': f'attachment; filename=records.{fmt}'}
+    return Response(export_chunks(db_proxy.iter_records(), fmt), mimetype=EXPORT_MIMETYPES[fmt], headers=headers)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(db_proxy.metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/update', methods=['PUT'])
 def update():
@@ -98,5 +247,7 @@ def delete():
     rows_deleted = db_proxy.delete_record(record_id)
     return jsonify({'rows_deleted': rows_deleted}), 200
 
+# Multi-worker serving: python tools/serve_prefork.py GitHub-Copilot/Proxy/round-2/source/main.py --workers 8
+# or gunicorn --preload, which also imports the app once before forking.
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
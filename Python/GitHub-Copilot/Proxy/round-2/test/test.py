@@ -60,4 +60,95 @@ def test_proxy_update_record():
 def test_proxy_delete_record():
     record_id = db_proxy.add_record('Proxy Test Data')
     rows_deleted = db_proxy.delete_record(record_id)
-    assert rows_deleted == 1
\ No newline at end of file
+    assert rows_deleted == 1
+def test_concurrent_writes_from_threads():
+    import threading
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(20):
+                db_proxy.add_record('Threaded Data')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+def test_read_records_paginated(client):
+    for i in range(3):
+        client.post('/create', json={'data': f'Page Data {i}'})
+    page = client.get('/read?limit=1').get_json()
+    assert len(page['records']) == 1
+    assert page['next'] is not None
+    next_page = client.get(f"/read?limit=1&after={page['next']}").get_json()
+    assert next_page['records'][0][0] > page['records'][0][0]
+
+def test_read_records_limit_capped(client):
+    response = client.get('/read?limit=1000000')
+    assert response.status_code == 200
+    assert len(response.get_json()['records']) <= 1000
+
+def test_create_bulk(client):
+    response = client.post('/create/bulk', json=[{'data': 'Bulk 1'}, {'data': None}, {'data': 'Bulk 2'}])
+    assert response.status_code == 201
+    json_data = response.get_json()
+    assert json_data['ids'][1] is None
+    assert json_data['ids'][2] == json_data['ids'][0] + 1
+    assert json_data['errors'] == [{'index': 1, 'error': 'data must be a string'}]
+
+def test_create_bulk_requires_array(client):
+    response = client.post('/create/bulk', json={'data': 'Not a list'})
+    assert response.status_code == 400
+
+def test_metrics_endpoint(client):
+    client.post('/create', json={'data': 'Metric Data'})
+    client.get('/read')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert '# TYPE db_proxy_duration_seconds histogram' in body
+    assert 'db_proxy_duration_seconds_count{operation="create",table="records"}' in body
+    assert 'db_proxy_errors_total{operation="read",table="records"} 0' in body
+
+def test_readers_of_finished_threads_are_closed(tmp_path):
+    import threading
+    from app import DatabaseManager
+    manager = DatabaseManager(str(tmp_path / 'readers.db'))
+    manager.connect()
+    for _ in range(10):
+        thread = threading.Thread(target=manager.fetch_records)
+        thread.start()
+        thread.join()
+    manager.fetch_records()
+    # Only the calling thread's reader is left open
+    assert list(manager._readers) == [threading.current_thread()]
+    manager.close()
+
+def test_forked_worker_opens_its_own_connections(tmp_path):
+    import os
+    from app import DatabaseManager
+    if not hasattr(os, 'fork'):
+        pytest.skip("needs os.fork")
+    manager = DatabaseManager(str(tmp_path / 'fork.db'))
+    manager.connect()
+    manager.add_record('Parent')
+    assert manager.fetch_records() == [(1, 'Parent')]
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            # The parent's writer thread and reader are unusable here
+            record_id = manager.writer.submit("INSERT INTO records (data) VALUES (?)", ('Child',)).result(5).lastrowid
+            ok = record_id == 2 and manager.fetch_records() == [(1, 'Parent'), (2, 'Child')]
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert manager.fetch_records() == [(1, 'Parent'), (2, 'Child')]
+    manager.close()
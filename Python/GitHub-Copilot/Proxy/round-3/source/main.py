@@ -1,68 +1,242 @@
 # Import necessary modules
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import csv
+import io
+import json
 import sqlite3
 import logging
+import threading
+import time
+from bulk import BulkRows
+from metrics import Metrics, instrumented
+from pagination import keyset_query, MAX_PAGE_SIZE, PAGE_ARGS, parse_page_args, build_page, first_page
+from sqlite_profiles import apply_sqlite_profile
 
 # Initialize Flask app
 app = Flask(__name__)
 
+# Change Data Capture
+# Every successful write appends an event to change_log in the same
+# transaction, so the log holds exactly the committed changes. AUTOINCREMENT
+# keeps seq strictly increasing and never reuses one, even after pruning, so a
+# consumer can resume from the last seq it applied.
+CHANGE_LOG_DDL = '''CREATE TABLE IF NOT EXISTS change_log (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        table_name TEXT NOT NULL,
+                        record_id INTEGER NOT NULL,
+                        operation TEXT NOT NULL,
+                        data TEXT,
+                        created_at REAL NOT NULL)'''
+CHANGE_INSERT = ('INSERT INTO change_log (table_name, record_id, operation, data, created_at) '
+                 'VALUES (?, ?, ?, ?, ?)')
+
+def change_row(operation, record_id, data=None, table='records'):
+    values = json.dumps({'data': data}) if operation != 'delete' else None
+    return (table, record_id, operation, values, time.time())
+
+def change_event(row):
+    seq, table, record_id, operation, values, created_at = row
+    return {'seq': seq, 'table': table, 'id': record_id, 'op': operation,
+            'data': json.loads(values) if values is not None else None, 'ts': created_at}
+
 # Real Subject Class
 class DatabaseManager:
-    def __init__(self, db_name):
+    def __init__(self, db_name, profile=None):
         self.db_name = db_name
+        self.profile = profile
+        # Flask serves each request on its own thread, and change consumers
+        # wait on theirs, so the one connection is shared across threads and
+        # used by one of them at a time.
+        self._lock = threading.RLock()
 
     def connect(self):
-        self.conn = sqlite3.connect(self.db_name)
+        self.conn = apply_sqlite_profile(sqlite3.connect(self.db_name, check_same_thread=False), self.profile)
         self.cursor = self.conn.cursor()
 
     def create_table(self):
-        self.cursor.execute('''CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, data TEXT)''')
-        self.conn.commit()
+        with self._lock:
+            self.cursor.execute('''CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, data TEXT)''')
+            self.cursor.execute(CHANGE_LOG_DDL)
+            self.conn.commit()
 
     def add_record(self, data):
-        self.cursor.execute('INSERT INTO records (data) VALUES (?)', (data,))
-        self.conn.commit()
+        with self._lock:
+            try:
+                self.cursor.execute('INSERT INTO records (data) VALUES (?)', (data,))
+                record_id = self.cursor.lastrowid
+                self.cursor.execute(CHANGE_INSERT, change_row('create', record_id, data))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            return record_id
+
+    def add_records(self, rows, chunk_size=500):
+        ids = []
+        with self._lock:
+            try:
+                for start in range(0, len(rows), chunk_size):
+                    chunk = rows[start:start + chunk_size]
+                    self.cursor.executemany('INSERT INTO records (data) VALUES (?)', chunk)
+                    # The chunk holds the write lock, so its rows get consecutive
+                    # rowids ending at last_insert_rowid().
+                    last_id = self.cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+                    chunk_ids = range(last_id - len(chunk) + 1, last_id + 1)
+                    self.cursor.executemany(CHANGE_INSERT, (change_row('create', record_id, data)
+                                                            for record_id, (data,) in zip(chunk_ids, chunk)))
+                    ids.extend(chunk_ids)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return ids
 
-    def fetch_records(self):
-        self.cursor.execute('SELECT * FROM records')
-        return self.cursor.fetchall()
+    def fetch_records(self, limit=None, after=None, before=None):
+        query, params, backward = keyset_query(limit, after, before)
+        with self._lock:
+            self.cursor.execute(query, params)
+            rows = self.cursor.fetchall()
+        return rows[::-1] if backward else rows
+
+    def iter_records(self, batch_size=500):
+        # A dedicated cursor, so a long export is not clobbered by the shared one.
+        with self._lock:
+            cursor = self.conn.cursor()
+        try:
+            with self._lock:
+                cursor.execute('SELECT * FROM records ORDER BY id')
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            with self._lock:
+                cursor.close()
 
     def update_record(self, record_id, data):
-        self.cursor.execute('UPDATE records SET data = ? WHERE id = ?', (data, record_id))
-        self.conn.commit()
+        return self._write('update', record_id, 'UPDATE records SET data = ? WHERE id = ?', (data, record_id), data)
 
     def delete_record(self, record_id):
-        self.cursor.execute('DELETE FROM records WHERE id = ?', (record_id,))
-        self.conn.commit()
+        return self._write('delete', record_id, 'DELETE FROM records WHERE id = ?', (record_id,))
+
+    def _write(self, operation, record_id, query, params, data=None):
+        with self._lock:
+            try:
+                self.cursor.execute(query, params)
+                rowcount = self.cursor.rowcount
+                # Writes that matched no row changed nothing to capture.
+                if rowcount:
+                    self.cursor.execute(CHANGE_INSERT, change_row(operation, record_id, data))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            return rowcount
+
+    def fetch_changes(self, since=0, limit=100):
+        with self._lock:
+            self.cursor.execute('SELECT seq, table_name, record_id, operation, data, created_at FROM change_log '
+                                'WHERE seq > ? ORDER BY seq LIMIT ?', (since, limit))
+            return [change_event(row) for row in self.cursor.fetchall()]
+
+    def prune_changes(self, before):
+        with self._lock:
+            self.cursor.execute('DELETE FROM change_log WHERE seq < ?', (before,))
+            self.conn.commit()
+            return self.cursor.rowcount
 
     def close(self):
-        self.conn.close()
+        with self._lock:
+            self.conn.close()
+
+CHANGES_POLL_INTERVAL = 1.0
 
 # Proxy Class
 class DatabaseProxy:
-    def __init__(self, db_name):
-        self.db_manager = DatabaseManager(db_name)
+    def __init__(self, db_name, profile=None, metrics=None):
+        self.db_manager = DatabaseManager(db_name, profile)
+        self.metrics = metrics if metrics is not None else Metrics()
+        # Wakes change consumers waiting in wait_for_changes(); _change_count
+        # lets a waiter tell whether anything was written since it last looked.
+        self._changes = threading.Condition()
+        self._change_count = 0
         logging.basicConfig(level=logging.INFO)
 
     def connect(self):
         logging.info("Connecting to database")
         self.db_manager.connect()
 
+    @instrumented("create", rows=lambda record_id: 1)
     def create(self, data):
-        logging.info(f"Creating record: {data}")
-        self.db_manager.add_record(data)
+        logging.info("Creating record: %s", data)
+        record_id = self.db_manager.add_record(data)
+        self._notify_changes()
+        return record_id
+
+    @instrumented("create_bulk", rows=lambda result: sum(record_id is not None for record_id in result[0]))
+    def create_many(self, records, chunk_size=500):
+        logging.info("Creating records in bulk")
+        batch = BulkRows(records)
+        new_ids = self.db_manager.add_records(batch.rows, chunk_size)
+        if batch.rows:
+            self._notify_changes()
+        return batch.assign(new_ids)
 
-    def read(self):
+    @instrumented("read", rows=len)
+    def read(self, limit=None, after=None, before=None):
         logging.info("Reading records")
-        return self.db_manager.fetch_records()
+        return self.db_manager.fetch_records(limit=limit, after=after, before=before)
 
+    def iter_records(self, batch_size=500):
+        logging.info("Streaming records")
+        return self.db_manager.iter_records(batch_size)
+
+    @instrumented("update", rows=lambda rowcount: rowcount)
     def update(self, record_id, data):
-        logging.info(f"Updating record {record_id} with data: {data}")
-        self.db_manager.update_record(record_id, data)
+        logging.info("Updating record %s with data: %s", record_id, data)
+        rowcount = self.db_manager.update_record(record_id, data)
+        if rowcount:
+            self._notify_changes()
+        return rowcount
 
+    @instrumented("delete", rows=lambda rowcount: rowcount)
     def delete(self, record_id):
-        logging.info(f"Deleting record {record_id}")
-        self.db_manager.delete_record(record_id)
+        logging.info("Deleting record %s", record_id)
+        rowcount = self.db_manager.delete_record(record_id)
+        if rowcount:
+            self._notify_changes()
+        return rowcount
+
+    def _notify_changes(self):
+        with self._changes:
+            self._change_count += 1
+            self._changes.notify_all()
+
+    def changes(self, since=0, limit=100):
+        return self.db_manager.fetch_changes(since, limit)
+
+    def wait_for_changes(self, since=0, limit=100, timeout=0.0):
+        # Long-poll: returns as soon as there are events after ``since``, or
+        # an empty list after ``timeout`` seconds. Writes through this proxy
+        # wake waiters at once; the log is also re-read every
+        # CHANGES_POLL_INTERVAL, which picks up writes from other processes.
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._changes:
+                seen = self._change_count
+            events = self.db_manager.fetch_changes(since, limit)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            with self._changes:
+                self._changes.wait_for(lambda: self._change_count != seen,
+                                       min(remaining, CHANGES_POLL_INTERVAL))
+
+    def prune_changes(self, before):
+        logging.info("Pruning changes before %s", before)
+        return self.db_manager.prune_changes(before)
 
     def close(self):
         logging.info("Closing database connection")
@@ -73,6 +247,34 @@ db_proxy = DatabaseProxy('test.db')
 db_proxy.connect()
 db_proxy.db_manager.create_table()
 
+EXPORT_COLUMNS = ('id', 'data')
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def export_chunks(records, fmt, chunk_rows=500):
+    # Rows are serialized into one buffer and flushed every chunk_rows rows,
+    # so memory stays flat while the response avoids a write per row.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    try:
+        for count, record in enumerate(records, 1):
+            if writer:
+                writer.writerow(record)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, record))))
+                buffer.write('\n')
+            if count % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # Closing the response (including on client disconnect) closes this
+        # generator, which stops the cursor and releases its connection.
+        records.close()
+
 # Flask Routes
 @app.route('/create', methods=['POST'])
 def create():
@@ -80,10 +282,37 @@ def create():
     db_proxy.create(data)
     return jsonify({"message": "Record created"}), 201
 
+@app.route('/create/bulk', methods=['POST'])
+def create_bulk():
+    items = request.json
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON array of records"}), 400
+    ids, errors = db_proxy.create_many(item.get('data') if isinstance(item, dict) else None for item in items)
+    return jsonify({"ids": ids, "errors": errors}), 201
+
 @app.route('/read', methods=['GET'])
 def read():
-    records = db_proxy.read()
-    return jsonify(records), 200
+    if not PAGE_ARGS.intersection(request.args):
+        records, headers = first_page(db_proxy.read(limit=MAX_PAGE_SIZE + 1))
+        return jsonify(records), 200, headers
+    try:
+        limit, after, before = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    records = db_proxy.read(limit=limit + 1, after=after, before=before)
+    return jsonify(build_page(records, limit, after, before)), 200
+
+@app.route('/export', methods=['GET'])
+def export():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    headers = {'Content-Disposition': f'attachment; filename=records.{fmt}'}
+    return Response(export_chunks(db_proxy.iter_records(), fmt), mimetype=EXPORT_MIMETYPES[fmt], headers=headers)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(db_proxy.metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/update', methods=['PUT'])
 def update():
@@ -98,6 +327,56 @@ def delete():
     db_proxy.delete(record_id)
     return jsonify({"message": "Record deleted"}), 200
 
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
+MAX_CHANGES_TIMEOUT = 30.0
+SSE_HEARTBEAT = 15.0
+
+def parse_changes_args(args, last_event_id=None):
+    # A reconnecting EventSource repeats its original URL, so the
+    # Last-Event-ID it sends takes precedence over ?since.
+    try:
+        since = int(last_event_id if last_event_id else args.get('since', 0))
+        limit = int(args.get('limit', DEFAULT_CHANGES_LIMIT))
+        timeout = float(args.get('timeout', 0))
+    except ValueError:
+        raise ValueError("since and limit must be integers and timeout a number")
+    if since < 0 or limit < 1 or timeout < 0:
+        raise ValueError("since and timeout must not be negative and limit must be at least 1")
+    return since, min(limit, MAX_CHANGES_LIMIT), min(timeout, MAX_CHANGES_TIMEOUT)
+
+def sse_events(since, limit):
+    # One SSE event per change, with the seq as its id so a reconnecting
+    # EventSource resumes from Last-Event-ID. A comment line is sent when idle
+    # to keep proxies from closing the connection.
+    while True:
+        events = db_proxy.wait_for_changes(since, limit, timeout=SSE_HEARTBEAT)
+        if not events:
+            yield ': keep-alive\n\n'
+            continue
+        for event in events:
+            yield f"id: {event['seq']}\nevent: {event['op']}\ndata: {json.dumps(event)}\n\n"
+        since = events[-1]['seq']
+
+@app.route('/changes', methods=['GET'])
+def changes():
+    # Long-poll: ?since=<last seq applied>&timeout=<seconds to wait>
+    try:
+        since, limit, timeout = parse_changes_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    events = db_proxy.wait_for_changes(since, limit, timeout)
+    return jsonify({'changes': events, 'last_seq': events[-1]['seq'] if events else since}), 200
+
+@app.route('/changes/stream', methods=['GET'])
+def changes_stream():
+    try:
+        since, limit, _ = parse_changes_args(request.args, request.headers.get('Last-Event-ID'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(sse_events(since, limit), mimetype='text/event-stream', headers=headers)
+
 # Run Flask app
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -54,5 +54,32 @@ def test_proxy_methods():
     assert len(final_records) == 0
     db_proxy.close()
 
+# Test GET /metrics
+def test_metrics(test_client):
+    test_client.post('/create', json={'data': 'Metric Data'})
+    response = test_client.get('/metrics')
+    assert response.status_code == 200
+    assert 'db_proxy_duration_seconds_count{operation="create",table="records"}' in response.get_data(as_text=True)
+
+# Test GET /changes
+def test_changes_feed(test_client):
+    since = test_client.get('/changes').json['last_seq']
+    record_id = test_client.post('/create/bulk', json=[{'data': 'Feed'}]).json['ids'][0]
+    test_client.put('/update', json={'id': record_id, 'data': 'Feed 2'})
+    test_client.delete('/delete', json={'id': record_id})
+    test_client.delete('/delete', json={'id': record_id})  # no row, so no event
+    response = test_client.get(f'/changes?since={since}&timeout=1')
+    assert response.status_code == 200
+    events = response.json['changes']
+    assert [(event['op'], event['id'], event['data']) for event in events] == [
+        ('create', record_id, {'data': 'Feed'}),
+        ('update', record_id, {'data': 'Feed 2'}),
+        ('delete', record_id, None),
+    ]
+    assert [event['seq'] for event in events] == sorted(event['seq'] for event in events)
+    assert response.json['last_seq'] == events[-1]['seq']
+    assert test_client.get('/changes?since=x').status_code == 400
+
+
 if __name__ == '__main__':
-    pytest.main(['--cov=your_module', '--cov-report=term-missing'])
\ No newline at end of file
+    pytest.main(['--cov=your_module', '--cov-report=term-missing'])
@@ -0,0 +1,117 @@
+"""Show what IndexAdvisor's recommended indexes buy on a captured workload.
+
+Loads the Gemini-Flash round-2 proxy, runs a mix of product lookups through
+DatabaseProxy with an IndexAdvisor attached, prints the ranked CREATE INDEX
+statements, then replays the captured reads before and after applying them.
+
+    python benchmarks/bench_index_advisor.py --rows 50000
+    python benchmarks/bench_index_advisor.py --dry-run   # only print the DDL
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULE = os.path.join(HERE, "..", "Gemini-Flash", "Proxy", "round-2", "source", "main.py")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        price REAL NOT NULL,
+        quantity INTEGER NOT NULL
+    )
+"""
+INSERT = "INSERT INTO products (name, description, price, quantity) VALUES (?, ?, ?, ?)"
+
+# (query, parameter factory) pairs; the filters our services actually use.
+WORKLOAD = [
+    ("SELECT * FROM products WHERE name = ?", lambda names: (random.choice(names),)),
+    ("SELECT * FROM products WHERE name = ? ORDER BY price", lambda names: (random.choice(names),)),
+    ("SELECT id, name FROM products WHERE price BETWEEN ? AND ?",
+     lambda names: (lambda low: (low, low + 5))(random.uniform(1, 495))),
+    ("SELECT * FROM products WHERE quantity = ? AND price < ?",
+     lambda names: (random.randint(0, 100), random.uniform(1, 50))),
+]
+
+
+def load_module(path):
+    # The module imports helpers that sit next to it (sqlite_profiles.py, ...).
+    source_dir = os.path.dirname(os.path.abspath(path))
+    sys.path.insert(0, source_dir)
+    try:
+        spec = importlib.util.spec_from_file_location("advised_proxy", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(source_dir)
+    return module
+
+
+def populate(db_file, rows):
+    names = [f"Product {i}" for i in range(max(rows // 10, 1))]
+    with sqlite3.connect(db_file) as conn:
+        conn.execute(SCHEMA)
+        conn.executemany(INSERT, (
+            (random.choice(names), "x" * 64, round(random.uniform(1, 500), 2), random.randint(0, 100))
+            for _ in range(rows)
+        ))
+    return names
+
+
+def capture(module, db_file, names, queries):
+    advisor = module.IndexAdvisor(max_statements=queries)
+    proxy = module.DatabaseProxy(db_file, advisor=advisor)
+    proxy.connect()
+    # DatabaseProxy.execute builds dicts from rows, which needs sqlite3.Row.
+    proxy.conn.row_factory = sqlite3.Row
+    try:
+        for _ in range(queries):
+            query, params = random.choice(WORKLOAD)
+            proxy.execute(query, params(names))
+    finally:
+        proxy.close()
+    return advisor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="proxy module defining IndexAdvisor")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="print the recommended DDL without applying it")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    module = load_module(args.module)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "products.db")
+        names = populate(db_file, args.rows)
+        advisor = capture(module, db_file, names, args.queries)
+
+        conn = sqlite3.connect(db_file)
+        try:
+            print(f"{'est. rows saved':>16}  {'uses':>5}  statement")
+            for recommendation in advisor.recommend(conn):
+                print(f"{recommendation['savings']:>16,.0f}  {recommendation['uses']:>5}  {recommendation['ddl']};")
+            if args.dry_run:
+                return
+            before = advisor.replay(conn)
+            advisor.apply(conn)
+            after = advisor.replay(conn)
+        finally:
+            conn.close()
+
+    print(f"\nreplayed {args.queries} captured statements")
+    print(f"{'before':>8}: {before * 1000:10.1f} ms")
+    print(f"{'after':>8}: {after * 1000:10.1f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
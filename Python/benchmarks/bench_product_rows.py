@@ -0,0 +1,116 @@
+"""Compare slotted Product rows against the old __dict__-backed Product.
+
+Loads the Gemini-Flash round-3 module, fills a products table, then fetches
+every row three ways: plain tuples (the floor), the previous class built in a
+list comprehension over the tuples, and the slotted Product built by its
+sqlite3 row_factory. Reports construction time and retained memory per row.
+
+    python benchmarks/bench_product_rows.py --rows 1000000
+"""
+import argparse
+import gc
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULE = os.path.join(HERE, "..", "Gemini-Flash", "Proxy", "round-3", "source", "main.py")
+
+
+class DictProduct:
+    """The Product class as it was before __slots__, for comparison."""
+
+    def __init__(self, product_id, name, price, description=None):
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+        self.description = description
+
+    def __repr__(self):
+        return f"Product(id={self.product_id}, name='{self.name}', price={self.price}, description='{self.description}')"
+
+
+def load_module(path):
+    # The module imports helpers that sit next to it (sqlite_profiles.py, ...).
+    source_dir = os.path.dirname(os.path.abspath(path))
+    sys.path.insert(0, source_dir)
+    try:
+        spec = importlib.util.spec_from_file_location("product_rows", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(source_dir)
+    return module
+
+
+def populate(api, rows):
+    api.db.cursor.executemany(
+        "INSERT INTO products (name, price, description) VALUES (?, ?, ?)",
+        ((f"Product {i}", i * 0.01, f"Description of product {i}") for i in range(rows)),
+    )
+    api.db.commit()
+
+
+def fetch_tuples(module, db):
+    db.execute(f"SELECT {module.PRODUCT_COLUMNS} FROM products")
+    return db.fetchall()
+
+
+def fetch_dict_products(module, db):
+    db.execute(f"SELECT {module.PRODUCT_COLUMNS} FROM products")
+    return [DictProduct(row[0], row[1], row[2], row[3]) for row in db.fetchall()]
+
+
+def fetch_slotted_products(module, db):
+    db.execute(f"SELECT {module.PRODUCT_COLUMNS} FROM products", row_factory=module.Product.from_row)
+    return db.fetchall()
+
+
+def measure(fetch, module, db, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fetch(module, db)
+        best = min(best, time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = fetch(module, db)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return best, retained, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per variant; the best is reported")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="Gemini-Flash module defining ProductAPI")
+    args = parser.parse_args()
+
+    module = load_module(args.module)
+    variants = [
+        ("tuple rows", fetch_tuples),
+        ("Product (__dict__)", fetch_dict_products),
+        ("Product (__slots__)", fetch_slotted_products),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        api = module.ProductAPI(os.path.join(tmp, "products.db"))
+        try:
+            populate(api, args.rows)
+            print(f"{'variant':<20} {'time (ms)':>10} {'ns/row':>8} {'MiB':>8} {'bytes/row':>10}")
+            for label, fetch in variants:
+                seconds, retained, count = measure(fetch, module, api.db, args.repeat)
+                print(f"{label:<20} {seconds * 1000:>10.1f} {seconds * 1e9 / count:>8.0f} "
+                      f"{retained / 2 ** 20:>8.1f} {retained / count:>10.0f}")
+        finally:
+            api.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,679 @@
+"""Compare the runtime cost of every Proxy variant on identical CRUD workloads.
+
+Each variant gets a small adapter mapping create/read/update/delete/scan onto
+its own API. For every workload and dataset size the harness preloads a fresh
+SQLite database through the adapter (untimed), then times each operation and
+reports throughput, p50/p99 latency, errors and peak Python memory. Variants
+that fail to import (missing drivers, broken modules) are skipped and listed.
+
+    python benchmarks/bench_proxy_variants.py
+    python benchmarks/bench_proxy_variants.py --sizes 1000,10000 --ops 5000 \\
+        --csv results.csv --markdown results.md
+    python benchmarks/bench_proxy_variants.py --variants chatgpt,copilot --workloads mixed
+
+Variant output (print/logging) is discarded while the workloads run, so the
+numbers include building log messages but not writing them to a terminal.
+Peak memory comes from a second, tracemalloc-instrumented pass over the same
+operations, so tracing does not skew the latency figures.
+"""
+import argparse
+import contextlib
+import csv
+import importlib.util
+import io
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Operation weights per workload. "scan" reads every row through the variant.
+WORKLOADS = {
+    "insert-heavy": {"create": 0.8, "read": 0.2},
+    "read-heavy": {"read": 0.9, "update": 0.05, "create": 0.05},
+    "mixed": {"create": 0.25, "read": 0.25, "update": 0.25, "delete": 0.25},
+    "scan": {"scan": 1.0},
+}
+# Scans touch the whole table, so they run this many times fewer operations.
+SCAN_DIVISOR = 100
+
+
+class Adapter:
+    """Maps the harness operations onto one variant's API.
+
+    create() returns the key later passed to read/update/delete; scan()
+    reads every row and gets the live keys for variants without a list API.
+    """
+    name = None
+    path = None
+
+    def __init__(self, module, db_file):
+        self.module = module
+        self.db_file = db_file
+
+    def create(self, n):
+        raise NotImplementedError
+
+    def read(self, key):
+        raise NotImplementedError
+
+    def update(self, key, n):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def scan(self, keys):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ChatGPTRound1(Adapter):
+    name = "chatgpt-r1"
+    path = "ChatGPT/Proxy/round-1/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.proxy = module.DatabaseProxy(db_file)
+        self.proxy.connect()
+        self.proxy.create_table()
+
+    def create(self, n):
+        return self.proxy.add_record((f"name {n}", f"value {n}"))
+
+    def read(self, key):
+        return self.proxy.fetch_records(limit=1, after=key - 1)
+
+    def update(self, key, n):
+        return self.proxy.update_record(key, (f"name {n}", f"value {n}"))
+
+    def delete(self, key):
+        return self.proxy.delete_record(key)
+
+    def scan(self, keys):
+        return self.proxy.fetch_records()
+
+    def close(self):
+        self.proxy.close()
+
+
+class ChatGPTRound2(Adapter):
+    name = "chatgpt-r2"
+    path = "ChatGPT/Proxy/round-2/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.proxy = module.DatabaseProxy(module.DatabaseManager(db_file))
+        self.proxy.create_table()
+
+    def create(self, n):
+        return self.proxy.add_record(f"data {n}")
+
+    def read(self, key):
+        return self.proxy.fetch_records_by_ids([key])
+
+    def update(self, key, n):
+        return self.proxy.update_record(key, f"data {n}")
+
+    def delete(self, key):
+        return self.proxy.delete_record(key)
+
+    def scan(self, keys):
+        return self.proxy.fetch_records()
+
+
+class ChatGPTRound3(Adapter):
+    name = "chatgpt-r3"
+    path = "ChatGPT/Proxy/round-3/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.proxy = module.DatabaseProxy(module.DatabaseManager(db_file))
+        self.proxy.execute("CREATE TABLE IF NOT EXISTS records ("
+                           "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, value TEXT NOT NULL)")
+
+    def create(self, n):
+        return self.proxy.execute("INSERT INTO records (name, value) VALUES (?, ?)", (f"name {n}", f"value {n}"))
+
+    def read(self, key):
+        return self.proxy.fetchone("SELECT * FROM records WHERE id = ?", (key,))
+
+    def update(self, key, n):
+        return self.proxy.execute("UPDATE records SET name = ?, value = ? WHERE id = ?",
+                                  (f"name {n}", f"value {n}", key))
+
+    def delete(self, key):
+        return self.proxy.execute("DELETE FROM records WHERE id = ?", (key,))
+
+    def scan(self, keys):
+        return self.proxy.fetchall("SELECT * FROM records")
+
+
+class ClaudeRound1(Adapter):
+    name = "claude-r1"
+    path = "Claude-แถม/Proxy/round-1/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.real_db = module.RealDatabase(db_file)
+        self.real_db.connect().execute(
+            "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL)")
+        self.proxy = module.DatabaseProxy(self.real_db)
+
+    def create(self, n):
+        return self.proxy.create("users", {"name": f"name {n}", "email": f"user{n}@example.com"})
+
+    def read(self, key):
+        return self.proxy.read("users", key)
+
+    def update(self, key, n):
+        return self.proxy.update("users", key, {"name": f"name {n}"})
+
+    def delete(self, key):
+        return self.proxy.delete("users", key)
+
+    def scan(self, keys):
+        return self.proxy.read_many("users", keys)
+
+    def close(self):
+        self.real_db.close()
+
+
+class ClaudeRound2(Adapter):
+    name = "claude-r2"
+    path = "Claude-แถม/Proxy/round-2/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.real_db = module.RealDatabase(module.SQLiteStrategy(), db_name=db_file)
+        self.real_db.execute(
+            "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL)")
+        self.proxy = module.DatabaseProxy(self.real_db)
+
+    def create(self, n):
+        return self.proxy.create({"name": f"name {n}", "email": f"user{n}@example.com"})
+
+    def read(self, key):
+        return self.proxy.read(key)
+
+    def update(self, key, n):
+        return self.proxy.update(key, {"name": f"name {n}"})
+
+    def delete(self, key):
+        return self.proxy.delete(key)
+
+    def scan(self, keys):
+        return self.real_db.execute("SELECT id, name, email FROM users")
+
+    def close(self):
+        self.real_db.close()
+
+
+class GeminiFlashRound1(Adapter):
+    name = "gemini-flash-r1"
+    path = "Gemini-Flash/Proxy/round-1/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        # ProductAPI opens the connection and creates the table itself.
+        self.api = module.ProductAPI(db_file)
+
+    def create(self, n):
+        return self.api.create({"name": f"Product {n}", "price": float(n)})
+
+    def read(self, key):
+        return self.api.read(key)
+
+    def update(self, key, n):
+        return self.api.update(key, {"price": float(n)})
+
+    def delete(self, key):
+        return self.api.delete(key)
+
+    def scan(self, keys):
+        return self.api.read()
+
+    def close(self):
+        self.api.db.__exit__(None, None, None)
+
+
+class GeminiFlashRound2(Adapter):
+    # ProductAPI.create_product reads lastrowid off the connection, which
+    # sqlite3 does not have, so this adapter drives DatabaseProxy directly.
+    name = "gemini-flash-r2"
+    path = "Gemini-Flash/Proxy/round-2/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        module.initialize_database(db_file)
+        self.proxy = module.DatabaseProxy(db_file)
+        self.proxy.connect()
+        # DatabaseProxy.execute builds dicts from rows, which needs sqlite3.Row.
+        self.proxy.conn.row_factory = sqlite3.Row
+
+    def create(self, n):
+        self.proxy.execute("INSERT INTO products (name, description, price, quantity) VALUES (?, ?, ?, ?)",
+                           (f"Product {n}", "", float(n), n))
+        return self.proxy.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    def read(self, key):
+        return self.proxy.execute("SELECT * FROM products WHERE id = ?", (key,))
+
+    def update(self, key, n):
+        return self.proxy.execute("UPDATE products SET price = ?, quantity = ? WHERE id = ?", (float(n), n, key))
+
+    def delete(self, key):
+        return self.proxy.execute("DELETE FROM products WHERE id = ?", (key,))
+
+    def scan(self, keys):
+        return self.proxy.execute("SELECT * FROM products")
+
+    def close(self):
+        self.proxy.close()
+
+
+class GeminiFlashRound3(Adapter):
+    name = "gemini-flash-r3"
+    path = "Gemini-Flash/Proxy/round-3/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.api = module.ProductAPI(db_file)
+
+    def create(self, n):
+        return self.api.create(self.module.Product(None, f"Product {n}", float(n), ""))
+
+    def read(self, key):
+        return self.api.read(key)
+
+    def update(self, key, n):
+        return self.api.update(self.module.Product(key, f"Product {n}", float(n), ""))
+
+    def delete(self, key):
+        return self.api.delete(key)
+
+    def scan(self, keys):
+        return self.api.read()
+
+    def close(self):
+        self.api.close()
+
+
+BOOKS_SCHEMA = "CREATE TABLE IF NOT EXISTS books (id INTEGER PRIMARY KEY, title TEXT, author TEXT, isbn TEXT UNIQUE)"
+
+
+class GeminiProRound1(Adapter):
+    name = "gemini-pro-r1"
+    path = "Gemini-Pro/Proxy/round-1/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.proxy = module.DatabaseProxy(db_file)
+        self.proxy.connect()
+        self.proxy.execute_query(BOOKS_SCHEMA)
+        self.api = module.BookAPI(self.proxy)
+
+    def create(self, n):
+        isbn = f"isbn-{n}"
+        self.api.create_book(f"Title {n}", f"Author {n % 100}", isbn)
+        return isbn
+
+    def read(self, key):
+        return self.api.get_book(key)
+
+    def update(self, key, n):
+        return self.api.update_book(key, title=f"Title {n}")
+
+    def delete(self, key):
+        return self.api.delete_book(key)
+
+    def scan(self, keys):
+        return self.proxy.execute_query("SELECT * FROM books")
+
+    def close(self):
+        self.proxy.disconnect()
+
+
+class GeminiProRound2(Adapter):
+    name = "gemini-pro-r2"
+    path = "Gemini-Pro/Proxy/round-2/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        module.initialize_database(db_file)
+        self.api = module.BookAPI(db_file)
+
+    def create(self, n):
+        isbn = f"isbn-{n}"
+        self.api.create_book(f"Title {n}", f"Author {n % 100}", isbn)
+        return isbn
+
+    def read(self, key):
+        return self.api.get_book(key)
+
+    def update(self, key, n):
+        return self.api.update_book(key, f"Title {n}", f"Author {n % 100}")
+
+    def delete(self, key):
+        return self.api.delete_book(key)
+
+    def scan(self, keys):
+        with self.api.db_proxy as db:
+            return db.execute("SELECT * FROM books", ())
+
+
+class GeminiProRound3(GeminiProRound1):
+    name = "gemini-pro-r3"
+    path = "Gemini-Pro/Proxy/round-3/source/main.py"
+
+
+class CopilotRound1(Adapter):
+    name = "copilot-r1"
+    path = "GitHub-Copilot/Proxy/round-1/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.manager = module.DatabaseManager(db_file)
+        self.proxy = module.DatabaseProxy(self.manager)
+        self.proxy.create_table()
+
+    def create(self, n):
+        return self.proxy.add_record(f"data {n}")
+
+    def read(self, key):
+        return self.proxy.fetch_records(limit=1, after=key - 1)
+
+    def update(self, key, n):
+        return self.proxy.update_record(key, f"data {n}")
+
+    def delete(self, key):
+        return self.proxy.delete_record(key)
+
+    def scan(self, keys):
+        return self.proxy.fetch_records()
+
+    def close(self):
+        self.manager.pool.close()
+
+
+class CopilotRound2(Adapter):
+    name = "copilot-r2"
+    path = "GitHub-Copilot/Proxy/round-2/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.proxy = module.DatabaseProxy(db_file)
+
+    def create(self, n):
+        return self.proxy.add_record(f"data {n}")
+
+    def read(self, key):
+        return self.proxy.fetch_records(limit=1, after=key - 1)
+
+    def update(self, key, n):
+        return self.proxy.update_record(key, f"data {n}")
+
+    def delete(self, key):
+        return self.proxy.delete_record(key)
+
+    def scan(self, keys):
+        return self.proxy.fetch_records()
+
+    def close(self):
+        self.proxy.db_manager.close()
+
+
+class CopilotRound3(Adapter):
+    name = "copilot-r3"
+    path = "GitHub-Copilot/Proxy/round-3/source/main.py"
+
+    def __init__(self, module, db_file):
+        super().__init__(module, db_file)
+        self.proxy = module.DatabaseProxy(db_file)
+        self.proxy.connect()
+        self.proxy.db_manager.create_table()
+
+    def create(self, n):
+        return self.proxy.create(f"data {n}")
+
+    def read(self, key):
+        return self.proxy.read(limit=1, after=key - 1)
+
+    def update(self, key, n):
+        return self.proxy.update(key, f"data {n}")
+
+    def delete(self, key):
+        return self.proxy.delete(key)
+
+    def scan(self, keys):
+        return self.proxy.read()
+
+    def close(self):
+        self.proxy.close()
+
+
+ADAPTERS = [
+    ChatGPTRound1, ChatGPTRound2, ChatGPTRound3,
+    ClaudeRound1, ClaudeRound2,
+    GeminiFlashRound1, GeminiFlashRound2, GeminiFlashRound3,
+    GeminiProRound1, GeminiProRound2, GeminiProRound3,
+    CopilotRound1, CopilotRound2, CopilotRound3,
+]
+
+
+@contextlib.contextmanager
+def quiet():
+    # Variants print or log on every call; keep that off the terminal.
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as sink:
+            yield sink
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def load_variant(adapter, workdir):
+    """Imports a variant's module from inside ``workdir``.
+
+    Several variants create databases or run example code at import time, so
+    they are imported with ``workdir`` as the current directory.
+    """
+    path = os.path.join(ROOT, adapter.path)
+    source_dir = os.path.dirname(path)
+    cwd = os.getcwd()
+    sys.path.insert(0, source_dir)
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location(f"variant_{adapter.name.replace('-', '_')}", path)
+        module = importlib.util.module_from_spec(spec)
+        with quiet():
+            spec.loader.exec_module(module)
+        return module
+    finally:
+        os.chdir(cwd)
+        sys.path.remove(source_dir)
+        forget_siblings(source_dir)
+
+
+def forget_siblings(source_dir):
+    """Drops modules imported from ``source_dir`` out of ``sys.modules``.
+
+    Variants ship helper modules under the same names (pagination.py, ...),
+    so the next variant has to import its own copies rather than reuse these.
+    """
+    for name, module in list(sys.modules.items()):
+        if os.path.dirname(getattr(module, "__file__", None) or "") == source_dir:
+            del sys.modules[name]
+
+
+def plan_operations(workload, ops, seed):
+    weights = WORKLOADS[workload]
+    count = max(ops // SCAN_DIVISOR, 1) if workload == "scan" else ops
+    rng = random.Random(seed)
+    return rng.choices(list(weights), weights=list(weights.values()), k=count), rng
+
+
+def run_workload(adapter_class, module, db_file, workload, size, ops, seed, trace_memory=False):
+    operations, rng = plan_operations(workload, ops, seed)
+    latencies, errors = [], 0
+    with quiet():
+        adapter = adapter_class(module, db_file)
+        try:
+            keys = [adapter.create(n) for n in range(size)]
+            counter = size
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            for operation in operations:
+                op_start = time.perf_counter()
+                try:
+                    if operation == "create":
+                        counter += 1
+                        key = adapter.create(counter)
+                        if key is not None:
+                            keys.append(key)
+                    elif operation == "scan":
+                        adapter.scan(keys)
+                    elif not keys:
+                        continue
+                    elif operation == "read":
+                        adapter.read(rng.choice(keys))
+                    elif operation == "update":
+                        counter += 1
+                        adapter.update(rng.choice(keys), counter)
+                    elif operation == "delete":
+                        adapter.delete(keys.pop(rng.randrange(len(keys))))
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - op_start)
+            elapsed = time.perf_counter() - start
+            peak = None
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        finally:
+            adapter.close()
+    return latencies, errors, elapsed, peak
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def benchmark(adapter_class, module, tmp, workload, size, ops, seed, measure_memory):
+    db_file = os.path.join(tmp, f"{adapter_class.name}-{workload}-{size}.db")
+    latencies, errors, elapsed, _ = run_workload(adapter_class, module, db_file, workload, size, ops, seed)
+    peak = None
+    if measure_memory:
+        _, _, _, peak = run_workload(adapter_class, module, db_file + ".mem", workload, size, ops, seed,
+                                     trace_memory=True)
+    latencies.sort()
+    return {
+        "variant": adapter_class.name,
+        "workload": workload,
+        "size": size,
+        "ops": len(latencies),
+        "errors": errors,
+        "ops_per_sec": len(latencies) / elapsed if elapsed else float("nan"),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_kib": peak / 1024 if peak is not None else None,
+    }
+
+
+FIELDS = ["variant", "workload", "size", "ops", "errors", "ops_per_sec", "p50_ms", "p99_ms", "peak_kib"]
+
+
+def format_value(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.3f}" if value < 10 else f"{value:,.0f}"
+    return str(value)
+
+
+def write_csv(path, results):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def markdown(results, skipped):
+    lines = ["| " + " | ".join(FIELDS) + " |", "|" + "---|" * len(FIELDS)]
+    for result in results:
+        lines.append("| " + " | ".join(format_value(result[field]) for field in FIELDS) + " |")
+    if skipped:
+        lines.append("")
+        lines.append("Skipped variants:")
+        lines.append("")
+        lines.extend(f"- {name}: {reason}" for name, reason in skipped)
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated preloaded row counts")
+    parser.add_argument("--ops", type=int, default=2000, help="operations per workload run")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="comma-separated workloads")
+    parser.add_argument("--variants", default="", help="comma-separated name filters, e.g. chatgpt,copilot-r1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--csv", help="write results to this CSV file")
+    parser.add_argument("--markdown", help="write results to this Markdown file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    workloads = [workload for workload in args.workloads.split(",") if workload]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+    filters = [name for name in args.variants.split(",") if name]
+    adapters = [adapter for adapter in ADAPTERS
+                if not filters or any(name in adapter.name for name in filters)]
+
+    results, skipped = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for adapter_class in adapters:
+            workdir = os.path.join(tmp, adapter_class.name)
+            os.makedirs(workdir)
+            try:
+                module = load_variant(adapter_class, workdir)
+            except Exception as e:
+                skipped.append((adapter_class.name, f"{type(e).__name__}: {e}"))
+                print(f"skip {adapter_class.name}: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            for workload in workloads:
+                for size in sizes:
+                    try:
+                        result = benchmark(adapter_class, module, workdir, workload, size, args.ops, args.seed,
+                                           not args.no_memory)
+                    except Exception as e:
+                        skipped.append((f"{adapter_class.name} {workload}/{size}", f"{type(e).__name__}: {e}"))
+                        print(f"fail {adapter_class.name} {workload}/{size}: {type(e).__name__}: {e}", file=sys.stderr)
+                        continue
+                    results.append(result)
+                    print(f"done {adapter_class.name} {workload}/{size}: {result['ops_per_sec']:,.0f} ops/s",
+                          file=sys.stderr)
+
+    if args.csv:
+        write_csv(args.csv, results)
+    report = markdown(results, skipped)
+    if args.markdown:
+        with open(args.markdown, "w") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare throughput of the SQLite connection profiles.
+
+Loads the Gemini-Flash round-2 proxy (which gets SQLITE_PROFILES and
+apply_sqlite_profile from its sqlite_profiles.py) and runs the same workload against a fresh database
+for each profile, plus a "bare" run with sqlite3's defaults for reference.
+
+    python benchmarks/bench_sqlite_profiles.py --rows 5000
+"""
+import argparse
+import importlib.util
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULE = os.path.join(HERE, "..", "Gemini-Flash", "Proxy", "round-2", "source", "main.py")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        price REAL NOT NULL,
+        quantity INTEGER NOT NULL
+    )
+"""
+INSERT = "INSERT INTO products (name, description, price, quantity) VALUES (?, ?, ?, ?)"
+
+
+def load_module(path):
+    # The module imports helpers that sit next to it (sqlite_profiles.py, ...).
+    source_dir = os.path.dirname(os.path.abspath(path))
+    sys.path.insert(0, source_dir)
+    try:
+        spec = importlib.util.spec_from_file_location("profiled_proxy", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(source_dir)
+    return module
+
+
+def product(i):
+    return (f"Product {i}", "x" * 64, round(random.uniform(1, 500), 2), random.randint(0, 100))
+
+
+def timed(fn, ops):
+    start = time.perf_counter()
+    fn()
+    return ops / (time.perf_counter() - start)
+
+
+def run(module, db_file, profile, rows):
+    proxy = module.DatabaseProxy(db_file, profile)
+    if profile is None:
+        # Reference run: sqlite3's own defaults, no PRAGMAs at all.
+        proxy.conn = sqlite3.connect(db_file)
+    else:
+        proxy.connect()
+    # DatabaseProxy.execute builds dicts from rows, which needs sqlite3.Row.
+    proxy.conn.row_factory = sqlite3.Row
+    proxy.execute(SCHEMA)
+    results = {}
+    try:
+        # One transaction per insert is where synchronous/journal_mode show.
+        single = max(rows // 10, 1)
+        results["insert/s (autocommit)"] = timed(
+            lambda: [proxy.execute(INSERT, product(i)) for i in range(single)], single)
+
+        def bulk():
+            with proxy.conn:
+                proxy.conn.executemany(INSERT, (product(i) for i in range(rows)))
+        results["insert/s (one txn)"] = timed(bulk, rows)
+
+        total = single + rows
+        ids = [random.randint(1, total) for _ in range(rows)]
+        results["point reads/s"] = timed(
+            lambda: [proxy.execute("SELECT * FROM products WHERE id = ?", (i,)) for i in ids], rows)
+
+        scans = 20
+        results["full scans/s"] = timed(
+            lambda: [proxy.execute("SELECT * FROM products ORDER BY price") for _ in range(scans)], scans)
+    finally:
+        proxy.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="proxy module importing apply_sqlite_profile")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    module = load_module(args.module)
+    # The profiles live in the sqlite_profiles.py next to the module.
+    profiles = [None] + list(sys.modules[module.apply_sqlite_profile.__module__].SQLITE_PROFILES)
+    table = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in profiles:
+            random.seed(args.seed)
+            name = profile or "bare"
+            table[name] = run(module, os.path.join(tmp, f"{name}.db"), profile, args.rows)
+
+    metrics = list(next(iter(table.values())))
+    width = max(len(m) for m in metrics)
+    print(f"{'profile':<12}" + "".join(f"{m:>{width + 2}}" for m in metrics))
+    for name, results in table.items():
+        print(f"{name:<12}" + "".join(f"{results[m]:>{width + 2},.0f}" for m in metrics))
+
+
+if __name__ == "__main__":
+    main()
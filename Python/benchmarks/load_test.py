@@ -0,0 +1,430 @@
+"""Load-test the Flask CRUD apps over HTTP with an open-loop request generator.
+
+Each app is imported into a scratch directory, given a fresh SQLite database
+and served in-process by werkzeug. Requests arrive as a Poisson process at each
+offered rate in --rates, independent of how fast the server answers, so
+latency includes any time a request spent waiting behind earlier ones. Every
+step reports latency percentiles, error rates by kind and achieved throughput;
+read down the rates to see where the app saturates.
+
+    python benchmarks/load_test.py --apps chatgpt-r2,copilot-r1
+    python benchmarks/load_test.py --rates 50,100,200,400,800 --duration 10 \\
+        --mix create=0.2,read=0.6,update=0.1,delete=0.1 --workers 8 --csv load.csv
+
+--workers sets the server's request threads (0 spawns a thread per request,
+like `flask run`); --clients caps the requests in flight from the generator.
+Client and server share one interpreter, so absolute numbers understate what
+a separate server process would do; compare apps and rates against each other.
+"""
+import argparse
+import contextlib
+import csv
+import http.client
+import importlib.util
+import io
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, make_server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+OPERATIONS = ("create", "read", "scan", "update", "delete")
+DEFAULT_MIX = "create=0.2,read=0.6,update=0.1,delete=0.1"
+PRELOAD_BATCH = 500
+READ_PAGE = 20
+
+# Checked in order against the body of a 5xx response.
+ERROR_KINDS = [
+    ("locked", re.compile(r"database (table )?is locked", re.IGNORECASE)),
+    ("thread-affinity", re.compile(r"same thread|created in a thread", re.IGNORECASE)),
+]
+
+
+def name_value(n):
+    return {"name": f"name {n}", "value": f"value {n}"}
+
+
+def data(n):
+    return {"data": f"data {n}"}
+
+
+# How each app spells the CRUD routes. "update"/"delete" are
+# (method, path, body) factories taking a record id.
+APPS = {
+    "chatgpt-r1": {
+        "path": "ChatGPT/Proxy/round-1/source/main.py",
+        "setup": lambda module: (module.db_proxy.connect(), module.db_proxy.create_table()),
+        "body": name_value,
+        "update": lambda key, n: ("PUT", f"/update/{key}", name_value(n)),
+        "delete": lambda key: ("DELETE", f"/delete/{key}", None),
+    },
+    "chatgpt-r2": {
+        "path": "ChatGPT/Proxy/round-2/source/main.py",
+        "setup": None,
+        "body": data,
+        "update": lambda key, n: ("PUT", f"/update/{key}", data(n)),
+        "delete": lambda key: ("DELETE", f"/delete/{key}", None),
+    },
+    "chatgpt-r3": {
+        "path": "ChatGPT/Proxy/round-3/source/main.py",
+        "setup": None,
+        "body": name_value,
+        "update": lambda key, n: ("PUT", f"/update/{key}", name_value(n)),
+        "delete": lambda key: ("DELETE", f"/delete/{key}", None),
+    },
+    "copilot-r1": {
+        "path": "GitHub-Copilot/Proxy/round-1/source/main.py",
+        "setup": lambda module: module.db_proxy.create_table(),
+        "body": data,
+        "update": lambda key, n: ("PUT", f"/update/{key}", data(n)),
+        "delete": lambda key: ("DELETE", f"/delete/{key}", None),
+    },
+    "copilot-r2": {
+        "path": "GitHub-Copilot/Proxy/round-2/source/main.py",
+        "setup": None,
+        "body": data,
+        "update": lambda key, n: ("PUT", "/update", {"id": key, **data(n)}),
+        "delete": lambda key: ("DELETE", "/delete", {"id": key}),
+    },
+    "copilot-r3": {
+        "path": "GitHub-Copilot/Proxy/round-3/source/main.py",
+        "setup": None,
+        "body": data,
+        "update": lambda key, n: ("PUT", "/update", {"id": key, **data(n)}),
+        "delete": lambda key: ("DELETE", "/delete", {"id": key}),
+    },
+}
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """A werkzeug server that handles requests on a fixed pool of threads."""
+
+    def __init__(self, host, port, app, workers):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="wsgi")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+
+
+def report_errors(wsgi_app):
+    # With PROPAGATE_EXCEPTIONS the app re-raises instead of rendering a bare
+    # 500 page, so the response can say which error the request hit.
+    def app(environ, start_response):
+        try:
+            return wsgi_app(environ, start_response)
+        except Exception as e:
+            body = f"{type(e).__name__}: {e}".encode()
+            start_response("500 INTERNAL SERVER ERROR",
+                           [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))],
+                           sys.exc_info())
+            return [body]
+    return app
+
+
+def load_app(name, spec):
+    """Imports an app from the current directory, so its database lands there."""
+    path = os.path.join(ROOT, spec["path"])
+    source_dir = os.path.dirname(path)
+    sys.path.insert(0, source_dir)
+    try:
+        module_spec = importlib.util.spec_from_file_location(f"load_{name.replace('-', '_')}", path)
+        module = importlib.util.module_from_spec(module_spec)
+        with contextlib.redirect_stdout(io.StringIO()):
+            module_spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(source_dir)
+        # Apps ship helper modules under the same names (pagination.py, ...),
+        # so the next app has to import its own copies.
+        for sibling_name, sibling in list(sys.modules.items()):
+            if os.path.dirname(getattr(sibling, "__file__", None) or "") == source_dir:
+                del sys.modules[sibling_name]
+    if spec["setup"]:
+        spec["setup"](module)
+    module.app.config["PROPAGATE_EXCEPTIONS"] = True
+    module.app.wsgi_app = report_errors(module.app.wsgi_app)
+    return module
+
+
+def serve(app, workers):
+    if workers:
+        server = PooledWSGIServer("127.0.0.1", 0, app, workers)
+    else:
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def send(port, method, path, body, timeout):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def classify(status, body):
+    if status < 400:
+        return None
+    if status < 500:
+        return f"http-{status}"
+    text = body.decode(errors="replace")
+    for kind, pattern in ERROR_KINDS:
+        if pattern.search(text):
+            return kind
+    return f"http-{status}"
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        operation, _, weight = part.partition("=")
+        if operation not in OPERATIONS:
+            raise ValueError(f"unknown operation {operation!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[operation] = float(weight)
+    if not any(mix.values()):
+        raise ValueError("the mix needs at least one positive weight")
+    return mix
+
+
+class Target:
+    """Builds requests for one app and tracks the highest record id handed out."""
+
+    def __init__(self, spec, port, timeout):
+        self.spec = spec
+        self.port = port
+        self.timeout = timeout
+        self.max_id = 0
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def preload(self, rows):
+        # Returns the reason the app refused the preload, if it did; the steps
+        # still run so the failure shows up in the error columns.
+        for start in range(0, rows, PRELOAD_BATCH):
+            items = [self.spec["body"](n) for n in range(start, min(start + PRELOAD_BATCH, rows))]
+            status, body = send(self.port, "POST", "/create/bulk", items, self.timeout)
+            if status != 201:
+                return f"{status} {body[:200].decode(errors='replace')}"
+            self.max_id = self.counter = start + len(items)
+        return None
+
+    def request(self, operation, rng):
+        with self.lock:
+            self.counter += 1
+            n = self.counter
+            if operation == "create":
+                # Ids are AUTOINCREMENT, so updates and deletes can aim
+                # anywhere below the number of creates sent so far.
+                self.max_id += 1
+            key = rng.randint(1, max(self.max_id, 1))
+        if operation == "create":
+            return "POST", "/create", self.spec["body"](n)
+        if operation == "read":
+            return "GET", f"/read?limit={READ_PAGE}", None
+        if operation == "scan":
+            return "GET", "/read", None
+        if operation == "update":
+            return self.spec["update"](key, n)
+        return self.spec["delete"](key)
+
+
+def run_step(target, rate, duration, mix, clients, seed):
+    rng = random.Random(seed)
+    operations, weights = list(mix), list(mix.values())
+    results = []
+
+    def call(operation, method, path, body, scheduled):
+        try:
+            status, payload = send(target.port, method, path, body, target.timeout)
+            kind = classify(status, payload)
+        except TimeoutError:
+            kind = "timeout"
+        except OSError as e:
+            kind = f"connection:{type(e).__name__}"
+        results.append((operation, time.perf_counter() - scheduled, kind))
+
+    with ThreadPoolExecutor(clients, thread_name_prefix="client") as pool:
+        start = time.perf_counter()
+        offset = rng.expovariate(rate)
+        while offset < duration:
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            operation = rng.choices(operations, weights)[0]
+            # Latency runs from the scheduled arrival, so time spent queued
+            # behind a slow server counts against it.
+            pool.submit(call, operation, *target.request(operation, rng), scheduled)
+            offset += rng.expovariate(rate)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(app, rate, results, elapsed):
+    latencies = sorted(latency for _, latency, _ in results)
+    errors = {}
+    for _, _, kind in results:
+        if kind:
+            errors[kind] = errors.get(kind, 0) + 1
+    total = len(results)
+    return {
+        "app": app,
+        "offered_rps": rate,
+        "achieved_rps": total / elapsed if elapsed else float("nan"),
+        "requests": total,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else float("nan"),
+        "error_pct": 100 * sum(errors.values()) / total if total else 0.0,
+        "locked": errors.pop("locked", 0),
+        "thread_affinity": errors.pop("thread-affinity", 0),
+        "other_errors": " ".join(f"{kind}={count}" for kind, count in sorted(errors.items())),
+    }
+
+
+FIELDS = ["app", "offered_rps", "achieved_rps", "requests", "p50_ms", "p90_ms", "p99_ms", "max_ms",
+          "error_pct", "locked", "thread_affinity", "other_errors"]
+
+
+def format_row(row):
+    cells = []
+    for field in FIELDS:
+        value = row[field]
+        if isinstance(value, float):
+            value = f"{value:.1f}" if value < 1000 else f"{value:,.0f}"
+        cells.append(str(value) if value != "" else "-")
+    return cells
+
+
+def print_table(rows, file=sys.stdout):
+    table = [FIELDS] + [format_row(row) for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(FIELDS))]
+    for line in table:
+        print("  ".join(cell.rjust(width) for cell, width in zip(line, widths)), file=file)
+
+
+def knee(rows, slo_ms, max_error_pct):
+    """The first offered rate the app could not keep up with, if any."""
+    for row in rows:
+        if (row["achieved_rps"] < 0.9 * row["offered_rps"] or row["p99_ms"] > slo_ms
+                or row["error_pct"] > max_error_pct):
+            return row["offered_rps"]
+    return None
+
+
+def run_app(app, args, mix, rates):
+    spec = APPS[app]
+    cwd = os.getcwd()
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        server = None
+        try:
+            module = load_app(app, spec)
+            server = serve(module.app, args.workers)
+            target = Target(spec, server.server_port, args.timeout)
+            failure = target.preload(args.preload)
+            if failure:
+                print(f"{app}: preload failed: {failure}", file=sys.stderr)
+            for step, rate in enumerate(rates):
+                results, elapsed = run_step(target, rate, args.duration, mix, args.clients, args.seed + step)
+                row = summarize(app, rate, results, elapsed)
+                rows.append(row)
+                print(f"{app} @ {rate:g} rps: {row['achieved_rps']:.1f} rps, "
+                      f"p99 {row['p99_ms']:.1f} ms, {row['error_pct']:.1f}% errors", file=sys.stderr)
+        except Exception as e:
+            print(f"skip {app}: {type(e).__name__}: {e}", file=sys.stderr)
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+            os.chdir(cwd)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", default=",".join(APPS), help="comma-separated apps to test")
+    parser.add_argument("--rates", default="25,50,100,200,400", help="offered requests/second, one step each")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of arrivals per step")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights from {', '.join(OPERATIONS)}")
+    parser.add_argument("--workers", type=int, default=0, help="server threads; 0 starts one per request")
+    parser.add_argument("--clients", type=int, default=64, help="maximum requests in flight")
+    parser.add_argument("--preload", type=int, default=1000, help="records created before the first step")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--slo-ms", type=float, default=250.0, help="p99 above this marks saturation")
+    parser.add_argument("--max-error-pct", type=float, default=1.0, help="error rate above this marks saturation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="write every step to this CSV file")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    apps = [app for app in args.apps.split(",") if app]
+    unknown = set(apps) - set(APPS)
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(sorted(unknown))}")
+    rates = [float(rate) for rate in args.rates.split(",")]
+
+    rows = []
+    # The apps log (or print) every query and request; only our report is wanted.
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for app in apps:
+                app_rows = run_app(app, args, mix, rates)
+                rows.extend(app_rows)
+                limit = knee(app_rows, args.slo_ms, args.max_error_pct)
+                if app_rows:
+                    print(f"{app}: " + (f"saturates at {limit:g} rps" if limit else "kept up at every rate"),
+                          file=sys.stderr)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print_table(rows)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
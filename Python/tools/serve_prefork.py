@@ -0,0 +1,96 @@
+"""Serve a Flask CRUD app from several pre-forked worker processes.
+
+The app module is imported once, in the master, so its schema is created
+before forking; each worker then opens its own SQLite connections (and writer
+thread) on first use, so no handle is shared between processes. Every worker
+accepts from the one socket bound here. A module that needs to prepare for
+several workers defines before_fork(workers), called once after the import.
+
+    python tools/serve_prefork.py ChatGPT/Proxy/round-2/source/main.py --workers 8
+    python tools/serve_prefork.py GitHub-Copilot/Proxy/round-2/source/main.py --port 8000
+
+--workers 0 starts one worker per core. The equivalent under gunicorn, whose
+--preload also imports the app once in the master before forking, is
+
+    gunicorn --preload -w 8 -b 127.0.0.1:5000 main:app
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import signal
+import sys
+
+from werkzeug.serving import make_server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def load_module(path):
+    """Imports the app module by path, with its directory importable for its helpers."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def serve_prefork(app, host="127.0.0.1", port=5000, workers=None):
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Pre-fork serving needs os.fork(); run under a WSGI server instead")
+    workers = workers or os.cpu_count() or 1
+    server = make_server(host, port, app, threaded=True)
+    children = set()
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            except BaseException:
+                logging.exception("Worker %d failed", os.getpid())
+                status = 1
+            finally:
+                os._exit(status)
+        children.add(pid)
+    # Only the master turns SIGTERM into a clean shutdown of its workers
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    logging.info("Serving on http://%s:%d with %d workers", host, port, workers)
+    try:
+        while children:
+            pid, _ = os.wait()
+            children.discard(pid)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help=f"app module, absolute or relative to {ROOT}")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes; 0 starts one per core")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    module = load_module(os.path.join(ROOT, args.path))
+    workers = args.workers or os.cpu_count() or 1
+    if hasattr(module, "before_fork"):
+        module.before_fork(workers)
+    serve_prefork(module.app, args.host, args.port, workers)
+
+
+if __name__ == "__main__":
+    main()